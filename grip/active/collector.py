@@ -51,6 +51,7 @@ from grip.utils.messages import MeasurementsRequestedMsg, EventOnElasticMsg
 
 REQUEST_RETRY_INTERVAL = 30  # number of seconds to wait before asking again for results
 KAFKA_POOLING_INTERVAL = 5
+KAFKA_CONSUME_BATCH_SIZE = 100
 
 
 class TRACEROUTE_STATUS(Enum):
@@ -79,7 +80,8 @@ class ActiveProbingCollector:
 
         # initialize kafka helper
         self.kafka_helper = KafkaHelper()
-        self.kafka_helper.init_producer(topic=producer_topic)
+        # result messages are flushed once per processing round, before committing the consumer offset
+        self.kafka_helper.init_producer(topic=producer_topic, async_mode=True)
         self.kafka_helper.init_consumer(topics=[consumer_topic], group_id=consumer_group, offset="earliest")
 
         # ElasticSearch
@@ -195,10 +197,11 @@ class ActiveProbingCollector:
                 logging.info("Shutting down")
                 break
 
-            msg = self.kafka_helper.poll(KAFKA_POOLING_INTERVAL)
+            msgs = self.kafka_helper.consume(KAFKA_CONSUME_BATCH_SIZE, KAFKA_POOLING_INTERVAL)
+            msgs = [msg for msg in msgs if not msg.error()]
 
             # quickly polling all pending messages from kafka before processing results
-            if msg is not None and not msg.error():
+            for msg in msgs:
                 msms_msg = MeasurementsRequestedMsg.from_str(msg.value().decode("utf-8"))
 
                 view_ts = msms_msg.view_ts
@@ -213,7 +216,8 @@ class ActiveProbingCollector:
                     if msm.msm_id > 0:
                         # only save succeeded measurements
                         msms_map[int(msm.msm_id)] = msm
-                continue  # continue to poll next kafka message
+            if msgs:
+                continue  # continue to poll next kafka messages
 
             # all messages from Kafka have been registered, continue to processing the measurements
             # check current measurements to see if new results have come
@@ -260,5 +264,8 @@ class ActiveProbingCollector:
             
             prev_measurements = msms_map.keys()
             
+            # make sure result notifications are delivered before committing the offset, if they cannot be delivered
+            # flush_checkpoint raises and the offset is not committed, so the measurements are collected again
+            self.kafka_helper.flush_checkpoint()
             logging.info("updating kafka offset")
             self.kafka_helper.commit_offset()
\ No newline at end of file
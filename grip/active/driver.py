@@ -51,6 +51,9 @@ from grip.utils.general import to_dict
 from grip.utils.kafka import KafkaHelper
 from grip.utils.messages import EventOnElasticMsg, MeasurementsRequestedMsg
 
+KAFKA_POOLING_INTERVAL = 5
+KAFKA_CONSUME_BATCH_SIZE = 100
+
 TR_DISABLED = {
     "moas": False,
     "submoas": False,
@@ -80,7 +83,8 @@ class ActiveProbingDriver:
 
         # kafka-related initialization
         self.kafka_helper = KafkaHelper()
-        self.kafka_helper.init_producer(topic=producer_topic)
+        # request messages are flushed once per batch of tagger messages, before committing the consumer offset
+        self.kafka_helper.init_producer(topic=producer_topic, async_mode=True)
         self.kafka_helper.init_consumer(topics=[consumer_topic], group_id=consumer_group, offset="earliest")
 
         # ElasticSearch
@@ -242,7 +246,33 @@ class ActiveProbingDriver:
                 event_id=event.event_id,
                 measurements=succeeeded_msm_requests)
             logging.info("sending MeasurementsRequestedMsg to collector: {}".format(msg.to_str()))
-            self.kafka_helper.produce(value_str=msg.to_str(), flush=True)
+            self.kafka_helper.produce(value_str=msg.to_str())
+
+    def process_message(self, msg):
+        """
+        Process one EventOnElasticMsg coming in from Tagger via Kafka.
+        """
+        # at this point, we have a good EventOnElasticMsg object from the tagger.
+        # Example message:
+        # 'tagger observatory-test-moas-2019-9-30 moas-1569847800-5602_7713 event_result False'
+        event_ready_msg = EventOnElasticMsg.from_str(msg.value().decode("utf-8"))
+        if not event_ready_msg.tr_worthy or "v3" not in event_ready_msg.es_index:
+            # if the event is not tr_worthy, don't bother doing anything forward
+            return
+
+        # now the event is tr_worthy
+        # retrieve event from ElasticSearch and parse it into Event object
+        event = self.es_conn.get_event_by_id(index=event_ready_msg.es_index, event_id=event_ready_msg.es_id)
+        if event is None:
+            logging.info("cannot retrieve event: {}/{}".format(event_ready_msg.es_index, event_ready_msg.es_id))
+            return
+        # check if the event is too old for conducting traceroutes, threshold is defined in ACTIVE_MAX_TIME_DELTA
+        if time.time() - event.view_ts > ACTIVE_MAX_TIME_DELTA:
+            # event is too old to worth traceroute
+            logging.info("event {} is older than {} seconds before now, skipping traceroute"
+                         .format(event.event_id, ACTIVE_MAX_TIME_DELTA))
+            return
+        self.process_event(event)
 
     def listen(self, limit=float("inf")):
         """
@@ -271,37 +301,17 @@ class ActiveProbingDriver:
                 logging.info("Shutting down")
                 break
 
-            # retrieve message from kafka
-            msg = self.kafka_helper.poll(5)
-            if msg is None or msg.error():
-                self.kafka_helper.commit_offset()
-                continue
-            msg_count += 1
-
-            # at this point, we have a good EventOnElasticMsg object from the tagger.
-            # Example message:
-            # 'tagger observatory-test-moas-2019-9-30 moas-1569847800-5602_7713 event_result False'
-            event_ready_msg = EventOnElasticMsg.from_str(msg.value().decode("utf-8"))
-            if not event_ready_msg.tr_worthy or "v3" not in event_ready_msg.es_index:
-                # if the event is not tr_worthy, don't bother doing anything forward
-                self.kafka_helper.commit_offset()
-                continue
-
-            # now the event is tr_worthy
-            # retrieve event from ElasticSearch and parse it into Event object
-            event = self.es_conn.get_event_by_id(index=event_ready_msg.es_index, event_id=event_ready_msg.es_id)
-            if event is None:
-                logging.info("cannot retrieve event: {}/{}".format(event_ready_msg.es_index, event_ready_msg.es_id))
-                self.kafka_helper.commit_offset()
-                continue
-            # check if the event is too old for conducting traceroutes, threshold is defined in ACTIVE_MAX_TIME_DELTA
-            if time.time() - event.view_ts > ACTIVE_MAX_TIME_DELTA:
-                # event is too old to worth traceroute
-                logging.info("event {} is older than {} seconds before now, skipping traceroute"
-                             .format(event.event_id, ACTIVE_MAX_TIME_DELTA))
-                self.kafka_helper.commit_offset()
-                continue
-            self.process_event(event)
+            # retrieve a batch of messages from kafka
+            msgs = self.kafka_helper.consume(int(min(KAFKA_CONSUME_BATCH_SIZE, limit - msg_count)),
+                                             KAFKA_POOLING_INTERVAL)
+            msgs = [msg for msg in msgs if not msg.error()]
+            msg_count += len(msgs)
+            for msg in msgs:
+                self.process_message(msg)
+
+            # make sure the requests to the collector are delivered before committing the offset, if they cannot be
+            # delivered flush_checkpoint raises and the offset is not committed
+            self.kafka_helper.flush_checkpoint()
             self.kafka_helper.commit_offset()
         # end of while True loop
 
@@ -29,15 +29,81 @@
 #  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import itertools
+import json
+
+from grip.utils.bgp import LazyAsPaths
+
+# versions of the details, unique across all details so that a version also tells replaced details apart
+_DETAILS_VERSIONS = itertools.count(1)
+
+
+# the AS paths fields are not retrieved with some hydration modes, see grip.events.event.HYDRATION_SOURCE_EXCLUDES
+ASPATHS_NOT_RETRIEVED = "AS paths of the prefix event were not retrieved"
+
+
+class NotRetrievedAsPaths(LazyAsPaths):
+    """
+    AS paths that were not retrieved with the stored prefix event, using them raises a ValueError instead of giving no
+    paths.
+    """
+
+    __slots__ = ()
+
+    def __init__(self):
+        LazyAsPaths.__init__(self, [])
+
+    def get(self):
+        raise ValueError(ASPATHS_NOT_RETRIEVED)
+
+    get_indexed = get
+    as_str = get
+
+
+def aspaths_from_dict(d, key):
+    """
+    Get the AS paths of a details dict, the field is missing if the AS paths were not retrieved.
+    """
+    if key not in d:
+        return NotRetrievedAsPaths()
+    return LazyAsPaths(d[key])
 
 
 class PfxEventDetails:
+    # the details are kept for every prefix event of the views being processed, avoid per-instance dicts
+    __slots__ = ("version", "_json")
+
     def __init__(self):
+        self.version = next(_DETAILS_VERSIONS)
+        # (incl_paths, JSON encoding) of the last as_json call
+        self._json = None
+
+    def changed(self):
+        """
+        Record a change of the details, called by the methods that modify them.
+        """
+        self.version = next(_DETAILS_VERSIONS)
+        self._json = None
+
+    def release_aspaths(self):
+        """
+        Drop the decoded AS paths (and anything derived from them), they are decoded again from their string form when
+        they are used next. Called once the prefix event is tagged.
+        """
         pass
 
     def as_dict(self, incl_paths):
         raise NotImplementedError
 
+    def as_json(self, incl_paths):
+        """
+        Get the JSON encoding of as_dict. The encoding is kept until the details change, the AS paths make up most of
+        the stored events and they are encoded once however many times the event is written.
+        """
+        if self._json is None or self._json[0] != incl_paths:
+            self._json = (incl_paths, json.dumps(self.as_dict(incl_paths)))
+        return self._json[1]
+
     def extract_attackers_victims(self):
         raise NotImplementedError
 
@@ -31,11 +31,14 @@
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
 from grip.utils.bgp import *
-from .details import PfxEventDetails
+from .details import PfxEventDetails, aspaths_from_dict
 
 
 class DefconDetails(PfxEventDetails):
 
+    __slots__ = ("_super_pfx", "_sub_pfx", "_origins_set", "_old_origins_set", "_super_aspaths", "_sub_aspaths",
+                 "_new_origins_set")
+
     def get_prefix_of_interest(self):
         return self._sub_pfx
 
@@ -47,8 +50,8 @@ class DefconDetails(PfxEventDetails):
         super_paths = ""
         sub_paths = ""
         if incl_paths:
-            super_paths = aspaths_as_str(self._super_aspaths)
-            sub_paths = aspaths_as_str(self._sub_aspaths)
+            super_paths = self._super_aspaths.as_str()
+            sub_paths = self._sub_aspaths.as_str()
 
         return {
             # prefixes
@@ -70,8 +73,8 @@ class DefconDetails(PfxEventDetails):
             sub_pfx=d["sub_pfx"],
             origins_set=set(d["origins"]),
             old_origins_set=set(d["old_origins"]),
-            super_aspaths=aspaths_from_str(d["super_aspaths"]),
-            sub_aspaths=aspaths_from_str(d["sub_aspaths"]),
+            super_aspaths=aspaths_from_dict(d, "super_aspaths"),
+            sub_aspaths=aspaths_from_dict(d, "sub_aspaths"),
         )
 
     def __init__(
@@ -90,15 +93,15 @@ class DefconDetails(PfxEventDetails):
 
         assert (isinstance(origins_set, set))
         assert (isinstance(old_origins_set, set))
-        assert (isinstance(super_aspaths, list))
-        assert (isinstance(sub_aspaths, list))
+        assert (isinstance(super_aspaths, (list, LazyAsPaths)))
+        assert (isinstance(sub_aspaths, (list, LazyAsPaths)))
 
-        self._super_pfx = super_pfx
-        self._sub_pfx = sub_pfx
-        self._origins_set = origins_set
+        self._super_pfx = intern_str(super_pfx)
+        self._sub_pfx = intern_str(sub_pfx)
+        self._origins_set = intern_asns(origins_set)
         self._old_origins_set = old_origins_set
-        self._super_aspaths = super_aspaths
-        self._sub_aspaths = sub_aspaths
+        self._super_aspaths = super_aspaths if isinstance(super_aspaths, LazyAsPaths) else LazyAsPaths(super_aspaths)
+        self._sub_aspaths = sub_aspaths if isinstance(sub_aspaths, LazyAsPaths) else LazyAsPaths(sub_aspaths)
 
         self._new_origins_set = self._origins_set - self._old_origins_set
 
@@ -113,19 +116,24 @@ class DefconDetails(PfxEventDetails):
 
     def get_all_aspaths(self):
         aspaths = []
-        aspaths.extend(self._super_aspaths)
-        aspaths.extend(self._sub_aspaths)
+        aspaths.extend(self._super_aspaths.get())
+        aspaths.extend(self._sub_aspaths.get())
         return aspaths
 
     def get_super_aspaths(self):
-        return self._super_aspaths
+        return self._super_aspaths.get()
 
     def get_sub_aspaths(self):
-        return self._sub_aspaths
+        return self._sub_aspaths.get()
+
+    def release_aspaths(self):
+        self._super_aspaths.release()
+        self._sub_aspaths.release()
 
     def set_old_origins(self, old_origins):
         assert (isinstance(old_origins, set))
         self._old_origins_set = old_origins
+        self.changed()
 
     def get_prefixes(self):
         return [self._super_pfx, self._sub_pfx]
@@ -32,10 +32,13 @@
 from collections import OrderedDict
 
 from grip.utils.bgp import *
-from .details import PfxEventDetails
+from .details import PfxEventDetails, ASPATHS_NOT_RETRIEVED
 
 
 class EdgesDetails(PfxEventDetails):
+
+    __slots__ = ("_as1", "_as2", "_edgeid", "_prefix", "_origins", "_aspaths_compressed")
+
     def get_previous_origins(self):
         pass
 
@@ -46,7 +49,7 @@ class EdgesDetails(PfxEventDetails):
         paths = ""
         paths_with_newedge = ""
         if incl_paths:
-            paths = decompress_aspaths_str(self._aspaths_compressed)
+            paths = self._get_aspaths_str()
             paths_with_newedge = aspaths_as_str(self.get_aspaths_with_newedge())
 
         return {
@@ -63,7 +66,8 @@ class EdgesDetails(PfxEventDetails):
             prefix=d["prefix"],
             as1=d["as1"],
             as2=d["as2"],
-            aspaths_str=d["aspaths"],
+            # the origins are extracted from the AS paths, neither is known if the paths were not retrieved
+            aspaths_str=(d["aspaths"] or "") if "aspaths" in d else None,
         )
 
     def __init__(
@@ -71,19 +75,24 @@ class EdgesDetails(PfxEventDetails):
             as1,
             as2,
             prefix,
-            aspaths_str: str,
+            aspaths_str,
     ):
         PfxEventDetails.__init__(self)
 
         assert isinstance(as1, int) and isinstance(as2, int)
-        assert isinstance(aspaths_str, str)
+        # None if the AS paths were not retrieved
+        assert aspaths_str is None or isinstance(aspaths_str, str)
 
         self._as1 = as1
         self._as2 = as2
         self._edgeid = "{}-{}".format(as1, as2)
-        self._prefix = prefix
-        self._origins = self._extract_origins(aspaths_str)
-        self._aspaths_compressed = compress_aspaths_str(aspaths_str)
+        self._prefix = intern_str(prefix)
+        if aspaths_str is None:
+            self._origins = None
+            self._aspaths_compressed = None
+        else:
+            self._origins = self._extract_origins(aspaths_str)
+            self._aspaths_compressed = compress_aspaths_str(aspaths_str)
 
     def get_ases(self):
         return {self._as1, self._as2}
@@ -102,7 +111,12 @@ class EdgesDetails(PfxEventDetails):
         return newedge_paths
 
     def get_as_paths(self):
-        return aspaths_from_str(decompress_aspaths_str(self._aspaths_compressed))
+        return aspaths_from_str(self._get_aspaths_str())
+
+    def _get_aspaths_str(self):
+        if self._aspaths_compressed is None:
+            raise ValueError(ASPATHS_NOT_RETRIEVED)
+        return decompress_aspaths_str(self._aspaths_compressed)
 
     def get_prefixes(self):
         return [self._prefix]
@@ -114,6 +128,8 @@ class EdgesDetails(PfxEventDetails):
         return set()
 
     def get_current_origins(self):
+        if self._origins is None:
+            raise ValueError(ASPATHS_NOT_RETRIEVED)
         return self._origins
 
     def get_as1(self):
@@ -155,7 +171,7 @@ class EdgesDetails(PfxEventDetails):
 
     def _extract_origins(self, aspath_str):
 
-        return {path[-1] for path in aspaths_from_str(aspath_str) if len(path) > 0}
+        return origins_from_aspaths_str(aspath_str)
 
     def extract_attackers_victims(self):
         """
@@ -31,11 +31,13 @@
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
 from grip.utils.bgp import *
-from .details import PfxEventDetails
+from .details import PfxEventDetails, aspaths_from_dict
 
 
 class MoasDetails(PfxEventDetails):
 
+    __slots__ = ("_prefix", "_origins", "_old_origins", "_aspaths", "_new_origins")
+
     def extract_attackers_victims(self):
         return self._new_origins, self._old_origins
 
@@ -55,7 +57,7 @@ class MoasDetails(PfxEventDetails):
     def as_dict(self, incl_paths):
         paths = ""
         if incl_paths:
-            paths = aspaths_as_str(self._aspaths)
+            paths = self._aspaths.as_str()
         return {
             "prefix": self._prefix,
             "origins": list(self._origins),
@@ -70,7 +72,7 @@ class MoasDetails(PfxEventDetails):
             prefix=d["prefix"],
             origins_set=set(d["origins"]),
             old_origins_set=set(d["old_origins"]),
-            aspaths=aspaths_from_str(d["aspaths"])
+            aspaths=aspaths_from_dict(d, "aspaths")
         )
 
     def __init__(
@@ -84,15 +86,16 @@ class MoasDetails(PfxEventDetails):
 
         # sanity check
         assert (isinstance(origins_set, set))
-        assert (isinstance(aspaths, list))  # aspaths should be list of lists of integers
+        # aspaths should be list of lists of ASNs, or the not yet decoded paths
+        assert (isinstance(aspaths, (list, LazyAsPaths)))
 
         if old_origins_set is None:
             old_origins_set = set()
 
-        self._prefix = prefix
-        self._origins = origins_set
+        self._prefix = intern_str(prefix)
+        self._origins = intern_asns(origins_set)
         self._old_origins = old_origins_set
-        self._aspaths = aspaths
+        self._aspaths = aspaths if isinstance(aspaths, LazyAsPaths) else LazyAsPaths(aspaths)
         self._new_origins = self._origins - self._old_origins
 
     def get_current_origins(self):
@@ -105,12 +108,19 @@ class MoasDetails(PfxEventDetails):
         return self._old_origins
 
     def get_aspaths(self):
-        return self._aspaths
+        return self._aspaths.get()
+
+    def get_indexed_aspaths(self):
+        return self._aspaths.get_indexed()
+
+    def release_aspaths(self):
+        self._aspaths.release()
 
     def set_old_origins(self, old_origins):
         assert (isinstance(old_origins, set))
         self._old_origins = old_origins
         self._new_origins = self._origins - self._old_origins
+        self.changed()
 
     def get_prefixes(self):
         return [self._prefix]
@@ -30,12 +30,16 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
-from grip.utils.bgp import aspaths_as_str, aspaths_from_str
-from .details import PfxEventDetails
+from grip.utils.bgp import LazyAsPaths, intern_asns, intern_str
+from .details import PfxEventDetails, aspaths_from_dict
 
 
 class SubmoasDetails(PfxEventDetails):
 
+    __slots__ = ("_super_pfx", "_sub_pfx", "_super_origins", "_sub_origins", "_super_old_origins", "_sub_old_origins",
+                 "_super_aspaths", "_sub_aspaths", "_all_origins_set", "_old_origins_set",
+                 "_new_origins_set", "_newcomer_pfxs")
+
     def get_origin_fingerprint(self):
         return "%s=%s" % (
             "_".join(sorted(self._super_origins)),
@@ -47,8 +51,8 @@ class SubmoasDetails(PfxEventDetails):
         super_paths = ""
         sub_paths = ""
         if incl_paths:
-            super_paths = aspaths_as_str(self._super_aspaths)
-            sub_paths = aspaths_as_str(self._sub_aspaths)
+            super_paths = self._super_aspaths.as_str()
+            sub_paths = self._sub_aspaths.as_str()
 
         return {
             # prefixes
@@ -75,8 +79,8 @@ class SubmoasDetails(PfxEventDetails):
             sub_origins=set(d["sub_origins"]),
             super_old_origins=set(d["super_old_origins"]),
             sub_old_origins=set(d["sub_old_origins"]),
-            super_aspaths=aspaths_from_str(d["super_aspaths"]),
-            sub_aspaths=aspaths_from_str(d["sub_aspaths"]),
+            super_aspaths=aspaths_from_dict(d, "super_aspaths"),
+            sub_aspaths=aspaths_from_dict(d, "sub_aspaths"),
         )
 
     def __init__(
@@ -101,17 +105,17 @@ class SubmoasDetails(PfxEventDetails):
         assert isinstance(sub_origins, set)
         assert isinstance(super_old_origins, set)
         assert isinstance(sub_old_origins, set)
-        assert isinstance(super_aspaths, list)
-        assert isinstance(sub_aspaths, list)
+        assert isinstance(super_aspaths, (list, LazyAsPaths))
+        assert isinstance(sub_aspaths, (list, LazyAsPaths))
 
-        self._super_pfx = super_pfx
-        self._sub_pfx = sub_pfx
-        self._super_origins = super_origins
-        self._sub_origins = sub_origins
+        self._super_pfx = intern_str(super_pfx)
+        self._sub_pfx = intern_str(sub_pfx)
+        self._super_origins = intern_asns(super_origins)
+        self._sub_origins = intern_asns(sub_origins)
         self._super_old_origins = super_old_origins
         self._sub_old_origins = sub_old_origins
-        self._super_aspaths = super_aspaths
-        self._sub_aspaths = sub_aspaths
+        self._super_aspaths = super_aspaths if isinstance(super_aspaths, LazyAsPaths) else LazyAsPaths(super_aspaths)
+        self._sub_aspaths = sub_aspaths if isinstance(sub_aspaths, LazyAsPaths) else LazyAsPaths(sub_aspaths)
 
         self._all_origins_set = self._super_origins.union(self._sub_origins)
 
@@ -147,15 +151,22 @@ class SubmoasDetails(PfxEventDetails):
 
     def get_all_aspaths(self):
         aspaths = []
-        aspaths.extend(self._super_aspaths)
-        aspaths.extend(self._sub_aspaths)
+        aspaths.extend(self._super_aspaths.get())
+        aspaths.extend(self._sub_aspaths.get())
         return aspaths
 
+    def get_indexed_all_aspaths(self):
+        return self._super_aspaths.get_indexed() + self._sub_aspaths.get_indexed()
+
+    def release_aspaths(self):
+        self._super_aspaths.release()
+        self._sub_aspaths.release()
+
     def get_sub_aspaths(self):
-        return self._sub_aspaths
+        return self._sub_aspaths.get()
 
     def get_super_aspaths(self):
-        return self._super_aspaths
+        return self._super_aspaths.get()
 
     def get_sub_origins(self):
         return self._sub_origins
@@ -256,6 +267,7 @@ class SubmoasDetails(PfxEventDetails):
             self._newcomer_pfxs.append(self._sub_pfx)
         if len(self._super_origins - self._super_old_origins) > 0:
             self._newcomer_pfxs.append(self._super_pfx)
+        self.changed()
 
     def get_prefixes(self):
         return [self._super_pfx, self._sub_pfx]
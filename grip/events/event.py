@@ -40,16 +40,34 @@ from grip.events.event_summary import EventSummary
 from grip.events.pfxevent import PfxEvent
 from grip.metrics.event_metrics import EventMetrics
 from grip.metrics.traceroute_metrics import TracerouteMetrics
-from grip.utils.general import to_dict, parse_ts
+from grip.utils.general import to_dict, parse_ts, dumps_with_encoded
 
 MAX_PFX_EVENTS = 1000  # only output AS path info for the first 1k pfx events
 PFX_EVENTS_ES_CUTOFF = 10000 # only output the first 10K affected pfxs to ES
 
+# Parts of the stored events to decode, for the consumers that only look at some of them. Each mode lists the fields
+# that are excluded from the ElasticSearch _source, so that they are not transferred at all:
+# - full: the whole event
+# - no_traceroutes: no traceroute measurements
+# - tags: prefix events with their tags, inferences and prefixes, but no AS paths or traceroute measurements. Using the
+#   AS paths raises a ValueError, as do the origins of edges events, which are extracted from their AS paths
+# - summary: the event fields and its stored summary, no prefix events
+HYDRATION_SOURCE_EXCLUDES = {
+    "full": [],
+    "no_traceroutes": ["pfx_events.traceroutes.msms"],
+    "tags": ["pfx_events.traceroutes.msms", "pfx_events.details.*aspaths*"],
+    "summary": ["pfx_events"],
+}
+
 class Event:
     """
     Event definition.
     """
 
+    __slots__ = ("event_type", "_pfx_events", "_pfx_event_dicts", "hydration", "position", "event_id", "view_ts",
+                 "finished_ts", "insert_ts", "last_modified_ts", "asinfo", "tr_metrics", "event_metrics", "debug",
+                 "summary")
+
     def __init__(
             self,
             # core fields
@@ -73,7 +91,10 @@ class Event:
     ):
         # basic
         self.event_type = event_type
-        self.pfx_events = pfx_events if pfx_events is not None else []
+        self._pfx_events = pfx_events if pfx_events is not None else []
+        # prefix events dicts not decoded yet, see from_dict
+        self._pfx_event_dicts = None
+        self.hydration = "full"
         self.position = position
         self.event_id = event_id
 
@@ -111,6 +132,26 @@ class Event:
 
         self.summary = EventSummary(self)
 
+    @property
+    def pfx_events(self):
+        if self._pfx_event_dicts is not None:
+            self._hydrate_pfx_events()
+        elif self.hydration == "summary":
+            raise ValueError("prefix events of event %s were not retrieved" % self.event_id)
+        return self._pfx_events
+
+    def _hydrate_pfx_events(self):
+        common = {
+            "event_type": self.event_type,
+            "view_ts": self.view_ts,
+            "position": self.position
+        }
+        pfx_event_dicts = self._pfx_event_dicts
+        self._pfx_event_dicts = None
+        for ped in pfx_event_dicts:
+            ped.update(common)
+            self._pfx_events.append(PfxEvent.from_dict(ped))
+
     def add_pfx_event(self, pfx_event):
         """
         Add one PfxEvent object to the event.
@@ -138,6 +179,16 @@ class Event:
         """
         Return the Event object as a dict.
         """
+        incl_paths, pfx_events = self._pfx_events_to_export()
+        return self._as_dict([pfx_event.as_dict(incl_paths=incl_paths) for pfx_event in pfx_events])
+
+    def _pfx_events_to_export(self):
+        """
+        Get whether to export the AS paths, and the prefix events to export.
+        """
+        if self.hydration != "full":
+            # the fields that were not retrieved would be lost
+            raise ValueError("event %s is partially decoded (%s)" % (self.event_id, self.hydration))
         new_events = [e for e in self.pfx_events if e.position == "NEW"]
 
         incl_paths = True
@@ -150,9 +201,9 @@ class Event:
             pfx_events_local = self.pfx_events[:PFX_EVENTS_ES_CUTOFF]
         else:
             pfx_events_local = self.pfx_events
+        return incl_paths, pfx_events_local
 
-        pfx_event_dicts = [pfx_event.as_dict(incl_paths=incl_paths) for pfx_event in pfx_events_local]
-
+    def _as_dict(self, pfx_event_dicts):
         # calculate event duration if finished_ts is set
         duration = self.finished_ts - self.view_ts if self.finished_ts else None
 
@@ -197,10 +248,15 @@ class Event:
         return event
 
     @staticmethod
-    def from_dict(d):
+    def from_dict(d, hydration="full"):
         """
         Extract a Event object from a dictionary.
+
+        Only full events have their summary re-calculated from their prefix events. With the other hydration modes (see
+        HYDRATION_SOURCE_EXCLUDES), the stored summary is used and the prefix events are decoded when they are first
+        accessed, if ever. Partially decoded events cannot be serialized again.
         """
+        assert hydration in HYDRATION_SOURCE_EXCLUDES
 
         # TODO: what's the purpose of this?
         def convert(data):
@@ -216,18 +272,21 @@ class Event:
 
         # d = convert(d)
 
-        pfx_events = d.pop("pfx_events")
+        pfx_events = d.pop("pfx_events", [])
         if "id" in d:
             d["event_id"] = d.pop("id")
 
-        try:
-            d.pop("duration")
-            d.pop("summary")  # pop summary field, we always re-calculate summary based on the existing information
-            d.pop("external")  # legacy field
-        except KeyError:
-            pass
+        d.pop("duration", None)
+        summary = d.pop("summary", None)
+        d.pop("external", None)  # legacy field
 
         event = Event(**d)
+        event.hydration = hydration
+        if hydration != "full":
+            event._pfx_event_dicts = pfx_events if hydration != "summary" else None
+            event.summary = EventSummary.from_dict(event, summary or {})
+            return event
+
         common = {
             "event_type": event.event_type,
             "view_ts": event.view_ts,
@@ -238,15 +297,28 @@ class Event:
             pe = PfxEvent.from_dict(ped)
             # do a direct append to avoid double-updating stats
             event.add_pfx_event(pe)
+        # we always re-calculate summary based on the existing information
         event.summary.update()
         return event
 
     def as_json(self):
         """
-        Convert the Event object to a single-line JSON string.
+        Convert the Event object to a single-line JSON string, same as encoding as_dict. The details of the prefix events,
+        with their AS paths, are encoded once until they change, see PfxEventDetails.as_json.
         """
-        d = self.as_dict()
-        return json.dumps(d)
+        incl_paths, pfx_events = self._pfx_events_to_export()
+        pfx_event_dicts = []
+        encoded = []
+        for pfx_event in pfx_events:
+            d, details = pfx_event.as_encoding_parts(incl_paths=incl_paths)
+            pfx_event_dicts.append(d)
+            encoded.extend(details)
+        d = self._as_dict(pfx_event_dicts)
+        try:
+            return dumps_with_encoded(d, encoded)
+        except ValueError:
+            # some other field holds the placeholder
+            return json.dumps(self.as_dict())
 
     def has_inference(self, inference_id: str):
         """
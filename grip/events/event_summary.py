@@ -30,8 +30,9 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
+from grip.inference.inference import Inference
 from grip.inference.inference_result import InferenceResult
-from grip.tagger.tags.tag import Tag
+from grip.tagger.tags.tag import Tag, TagSet, TAG_BITS, get_tags_mask
 from grip.tagger.tags import tagshelper
 
 
@@ -56,11 +57,15 @@ class EventSummary:
         self.prefixes = set()
         self.ases = set()
         self.newcomers = set()
-        self.tags = set()
+        self.tags = TagSet()
         self.tr_worthy = False
         self.inference_result = None
         self.attackers = set()
         self.victims = set()
+        # (details version, tags version) of the prefix events folded into the summary, and of the prefix events at
+        # the last update
+        self._folded = set()
+        self._stamps = None
 
     def clear_inference(self):
         self.inference_result = None
@@ -79,36 +84,82 @@ class EventSummary:
             "victims": list(self.victims),
         }
 
+    @staticmethod
+    def from_dict(event, d):
+        """
+        Restore the stored summary of an event whose prefix events are not decoded
+        """
+        summary = EventSummary(event)
+        summary.prefixes = set(d.get("prefixes", []))
+        summary.ases = set(d.get("ases", []))
+        summary.newcomers = set(d.get("newcomers", []))
+        summary.tags = TagSet(tag for tag in map(tagshelper.parse_tag, d.get("tags", [])) if tag)
+        summary.tr_worthy = d.get("tr_worthy", False)
+        inference_result = d.get("inference_result") or {}
+        summary.inference_result = InferenceResult(
+            inferences={Inference.from_dict(inference) for inference in inference_result.get("inferences", [])})
+        summary.attackers = set(d.get("attackers", []))
+        summary.victims = set(d.get("victims", []))
+        return summary
+
     def update(self):
         """
         Generate a summary for the event
+
+        The summary is updated incrementally: only the prefix events whose details or tags changed since the last
+        update are folded in again. Traceroute-worthiness and inferences are always collected from all prefix events.
         """
         assert self._event is not None
 
+        pfx_events = self._event.pfx_events
+        stamps = [(pfx_event.details.version, pfx_event.tags.version) for pfx_event in pfx_events]
         inference_set = set()
-        for pfx_event in self._event.pfx_events:
-            self.ases.update(pfx_event.details.get_current_origins())
-            self.tags.update(pfx_event.tags)
-            self.newcomers.update(pfx_event.details.get_new_origins())
-            self.prefixes.update(pfx_event.details.get_prefixes())
+        for pfx_event, stamp in zip(pfx_events, stamps):
+            if stamp not in self._folded:
+                self.ases.update(pfx_event.details.get_current_origins())
+                self.tags.update(pfx_event.tags)
+                self.newcomers.update(pfx_event.details.get_new_origins())
+                self.prefixes.update(pfx_event.details.get_prefixes())
+                self._folded.add(stamp)
             self.tr_worthy = self.tr_worthy | pfx_event.traceroutes["worthy"]
             inference_set.update(pfx_event.inferences)
 
-        self.attackers, self.victims = self._extract_attackers_victims()
+        if stamps != self._stamps:
+            self.attackers, self.victims = self._extract_attackers_victims()
+            self._stamps = stamps
         self.inference_result = InferenceResult(inferences=inference_set)
 
     def has_tag(self, tag, match_name_only=True):
         """
         check if summary has certain tag
         """
-        if isinstance(tag, str):
+        if isinstance(tag, str) and (tag not in TAG_BITS or not match_name_only):
+            # raises for undefined tags
             tag = tagshelper.get_tag(tag)
 
-        if match_name_only:
-            return tag.name in {t.name for t in self.tags}
-        else:
+        if not match_name_only:
             return tag in self.tags
 
+        name = tag if isinstance(tag, str) else tag.name
+        bit = TAG_BITS.get(name)
+        if bit is None:
+            return name in {t.name for t in self.tags}
+        return self.tags.mask & bit != 0
+
+    def has_any(self, tags):
+        """
+        check if summary has any of the tags
+        """
+        mask, _ = get_tags_mask(tags)
+        return self.tags.mask & mask != 0
+
+    def has_all(self, tags):
+        """
+        check if summary has all the tags
+        """
+        mask, all_registered = get_tags_mask(tags)
+        return all_registered and self.tags.has_mask(mask)
+
     def _extract_attackers_victims(self):
         """
         Infer the attackers and victims for an Event
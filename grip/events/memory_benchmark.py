@@ -0,0 +1,224 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+"""
+Measure with tracemalloc the memory held by the Event and PfxEvent objects of synthetic views: right after parsing the
+consumer lines, after a tagging-like pass over the prefix event details, and after reloading the events from their
+serialized dicts as the finisher and the retagger do. The CPU time of each step, and of serializing the events, is
+reported as well.
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from grip.events.event import Event
+from grip.events.pfxevent_parser import PfxEventParser
+from grip.utils.bgp import ASPATHS
+
+EVENT_TYPES = ["moas", "submoas", "defcon", "edges"]
+
+
+class SyntheticView:
+    """
+    Random consumer lines of one view. The AS paths are drawn from a fixed set of monitors and transit ASes, so that the
+    same ASNs appear on many paths as they do in real views.
+
+    In a busy view, the prefix events are caused by a few origins (e.g. a route leak or a hijack of many prefixes), and
+    each monitor reaches an origin on the same path for all its prefixes.
+    """
+
+    def __init__(self, rand, view_ts=1588205400, monitors=300, transits=2000, busy=False):
+        self.rand = rand
+        self.view_ts = view_ts
+        self.monitors = [str(rand.randint(1, 400000)) for _ in range(monitors)]
+        self.transits = [str(rand.randint(1, 65000)) for _ in range(transits)]
+        self.busy_origins = [str(rand.randint(1, 400000)) for _ in range(10)] if busy else None
+        # (monitor, origin) -> transit hops, in busy views
+        self.routes = {}
+
+    def prefix(self, length=24):
+        return "%d.%d.%d.0/%d" % (self.rand.randint(1, 223), self.rand.randint(0, 255), self.rand.randint(0, 255),
+                                  length)
+
+    def origin(self):
+        if self.busy_origins is not None:
+            return self.rand.choice(self.busy_origins)
+        return str(self.rand.randint(1, 400000))
+
+    def transit_hops(self, monitor, origin):
+        if self.busy_origins is None:
+            return [self.rand.choice(self.transits) for _ in range(self.rand.randint(1, 4))]
+        if (monitor, origin) not in self.routes:
+            self.routes[(monitor, origin)] = [self.rand.choice(self.transits) for _ in range(self.rand.randint(1, 4))]
+        return self.routes[(monitor, origin)]
+
+    def aspaths(self, origins, count):
+        paths = []
+        for monitor in self.rand.sample(self.monitors, count):
+            origin = self.rand.choice(origins)
+            hops = [monitor]
+            hops.extend(self.transit_hops(monitor, origin))
+            hops.append(origin)
+            paths.append(" ".join(hops))
+        return ":".join(paths)
+
+    def line(self, event_type, paths):
+        if event_type == "moas":
+            origins = [self.origin() for _ in range(2)]
+            return "%d|%s|NEW|%s" % (self.view_ts, self.prefix(), self.aspaths(origins, paths))
+        if event_type == "edges":
+            as1, as2 = self.origin(), self.origin()
+            return "%d|%s-%s|NEW|%s|%s" % (self.view_ts, as1, as2, self.prefix(),
+                                           self.aspaths([as1 + " " + as2], paths))
+        if event_type == "submoas":
+            super_origins, sub_origins = [self.origin()], [self.origin()]
+        else:
+            super_origins = sub_origins = [self.origin()]
+        return "%d|%s|%s|NEW|%s|%s|%s|%s" % (
+            self.view_ts, self.prefix(16), self.prefix(24), " ".join(super_origins), " ".join(sub_origins),
+            self.aspaths(super_origins, paths), self.aspaths(sub_origins, paths))
+
+    def lines(self, event_type, count, paths):
+        return [self.line(event_type, paths) for _ in range(count)]
+
+
+def build_events(event_type, lines):
+    # as the tagger does for each view
+    ASPATHS.new_table()
+    parser = PfxEventParser(event_type)
+    events = {}
+    for line in lines:
+        pfx_event = parser.parse_line(line)
+        if pfx_event is None:
+            continue
+        event_id = pfx_event.get_event_id()
+        if event_id not in events:
+            events[event_id] = Event.from_pfxevent(pfx_event)
+        events[event_id].add_pfx_event(pfx_event)
+    for event in events.values():
+        event.summary.update()
+    return list(events.values())
+
+
+def touch_details(events):
+    """
+    Read the prefixes, origins and AS paths of every prefix event, as the tagging methods do, and release the decoded
+    paths afterwards as Tagger.tag_event does
+    """
+    for event in events:
+        for pfx_event in event.pfx_events:
+            details = pfx_event.details
+            details.get_prefixes()
+            details.get_current_origins()
+            details.extract_attackers_victims()
+            if event.event_type == "moas":
+                details.get_indexed_aspaths()
+            elif event.event_type == "submoas":
+                details.get_indexed_all_aspaths()
+            elif event.event_type == "defcon":
+                details.get_all_aspaths()
+            else:
+                details.get_edge_positions_on_paths()
+            details.release_aspaths()
+
+
+def reload_events(events):
+    return [Event.from_dict(json.loads(json.dumps(event.as_dict()))) for event in events]
+
+
+def serialize_events(events):
+    for event in events:
+        event.as_json()
+
+
+def measure(func, *args):
+    """
+    Run func and return its result with the memory it still holds when it returns
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    res = func(*args)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return res, after - before
+
+
+def measure_time(func, *args):
+    """
+    Run func and return its result with the CPU time it took, without tracing memory allocations
+    """
+    start = time.process_time()
+    res = func(*args)
+    return res, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+    Measure the memory held by the events of synthetic views.
+    """)
+    parser.add_argument('-n', "--pfx-events", action="store", type=int, default=2000,
+                        help="Number of prefix events per view")
+    parser.add_argument('-p', "--paths", action="store", type=int, default=50,
+                        help="Number of AS paths per prefix event")
+    parser.add_argument('-s', "--seed", action="store", type=int, default=0,
+                        help="Random seed of the synthetic views")
+    parser.add_argument('-b', "--busy", action="store_true", default=False,
+                        help="Generate busy views, with prefix events of a few origins sharing their AS paths")
+    parser.add_argument('-t', "--event-types", action="store", nargs="+", default=EVENT_TYPES, choices=EVENT_TYPES,
+                        help="Event types of the views")
+
+    opts = parser.parse_args()
+
+    print("prefix events per view: %d, paths per prefix event: %d%s" % (opts.pfx_events, opts.paths,
+                                                                          ", busy views" if opts.busy else ""))
+    for event_type in opts.event_types:
+        lines = SyntheticView(random.Random(opts.seed), busy=opts.busy).lines(event_type, opts.pfx_events, opts.paths)
+        events, parsed = measure(build_events, event_type, lines)
+        _, touched = measure(touch_details, events)
+        reloaded_events, reloaded = measure(reload_events, events)
+        print("%-8s parsed: %7.2f MiB, tagging pass: +%7.2f MiB, reloaded: %7.2f MiB (%d events)" % (
+            event_type + ":", parsed / 2 ** 20, touched / 2 ** 20, reloaded / 2 ** 20, len(events)))
+
+        del events, reloaded_events
+        events, parse_time = measure_time(build_events, event_type, lines)
+        _, touch_time = measure_time(touch_details, events)
+        _, serialize_time = measure_time(serialize_events, events)
+        _, reload_time = measure_time(reload_events, events)
+        print("%-8s parsing: %7.3f s, tagging pass: %7.3f s, serializing: %7.3f s, reloading: %7.3f s" % (
+            "", parse_time, touch_time, serialize_time, reload_time))
+
+
+if __name__ == "__main__":
+    main()
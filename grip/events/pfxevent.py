@@ -35,7 +35,8 @@ import json
 from grip.active.ripe_atlas.ripe_atlas_msm import AtlasMeasurement
 from grip.inference.inference import Inference
 from grip.tagger.tags import tagshelper
-from grip.tagger.tags.tag import Tag
+from grip.tagger.tags.tag import Tag, TagSet, TAG_BITS, get_tags_mask
+from grip.utils.general import ENCODED_PLACEHOLDER, dumps_with_encoded
 from .details import PfxEventDetails
 from .details_defcon import DefconDetails
 from .details_edges import EdgesDetails
@@ -55,6 +56,10 @@ class PfxEvent:
     Prefix-event class.
     """
 
+    # events keep up to MAX_PFX_EVENTS prefix events each, avoid per-instance dicts
+    __slots__ = ("event_type", "position", "view_ts", "finished_ts", "details", "traceroutes", "extra", "_tags",
+                 "inferences")
+
     def __init__(
             self,
             # basic info, also contained in event object
@@ -94,7 +99,8 @@ class PfxEvent:
         
         tags = {t for t in tags if t}  # remove none tags
 
-        # parse measurements
+        # parse measurements, which might not have been retrieved (see Event.from_dict)
+        traceroutes.setdefault("msms", [])
         if any(isinstance(msm, dict) for msm in traceroutes["msms"]):
             traceroutes["msms"] = [AtlasMeasurement.from_dict(msm) for msm in traceroutes["msms"]]
 
@@ -124,6 +130,14 @@ class PfxEvent:
     def __repr__(self):
         return json.dumps(self.as_dict())
 
+    @property
+    def tags(self):
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags):
+        self._tags = tags if isinstance(tags, TagSet) else TagSet(tags)
+
     def get_event_id(self):
         """
         Extract the event ID instead of the prefix event ID. This is used for grouping prefix events to corresponding events.
@@ -148,6 +162,22 @@ class PfxEvent:
         """
         Convert current PfxEvent object into a dict
         """
+        return self._as_dict(self.details.as_dict(incl_paths))
+
+    def as_json(self, incl_paths=True):
+        """
+        Convert current PfxEvent object into a JSON string, same as encoding as_dict.
+        """
+        return dumps_with_encoded(*self.as_encoding_parts(incl_paths))
+
+    def as_encoding_parts(self, incl_paths=True):
+        """
+        Get the parts to encode the PfxEvent object with dumps_with_encoded: the dict with a placeholder for the
+        details, and the JSON encoding of the details, which is kept until they change.
+        """
+        return self._as_dict(ENCODED_PLACEHOLDER), [self.details.as_json(incl_paths)]
+
+    def _as_dict(self, details):
         attackers, victims = self.details.extract_attackers_victims()
 
         d = {
@@ -155,7 +185,7 @@ class PfxEvent:
             "view_ts": self.view_ts,
             "finished_ts": self.finished_ts,
             "position": self.position,
-            "details": self.details.as_dict(incl_paths),
+            "details": details,
             "traceroutes": {
                 "worthy": self.traceroutes["worthy"],
                 "worthy_tags": self.traceroutes["worthy_tags"],
@@ -197,10 +227,32 @@ class PfxEvent:
         :return: True if prefix event has the given tag
         """
         if isinstance(tag, str):
-            tag = tagshelper.get_tag(tag, raise_error=False)
-            if tag is None:
+            bit = TAG_BITS.get(tag)
+            if bit is None:
                 return False
-        return tag.name in [t.name for t in self.tags]
+        else:
+            bit = TAG_BITS.get(tag.name)
+            if bit is None:
+                return tag.name in {t.name for t in self.tags}
+        return self.tags.mask & bit != 0
+
+    def has_any(self, tags):
+        """
+        Check whether the prefix event has any of the given tags
+        :param tags: tags represented by either strings or Tag objects
+        :return: True if prefix event has some of the given tags
+        """
+        mask, _ = get_tags_mask(tags)
+        return self.tags.mask & mask != 0
+
+    def has_all(self, tags):
+        """
+        Check whether the prefix event has all the given tags
+        :param tags: tags represented by either strings or Tag objects
+        :return: True if prefix event has all the given tags
+        """
+        mask, all_registered = get_tags_mask(tags)
+        return all_registered and self.tags.has_mask(mask)
 
     def add_inferences(self, inferences):
         """
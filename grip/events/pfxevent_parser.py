@@ -30,9 +30,10 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
+import collections
 import logging
 
-from grip.utils.bgp import aspaths_from_str, origins_from_str
+from grip.utils.bgp import LazyAsPaths, origins_from_aspaths_str, origins_from_str
 from .details_defcon import DefconDetails
 from .details_edges import EdgesDetails
 from .details_moas import MoasDetails
@@ -64,6 +65,31 @@ class PfxEventParser:
         self.parse_func = parsers[event_type]
         self.is_caching = is_caching
 
+        # edges only: for each new edge seen in the parsed lines, [d1, d2] where d1==1 indicates that the edge has been
+        # seen in the exact direction on some path and d2==1 that it has been seen in the opposite direction
+        self.bi_edges_info = collections.defaultdict(lambda: [0, 0])
+
+    def _update_bi_edges_info(self, edgeid, as1, as2, aspathstr):
+        directions = self.bi_edges_info[edgeid]
+        if directions == [1, 1]:
+            return
+        for aspath in aspathstr.split(":"):
+            if not aspath:
+                continue
+            hops = aspath.split(" ")
+            forward = False
+            backward = False
+            for hop, next_hop in zip(hops, hops[1:]):
+                if hop == as1 and next_hop == as2:
+                    forward = True
+                    break
+                if hop == as2 and next_hop == as1:
+                    backward = True
+            if forward:
+                directions[0] = 1
+            elif backward:
+                directions[1] = 1
+
     def parse_line(self, line):
         return self.parse_func(line)
 
@@ -82,15 +108,14 @@ class PfxEventParser:
             # logging.error("unknown pfxevent position: {}".format(position))
             return None
 
-        aspaths = aspaths_from_str(aspathstr)
-        origins_set = {aspath[-1] for aspath in aspaths}
+        # the paths are decoded when the prefix event is tagged
+        origins_set = origins_from_aspaths_str(aspathstr)
         if position == "NEW" and not origins_set:
             logging.warning("unknown origins: {}".format(line))
             logging.warning("this is likely to be caused by only AS set segments existing in all AS paths")
             return None
 
-        if self.is_caching:
-            aspaths = []
+        aspaths = [] if self.is_caching else LazyAsPaths(aspathstr)
 
         return PfxEvent(
             event_type="moas",
@@ -131,13 +156,17 @@ class PfxEventParser:
             except ValueError:
                 raise ValueError("Invalid NewEdge event line: %s" % line)
 
+        (as1, as2) = edgeid.split("-")
+        if position == "NEW" and not self.is_caching:
+            # all new edges lines count for bidirectional edges, including the ones skipped below
+            self._update_bi_edges_info(edgeid, as1, as2, aspathstr)
+
         if prefix and _should_skip_prefix_event([prefix]):
             return None
 
         if position != "NEW" and position != "FINISHED":
             return None
 
-        (as1, as2) = edgeid.split("-")
         if self.is_caching:
             aspathstr=""
 
@@ -178,8 +207,8 @@ class PfxEventParser:
             sub_aspaths = []
             super_aspaths = []
         else:
-            sub_aspaths = aspaths_from_str(sub_aspaths_str)
-            super_aspaths = aspaths_from_str(super_aspaths_str)
+            sub_aspaths = LazyAsPaths(sub_aspaths_str)
+            super_aspaths = LazyAsPaths(super_aspaths_str)
 
         return PfxEvent(
             event_type="submoas",
@@ -227,8 +256,8 @@ class PfxEventParser:
             sub_aspaths = []
             super_aspaths = []
         else:
-            sub_aspaths = aspaths_from_str(sub_aspaths_str)
-            super_aspaths = aspaths_from_str(super_aspaths_str)
+            sub_aspaths = LazyAsPaths(sub_aspaths_str)
+            super_aspaths = LazyAsPaths(super_aspaths_str)
 
         # super-prefix origins and as paths
         super_origins = origins_from_str(super_origins_str)
@@ -0,0 +1,155 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+import copy
+import json
+from unittest import TestCase
+
+from grip.events.event import Event, HYDRATION_SOURCE_EXCLUDES
+from grip.events.pfxevent_parser import PfxEventParser
+from grip.events.test_pfxevent import MOAS_LINE, SUBMOAS_LINE, EDGES_LINE
+from grip.utils.general import ENCODED_PLACEHOLDER
+
+
+def exclude_source_fields(d, excludes):
+    """
+    Drop the fields as the ElasticSearch _source filtering does, for the patterns used in HYDRATION_SOURCE_EXCLUDES
+    """
+    d = copy.deepcopy(d)
+    for pattern in excludes:
+        *path, last = pattern.split(".")
+        objs = [d]
+        for key in path:
+            objs = [o for obj in objs for o in (obj[key] if isinstance(obj[key], list) else [obj[key]])]
+        for obj in objs:
+            for key in list(obj):
+                if key == last or (last.startswith("*") and last.strip("*") in key):
+                    del obj[key]
+    return d
+
+
+def sorted_summary(d):
+    """
+    Summary dict with its lists sorted, the lists are exported from sets in no particular order
+    """
+    return {key: sorted(value, key=json.dumps) if isinstance(value, list) else value for key, value in d.items()}
+
+
+class TestEvent(TestCase):
+
+    def setUp(self):
+        self.events = []
+        for event_type, line in [("moas", MOAS_LINE), ("submoas", SUBMOAS_LINE)]:
+            pfx_event = PfxEventParser(event_type).parse_line(line)
+            pfx_event.add_tags(["all-newcomers"])
+            event = Event.from_pfxevent(pfx_event)
+            event.set_pfx_events([pfx_event])
+            # as stored in ElasticSearch
+            self.events.append(json.loads(json.dumps(event.as_dict())))
+
+    def test_full(self):
+        for d in self.events:
+            event = Event.from_dict(copy.deepcopy(d))
+            self.assertEqual("full", event.hydration)
+            self.assertEqual(d["pfx_events"], [pfx_event.as_dict() for pfx_event in event.pfx_events])
+            self.assertEqual(sorted_summary(d["summary"]), sorted_summary(event.summary.as_dict()))
+
+    def test_partial(self):
+        for d in self.events:
+            full = Event.from_dict(copy.deepcopy(d))
+            for hydration in ["no_traceroutes", "tags", "summary"]:
+                event = Event.from_dict(exclude_source_fields(d, HYDRATION_SOURCE_EXCLUDES[hydration]), hydration)
+                self.assertEqual(hydration, event.hydration)
+                self.assertEqual(sorted_summary(full.summary.as_dict()), sorted_summary(event.summary.as_dict()))
+                self.assertTrue(event.summary.has_tag("all-newcomers"))
+                with self.assertRaises(ValueError):
+                    event.as_dict()
+                if hydration == "summary":
+                    with self.assertRaises(ValueError):
+                        event.pfx_events
+                    continue
+
+                # prefix events are decoded on access
+                self.assertIsNotNone(event._pfx_event_dicts)
+                pfx_event, full_pfx_event = event.pfx_events[0], full.pfx_events[0]
+                self.assertIsNone(event._pfx_event_dicts)
+                self.assertTrue(pfx_event.has_tag("all-newcomers"))
+                self.assertEqual(full_pfx_event.details.get_prefixes(), pfx_event.details.get_prefixes())
+                self.assertEqual(full_pfx_event.details.get_current_origins(),
+                                 pfx_event.details.get_current_origins())
+                self.assertEqual([], pfx_event.traceroutes["msms"])
+                if hydration == "tags":
+                    # no AS paths were retrieved, using them raises
+                    details = pfx_event.details
+                    with self.assertRaises(ValueError):
+                        details.get_aspaths() if event.event_type == "moas" else details.get_all_aspaths()
+                else:
+                    self.assertEqual(full_pfx_event.details.as_dict(True), pfx_event.details.as_dict(True))
+
+    def test_partial_edges(self):
+        pfx_event = PfxEventParser("edges").parse_line(EDGES_LINE)
+        event = Event.from_pfxevent(pfx_event)
+        event.set_pfx_events([pfx_event])
+        d = json.loads(json.dumps(event.as_dict()))
+
+        event = Event.from_dict(exclude_source_fields(d, HYDRATION_SOURCE_EXCLUDES["tags"]), "tags")
+        details = event.pfx_events[0].details
+        self.assertEqual(pfx_event.details.get_prefixes(), details.get_prefixes())
+        # the origins of edges events are extracted from their AS paths, which were not retrieved
+        with self.assertRaises(ValueError):
+            details.get_as_paths()
+        with self.assertRaises(ValueError):
+            details.get_current_origins()
+
+    def test_as_json(self):
+        for d in self.events:
+            event = Event.from_dict(copy.deepcopy(d))
+            self.assertEqual(json.dumps(event.as_dict()), event.as_json())
+
+            # changes are encoded
+            pfx_event = event.pfx_events[0]
+            pfx_event.add_tags(["less-origins"])
+            if event.event_type == "moas":
+                pfx_event.details.set_old_origins({"13335"})
+            else:
+                pfx_event.details.set_old_origins({"13335"}, set())
+            event.summary.update()
+            encoded = event.as_json()
+            self.assertEqual(json.dumps(event.as_dict()), encoded)
+            stored = json.loads(encoded)
+            self.assertIn({"name": "less-origins", "count": 1}, stored["event_metrics"]["per_tag_cnt"])
+            self.assertIn("less-origins", [t["name"] for t in stored["summary"]["tags"]])
+            self.assertIn("13335", json.dumps(stored["pfx_events"][0]["details"]))
+
+            # values that look like the encoding placeholder
+            event.debug["note"] = ENCODED_PLACEHOLDER
+            self.assertEqual(json.dumps(event.as_dict()), event.as_json())
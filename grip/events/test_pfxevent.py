@@ -151,6 +151,34 @@ class TestPfxEvent(TestCase):
         self.assertIsInstance(PfxEvent.from_dict(self.defcon_pfx_event.as_dict()), PfxEvent)
         self.assertIsInstance(PfxEvent.from_dict(self.edges_pfx_event.as_dict()), PfxEvent)
 
+    def test_lazy_details(self):
+        parsed = [self.moas_pfx_event, self.submoas_pfx_event, self.defcon_pfx_event]
+        reloaded = [PfxEvent.from_dict(pfx_event.as_dict()) for pfx_event in parsed]
+        for pfx_event, reloaded_event in zip(parsed, reloaded):
+            # the paths are serialized without being decoded
+            self.assertEqual(pfx_event.as_dict(), reloaded_event.as_dict())
+            self.assertFalse(hasattr(pfx_event, "__dict__"))
+            self.assertFalse(hasattr(pfx_event.details, "__dict__"))
+
+        moas, submoas, defcon = reloaded
+        aspaths = moas.details.get_aspaths()
+        self.assertEqual({path[-1] for path in aspaths}, moas.details.get_current_origins())
+        self.assertIs(aspaths, moas.details.get_aspaths())
+        self.assertEqual(len(aspaths), len(moas.details.get_indexed_aspaths()))
+        moas.details.release_aspaths()
+        self.assertIsNot(aspaths, moas.details.get_aspaths())
+        self.assertEqual(aspaths, moas.details.get_aspaths())
+
+        for pfx_event in [submoas, defcon]:
+            sub_aspaths = pfx_event.details.get_sub_aspaths()
+            pfx_event.details.release_aspaths()
+            self.assertEqual(sub_aspaths, pfx_event.details.get_sub_aspaths())
+            self.assertEqual(self.submoas_pfx_event.as_dict() if pfx_event is submoas else
+                             self.defcon_pfx_event.as_dict(), pfx_event.as_dict())
+
+        # prefixes and origins are shared between the prefix events
+        self.assertIs(moas.details.get_prefix_of_interest(), self.moas_pfx_event.details.get_prefix_of_interest())
+
     def test_add_tags(self):
         tags_set = {
             tagshelper.get_tag("all-newcomers"),
@@ -167,3 +195,58 @@ class TestPfxEvent(TestCase):
         self.moas_pfx_event = PfxEventParser("moas").parse_line(MOAS_LINE)
         self.moas_pfx_event.add_tags([tag.name for tag in tags_set])
         self.assertEqual(self.moas_pfx_event.tags, tags_set)
+
+    def test_has_tags(self):
+        pfx_event = PfxEventParser("moas").parse_line(MOAS_LINE)
+        pfx_event.add_tags(["all-newcomers", "no-newcomer"])
+        self.assertTrue(pfx_event.has_tag("all-newcomers"))
+        self.assertTrue(pfx_event.has_tag(tagshelper.get_tag("no-newcomer")))
+        self.assertFalse(pfx_event.has_tag("less-origins"))
+        self.assertFalse(pfx_event.has_tag("undefined-tag"))
+        self.assertTrue(pfx_event.has_any(["less-origins", "no-newcomer"]))
+        self.assertFalse(pfx_event.has_any(["less-origins", "undefined-tag"]))
+        self.assertTrue(pfx_event.has_all(["all-newcomers", "no-newcomer"]))
+        self.assertFalse(pfx_event.has_all(["all-newcomers", "less-origins"]))
+        self.assertFalse(pfx_event.has_all(["all-newcomers", "undefined-tag"]))
+
+        # removing and replacing tags
+        pfx_event.tags.discard(tagshelper.get_tag("no-newcomer"))
+        self.assertFalse(pfx_event.has_tag("no-newcomer"))
+        pfx_event.tags = {tagshelper.get_tag("less-origins")}
+        self.assertTrue(pfx_event.has_all(["less-origins"]))
+        self.assertFalse(pfx_event.has_tag("all-newcomers"))
+
+    def test_shared_plain_tags(self):
+        tag = tagshelper.get_tag("all-newcomers")
+        self.assertIs(tag, tagshelper.parse_tag("all-newcomers"))
+        self.assertIs(tag, tagshelper.parse_tag({"name": "all-newcomers"}))
+        with self.assertRaises(AttributeError):
+            tag.name = "no-newcomer"
+        self.assertEqual({"name": "all-newcomers"}, tag.as_dict())
+
+
+class TestPfxEventParserBiEdges(TestCase):
+
+    def test_bi_edges_info(self):
+        parser = PfxEventParser("edges")
+        lines = [
+            # exact direction
+            "1588205400|100-200|NEW|10.0.0.0/24|1 100 200 3:4 5",
+            # opposite direction, on an IPv6 prefix skipped by the parser
+            "1588205400|100-200|NEW|2001:db8::/32|7 200 100",
+            # substring matches only ("1100 2009", "300 4001"), not the edge itself
+            "1588205400|300-400|NEW|10.0.1.0/24|1100 2009:300 4001",
+            "1588205400|500-600|NEW|10.0.2.0/24|600 500",
+            "1588205400|700-800|FINISHED|10.0.3.0/24",
+        ]
+        for line in lines:
+            parser.parse_line(line)
+        self.assertEqual(parser.bi_edges_info["100-200"], [1, 1])
+        self.assertEqual(parser.bi_edges_info["300-400"], [0, 0])
+        self.assertEqual(parser.bi_edges_info["500-600"], [0, 1])
+        self.assertNotIn("700-800", parser.bi_edges_info)
+
+    def test_bi_edges_info_caching(self):
+        parser = PfxEventParser("edges", is_caching=True)
+        parser.parse_line("1588205400|100-200|NEW|10.0.0.0/24|1 100 200 3")
+        self.assertEqual(len(parser.bi_edges_info), 0)
@@ -298,8 +298,7 @@ class InferenceEngine:
         #                )
         #            )
 
-        if pfx_event.has_tag("submoas-covered-by-moas-subpfx") or \
-                pfx_event.has_tag("submoas-covered-by-moas-superpfx"):
+        if pfx_event.has_any(["submoas-covered-by-moas-subpfx", "submoas-covered-by-moas-superpfx"]):
             inferences.append(
                 Inference(
                     inference_id="hide-submoas-covered-by-moas",
@@ -310,7 +309,7 @@ class InferenceEngine:
                 )
             )
 
-        if pfx_event.has_tag("no-newcomer") and pfx_event.has_tag("less-origins"):
+        if pfx_event.has_all(["no-newcomer", "less-origins"]):
             inferences.append(
                 Inference(
                     inference_id="hide-shrinking-event",
@@ -438,7 +437,7 @@ class InferenceEngine:
 
         inferences = []
 
-        if pfx_event.has_tag("newcomer-all-siblings") or pfx_event.has_tag("all-siblings"):
+        if pfx_event.has_any(["newcomer-all-siblings", "all-siblings"]):
             inferences.append(
                 Inference(
                     inference_id="sibling-origins",
@@ -695,9 +694,8 @@ class InferenceEngine:
 
         inferences = []
 
-        if not pfx_event.has_tag("new-bidirectional") and \
-           not pfx_event.has_tag("adj-previously-observed-exact") and \
-           not pfx_event.has_tag("adj-previously-observed-opposite"):
+        if not pfx_event.has_any(["new-bidirectional", "adj-previously-observed-exact",
+                                  "adj-previously-observed-opposite"]):
             inferences.append(
                 Inference(
                     inference_id="new-one-direction-edge",
@@ -720,8 +718,7 @@ class InferenceEngine:
 
         inferences = []
 
-        if pfx_event.has_tag("all-newcomers-next-to-an-oldcomer") \
-                and pfx_event.has_tag("newcomer-small-asn"):
+        if pfx_event.has_all(["all-newcomers-next-to-an-oldcomer", "newcomer-small-asn"]):
             inferences.append(
                 Inference(
                     inference_id="misconfig-fatfinger-prepend",
@@ -207,8 +207,9 @@ class MacroInferencer:
     def update_cache(self, query):
         added_ts = set()
         cur_ts = None
+        # the cached events are only read, their traceroute measurements are never used
         for ev in self.esconn.search_generator(index=self.esindex_read, query=query, 
-                                               timeout='30m'):
+                                               timeout='30m', hydration="no_traceroutes"):
             if ev.view_ts != cur_ts:
                 cur_ts = ev.view_ts
                 added_ts.add(cur_ts)
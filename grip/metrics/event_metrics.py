@@ -53,6 +53,9 @@ class EventMetrics:
         self.proc_time_driver = proc_time_driver
         self.proc_time_inference = proc_time_inference
 
+        # versions of the tags of the prefix events that per_tag_cnt was counted from
+        self._tags_stamp = None
+
     @staticmethod
     def from_dict(d):
         return EventMetrics(**d)
@@ -66,7 +69,6 @@ class EventMetrics:
         self.total_tags_cnt = len(event.summary.tags)
         self.pfx_events_with_tr_cnt = 0
 
-        tag_cnt_dict = {}
         for pfx_event in event.pfx_events:
             try:
                 msms = pfx_event.traceroutes["msms"]
@@ -77,6 +79,15 @@ class EventMetrics:
                 logging.warning("unable to check pfx event measurements availability: {}".format(
                     pfx_event.as_dict(incl_paths=False)["traceroutes"]
                 ))
+
+        # count the tags again only if some changed since the last update
+        tags_stamp = [pfx_event.tags.version for pfx_event in event.pfx_events]
+        if tags_stamp == self._tags_stamp:
+            return
+        self._tags_stamp = tags_stamp
+
+        tag_cnt_dict = {}
+        for pfx_event in event.pfx_events:
             for tag in pfx_event.tags:
                 tag = tag.name
                 count = tag_cnt_dict.get(tag, 0)
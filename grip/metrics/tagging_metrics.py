@@ -0,0 +1,203 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+import functools
+import threading
+import time
+
+# tagging methods of TaggingMethodology whose calls are timed
+INSTRUMENTED_METHODS = [
+    "asn_is_Tier1",
+    "tag_newcomer_origins",
+    "tag_prefixes",
+    "tag_asns",
+    "tag_historical",
+    "tag_fat_finger",
+    "tag_paths",
+    "tag_rpki",
+    "tag_irr",
+    "tag_relationships",
+    "tag_common_hops",
+    "tag_hegemony",
+    "tag_end_of_paths",
+    "tag_notags",
+    "tag_submoas",
+    "tag_defcon",
+    "tag_edges",
+]
+
+# datasets that query a remote service while tagging: the redis stores, and the hegemony web API for the scores that
+# are not loaded in memory
+REMOTE_DATASETS = ["pfx2asn_newcomer", "pfx2asn_historical", "adjacencies", "hegemony"]
+
+
+class TaggingMetrics:
+    """
+    per-view metrics of the tagging methods: wall time and number of calls of each method, hit ratio of the
+    per-view caches, and number and wall time of round trips to remote datasets (redis commands and pipeline
+    executions, web API requests).
+
+    the time of a method does not include the time of the timed methods it calls, and a round trip made while
+    another one is timed is not counted again, so that the totals add up to the real time.
+    """
+
+    def __init__(self):
+        # tagging may run on multiple worker threads
+        self._lock = threading.Lock()
+        # per-thread time of the timed calls nested in the current one, and whether a round trip is being timed
+        self._local = threading.local()
+        self.method_calls = {}
+        self.method_time = {}
+        self.cache_hits = {}
+        self.cache_misses = {}
+        self.round_trips = {}
+        self.round_trip_time = {}
+
+    def reset(self):
+        with self._lock:
+            self.method_calls = {}
+            self.method_time = {}
+            self.cache_hits = {}
+            self.cache_misses = {}
+            self.round_trips = {}
+            self.round_trip_time = {}
+
+    def record_call(self, name, duration):
+        with self._lock:
+            self.method_calls[name] = self.method_calls.get(name, 0) + 1
+            self.method_time[name] = self.method_time.get(name, 0.0) + duration
+
+    def record_cache(self, name, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits[name] = self.cache_hits.get(name, 0) + 1
+            else:
+                self.cache_misses[name] = self.cache_misses.get(name, 0) + 1
+
+    def record_round_trip(self, name, duration):
+        with self._lock:
+            self.round_trips[name] = self.round_trips.get(name, 0) + 1
+            self.round_trip_time[name] = self.round_trip_time.get(name, 0.0) + duration
+
+    def timed(self, name, func):
+        """
+        wrap a function so that its calls are recorded under the given name, without the time of the timed calls
+        nested in them
+        """
+        local = self._local
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            outer_nested_time = getattr(local, "nested_time", 0.0)
+            local.nested_time = 0.0
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                self.record_call(name, duration - local.nested_time)
+                local.nested_time = outer_nested_time + duration
+        return wrapper
+
+    def counted(self, name, func):
+        """
+        wrap a function so that each call is recorded as a round trip to the given dataset, unless it is made by
+        another call recorded as a round trip
+        """
+        local = self._local
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(local, "in_round_trip", False):
+                return func(*args, **kwargs)
+            local.in_round_trip = True
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                local.in_round_trip = False
+                self.record_round_trip(name, time.perf_counter() - start)
+        return wrapper
+
+    def count_redis(self, name, client):
+        """
+        record each command sent by a redis client, and each execution of the pipelines it creates from now on, as a
+        round trip to the given dataset. Commands queued on a pipeline are not sent until it is executed.
+        """
+        client.execute_command = self.counted(name, client.execute_command)
+        pipeline = client.pipeline
+
+        @functools.wraps(pipeline)
+        def counted_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            pipe.execute = self.counted(name, pipe.execute)
+            return pipe
+        client.pipeline = counted_pipeline
+
+    def count_round_trips(self, name, dataset):
+        """
+        record the round trips of a remote dataset where its I/O happens: the redis client of the redis stores, and
+        the _request method of the datasets querying a web API
+        """
+        rh = getattr(dataset, "rh", None)
+        if rh is not None:
+            self.count_redis(name, rh.red)
+        if hasattr(dataset, "_request"):
+            dataset._request = self.counted(name, dataset._request)
+
+    def as_dict(self):
+        with self._lock:
+            caches = []
+            for name in sorted(set(self.cache_hits) | set(self.cache_misses)):
+                hits = self.cache_hits.get(name, 0)
+                misses = self.cache_misses.get(name, 0)
+                caches.append({"name": name, "hits": hits, "misses": misses,
+                               "hit_ratio": hits / (hits + misses)})
+            return {
+                "methods": [{"name": name, "calls": self.method_calls[name], "time": self.method_time[name]}
+                            for name in sorted(self.method_calls)],
+                "caches": caches,
+                "round_trips": [{"name": name, "count": count, "time": self.round_trip_time[name]}
+                                for name, count in sorted(self.round_trips.items())],
+            }
+
+    def summary_str(self):
+        """
+        one line summary of the metrics for logging, methods sorted by total time
+        """
+        d = self.as_dict()
+        methods = sorted(d["methods"], key=lambda m: m["time"], reverse=True)
+        parts = ["{}: {:.3f}s/{}".format(m["name"], m["time"], m["calls"]) for m in methods]
+        parts += ["cache {}: {:.0%} of {}".format(c["name"], c["hit_ratio"], c["hits"] + c["misses"])
+                  for c in d["caches"]]
+        parts += ["round trips {}: {:.3f}s/{}".format(r["name"], r["time"], r["count"]) for r in d["round_trips"]]
+        return "; ".join(parts)
@@ -0,0 +1,199 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import time
+from unittest import TestCase
+
+from grip.metrics.tagging_metrics import TaggingMetrics
+from grip.tagger.methods import TaggingMethodology
+
+
+class StubAsRank:
+    def get_org_id(self, asn):
+        return None
+
+    def get_degree(self, asn):
+        return None
+
+    def get_registered_country(self, asn):
+        return None
+
+    def get_relationship(self, asn0, asn1):
+        return None
+
+    def in_customer_cone(self, asn0, asn1):
+        return False
+
+    def is_sole_provider(self, asn_provider, asn_customer):
+        return False
+
+
+class StubFriends:
+    def get_friend_groups(self, asn):
+        return set()
+
+
+class StubPipeline:
+    def __init__(self):
+        self.commands = []
+
+    def zrangebyscore(self, key, minscore, maxscore):
+        self.commands.append(key)
+
+    def execute(self):
+        return [[] for _ in self.commands]
+
+
+class StubRedis:
+    def execute_command(self, *args):
+        return []
+
+    def zrangebyscore(self, key, minscore, maxscore):
+        return self.execute_command("ZRANGEBYSCORE", key, minscore, maxscore)
+
+    def pipeline(self, transaction=True):
+        return StubPipeline()
+
+
+class StubRedisHelper:
+    def __init__(self):
+        self.red = StubRedis()
+
+
+class StubPfx2As:
+    """
+    redis store with one command per lookup, and one pipeline per batch of prefixes for lookup_many
+    """
+
+    def __init__(self):
+        self.rh = StubRedisHelper()
+
+    def lookup(self, prefix):
+        return self.rh.red.zrangebyscore(prefix, "-inf", "+inf")
+
+    def lookup_many(self, prefixes, batch_size=2):
+        results = []
+        for start in range(0, len(prefixes), batch_size):
+            pipe = self.rh.red.pipeline(transaction=False)
+            for prefix in prefixes[start:start + batch_size]:
+                pipe.zrangebyscore(prefix, "-inf", "+inf")
+            results += pipe.execute()
+        return results
+
+
+class StubHegemony:
+    """
+    web API with the scores in memory after the first query
+    """
+
+    def __init__(self):
+        self.scores = None
+
+    def _request(self, url):
+        return {}
+
+    def query_hegemony(self, asns):
+        if self.scores is None:
+            self._request("https://example.org/hegemony")
+            self.scores = {}
+        return {asn: self.scores.get(asn, 0) for asn in asns}
+
+
+class TestTaggingMetrics(TestCase):
+
+    def test_metrics(self):
+        metrics = TaggingMetrics()
+        metrics.timed("tag_a", lambda: time.sleep(0.01))()
+        metrics.timed("tag_a", lambda: None)()
+        metrics.record_cache("tag_a", True)
+        metrics.record_cache("tag_a", True)
+        metrics.record_cache("tag_a", False)
+        metrics.record_round_trip("store", 0.5)
+        d = metrics.as_dict()
+        self.assertEqual(2, d["methods"][0]["calls"])
+        self.assertGreaterEqual(d["methods"][0]["time"], 0.01)
+        self.assertEqual([{"name": "tag_a", "hits": 2, "misses": 1, "hit_ratio": 2 / 3}], d["caches"])
+        self.assertEqual([{"name": "store", "count": 1, "time": 0.5}], d["round_trips"])
+        metrics.reset()
+        self.assertEqual({"methods": [], "caches": [], "round_trips": []}, metrics.as_dict())
+
+    def test_nested(self):
+        metrics = TaggingMetrics()
+        inner = metrics.timed("tag_inner", lambda: time.sleep(0.02))
+        start = time.perf_counter()
+        metrics.timed("tag_outer", lambda: [inner(), inner()])()
+        total = time.perf_counter() - start
+        methods = {m["name"]: m for m in metrics.as_dict()["methods"]}
+        self.assertEqual(2, methods["tag_inner"]["calls"])
+        self.assertGreaterEqual(methods["tag_inner"]["time"], 0.04)
+        # the time of the nested calls is not counted twice
+        self.assertLess(methods["tag_outer"]["time"], 0.01)
+        self.assertLessEqual(methods["tag_outer"]["time"] + methods["tag_inner"]["time"], total)
+
+        # a round trip made by another one is counted once
+        request = metrics.counted("store", lambda: time.sleep(0.01))
+        metrics.counted("store", request)()
+        metrics.counted("api", request)()
+        round_trips = metrics.as_dict()["round_trips"]
+        self.assertEqual([("api", 1), ("store", 1)], [(r["name"], r["count"]) for r in round_trips])
+        self.assertTrue(all(r["time"] >= 0.01 for r in round_trips))
+
+    def test_enable_metrics(self):
+        pfx2as = StubPfx2As()
+        hegemony = StubHegemony()
+        methods = TaggingMethodology(datasets={
+            "as_rank": StubAsRank(),
+            "friend_asns": StubFriends(),
+            "pfx2asn_newcomer": pfx2as,
+            "hegemony": hegemony,
+        }, enable_metrics=True)
+        methods.prepare_for_view(300)
+
+        # the second call is answered from the memo
+        tags = methods.tag_relationships({"1"}, {"2"})
+        self.assertEqual(tags, methods.tag_relationships({"1"}, {"2"}))
+        # round trips are counted where the I/O happens, not per dataset method call
+        pfx2as.lookup("10.0.0.0/8")
+        pfx2as.lookup_many(["10.0.0.0/8", "10.0.0.0/9", "10.0.0.0/10"])
+        hegemony.query_hegemony(["1"])
+        hegemony.query_hegemony(["2"])
+
+        d = methods.metrics.as_dict()
+        relationships = [m for m in d["methods"] if m["name"] == "tag_relationships"][0]
+        self.assertEqual(2, relationships["calls"])
+        self.assertGreater(relationships["time"], 0)
+        self.assertEqual([{"name": "tag_relationships", "hits": 1, "misses": 1, "hit_ratio": 0.5}], d["caches"])
+        self.assertEqual([("hegemony", 1), ("pfx2asn_newcomer", 3)],
+                         [(r["name"], r["count"]) for r in d["round_trips"]])
+
+        # the metrics are per view
+        methods.prepare_for_view(600)
+        self.assertEqual({"methods": [], "caches": [], "round_trips": []}, methods.metrics.as_dict())
@@ -39,7 +39,7 @@ class ViewMetrics:
                  view_ts, event_type, proc_finished_ts=None, proc_duration=None,
                  consumer_file_path=None,
                  consumer_events_cnt=0, consumer_new_events_cnt=0, consumer_fin_events_cnt=0, consumer_skip_events_cnt=0,
-                 consumer_recur_events_cnt=0
+                 consumer_recur_events_cnt=0, tagging_metrics=None
                  ):
         # timestamps
         self.view_ts = view_ts
@@ -55,6 +55,9 @@ class ViewMetrics:
         self.consumer_skip_events_cnt = consumer_skip_events_cnt
         self.consumer_recur_events_cnt = consumer_recur_events_cnt
 
+        # per tagging method metrics, see TaggingMetrics.as_dict()
+        self.tagging_metrics = tagging_metrics
+
     def update_proc_time(self, start_ts, current_ts):
         assert(isinstance(start_ts, float) and isinstance(current_ts, float))
         self.proc_finished_ts = int(current_ts)
@@ -74,6 +77,8 @@ class ViewMetrics:
             "consumer_fin_events_cnt": self.consumer_fin_events_cnt,
             "consumer_recur_events_cnt": self.consumer_recur_events_cnt,
             "consumer_skip_events_cnt": self.consumer_skip_events_cnt,
+            # tagging methods metrics
+            "tagging_metrics": self.tagging_metrics,
         }
 
     def get_view_metrics_id(self):
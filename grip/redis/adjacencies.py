@@ -71,6 +71,13 @@ class Adjacencies:
             return None
         return min(week_tses), max(week_tses)
 
+    def get_snapshot_version(self):
+        """
+        return the version of the adjacencies data, which changes only when a new week of data is inserted or an
+        old one is cleaned
+        """
+        return self.get_current_window()
+
     def find_missing(self, latest_ts, first_ts):
         if latest_ts:
             latest_ts = int(latest_ts)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+"""
+Benchmark the longest prefix match of the redis pfx2as stores, comparing the
+pipelined lookup with the legacy walk that issues one query per prefix length.
+"""
+
+import argparse
+import random
+import socket
+import struct
+import time
+
+import wandio
+
+from grip.redis.pfx2as_historical import Pfx2AsHistorical
+from grip.redis.pfx2as_newcomer import Pfx2AsNewcomer
+
+
+def random_prefixes(count, mask=32, seed=0):
+    rand = random.Random(seed)
+    return ["%s/%d" % (socket.inet_ntoa(struct.pack("!L", rand.getrandbits(32))), mask)
+            for _ in range(count)]
+
+
+def load_prefixes(path):
+    with wandio.open(path) as fh:
+        return [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+
+
+def time_lookups(store, prefixes, pipelined, **kwargs):
+    results = []
+    start = time.time()
+    for prefix in prefixes:
+        results.append(store.lookup(prefix, pipelined=pipelined, **kwargs))
+    return time.time() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+    Benchmark longest prefix match lookups on the pfx2as redis stores.
+    """)
+    parser.add_argument('-s', "--store", choices=["newcomer", "historical"], default="newcomer",
+                        help="Which pfx2as store to benchmark")
+    parser.add_argument('-f', "--prefixes-file", action="store", default=None,
+                        help="File with one prefix per line (default: random /32s)")
+    parser.add_argument('-n', "--count", action="store", type=int, default=1000,
+                        help="Number of random /32 prefixes to look up")
+    parser.add_argument('-t', "--timestamp", action="store", default=None,
+                        help="Maximum (newcomer) or minimum (historical) timestamp for the lookups")
+
+    parser.add_argument('-r', "--redis-host", action="store", default=None, help='Redis address')
+    parser.add_argument('-p', "--redis-port", action="store", default=6379, help='Redis port')
+    parser.add_argument('-P', "--redis-password", action="store", default="", help='Redis password')
+    parser.add_argument('-U', "--redis-user", action="store", default="default", help='Redis username')
+    parser.add_argument('-d', "--redis-db", action="store", help='Redis database', default=None)
+    parser.add_argument('-X', "--cluster-mode", action="store_true", default=False,
+                        help="Use redis cluster APIs to interact with the db")
+
+    opts = parser.parse_args()
+
+    if opts.store == "newcomer":
+        store = Pfx2AsNewcomer(host=opts.redis_host, port=opts.redis_port,
+                               db=1 if opts.redis_db is None else opts.redis_db,
+                               user=opts.redis_user, password=opts.redis_password,
+                               cluster_mode=opts.cluster_mode)
+        kwargs = {"max_ts": opts.timestamp}
+    else:
+        store = Pfx2AsHistorical(opts.redis_host, opts.redis_port,
+                                 0 if opts.redis_db is None else opts.redis_db,
+                                 opts.redis_user, opts.redis_password,
+                                 cluster_mode=opts.cluster_mode)
+        kwargs = {"min_ts": opts.timestamp}
+
+    if opts.prefixes_file:
+        prefixes = load_prefixes(opts.prefixes_file)
+    else:
+        prefixes = random_prefixes(opts.count)
+
+    walk_time, walk_results = time_lookups(store, prefixes, pipelined=False, **kwargs)
+    pipe_time, pipe_results = time_lookups(store, prefixes, pipelined=True, **kwargs)
+
+    mismatches = sum(1 for a, b in zip(walk_results, pipe_results) if a != b)
+    matched = sum(1 for pfx, _ in pipe_results if pfx is not None)
+
+    print("store: %s, prefixes: %d, matched: %d" % (opts.store, len(prefixes), matched))
+    print("walk:      %.3fs total, %.3fms per lookup" % (walk_time, 1000.0 * walk_time / max(len(prefixes), 1)))
+    print("pipelined: %.3fs total, %.3fms per lookup" % (pipe_time, 1000.0 * pipe_time / max(len(prefixes), 1)))
+    if pipe_time > 0:
+        print("speedup: %.1fx" % (walk_time / pipe_time))
+    print("mismatching results: %d" % mismatches)
+
+
+if __name__ == "__main__":
+    main()
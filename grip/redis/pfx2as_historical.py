@@ -596,10 +596,33 @@ class Pfx2AsHistorical:
                     # print out the match
                     print("%s\t%s" % (prefix, asn))
 
-    def lookup(self, prefix, min_ts=None, max_ts=None, exact_match=False):
+    def _get_pfx_key(self, bin_pfx):
+        if self.cluster_mode:
+            return PFX_KEY_TMPL % ("{%s}" % bin_pfx)
+        return PFX_KEY_TMPL % bin_pfx
+
+    def _longest_match(self, bin_pfx, min_ts):
+        """
+        Find the longest prefix (down to a /2) covering bin_pfx that has
+        records, querying all candidate lengths in one pipelined round trip.
+        """
+        candidates = [bin_pfx[:length] for length in range(len(bin_pfx), 1, -1)]
+        results = self.rh.zrangebyscore_many(
+                [self._get_pfx_key(c) for c in candidates],
+                min_ts, "+inf", withscores=True)
+        for candidate, records in zip(candidates, results):
+            if len(records):
+                return candidate, records
+        return bin_pfx, []
+
+    def lookup(self, prefix, min_ts=None, max_ts=None, exact_match=False,
+            pipelined=True):
         """
         Query Redis for historical pfx to AS mapping
 
+        If pipelined is set, the longest prefix match queries all the less
+        specific prefixes at once instead of one round trip per prefix length.
+
         @return
         - the announced prefix or super-prefix
         - list of tuple (start_ts, end_ts, ASNS).
@@ -615,20 +638,19 @@ class Pfx2AsHistorical:
 
         bin_pfx = self.rh.get_bin_pfx(prefix)
         records = []
-        while len(bin_pfx) > 1:
-            if self.cluster_mode:
-                lookup_bin_pfx = "{%s}" % (bin_pfx)
-            else:
-                lookup_bin_pfx = bin_pfx
-
-            records = self.rh.zrangebyscore(PFX_KEY_TMPL % lookup_bin_pfx,
-                                            min_ts, "+inf", withscores=True)
+        if pipelined and not exact_match:
+            bin_pfx, records = self._longest_match(bin_pfx, min_ts)
             records = [(x.split(":"), str(int(score))) for (x, score) in records]
-            if len(records) or exact_match:
-                break
-            else:
-                # checking for a less specific prefix
-                bin_pfx = bin_pfx[:-1]
+        else:
+            while len(bin_pfx) > 1:
+                records = self.rh.zrangebyscore(self._get_pfx_key(bin_pfx),
+                                                min_ts, "+inf", withscores=True)
+                records = [(x.split(":"), str(int(score))) for (x, score) in records]
+                if len(records) or exact_match:
+                    break
+                else:
+                    # checking for a less specific prefix
+                    bin_pfx = bin_pfx[:-1]
 
         if not len(records):
             return None, []
@@ -77,6 +77,7 @@ from grip.redis.redis_helper import RedisHelper as RedisBasicHelper
 
 TIME_GRANULARITY = 300
 DEFAULT_WINDOW_HOURS = 24
+LOOKUP_BATCH_SIZE = 5000
 PFX_ORIGINS_DATA_DIRECTORY = "/data/bgp/live/pfx-origins/production"
 PFX_ORIGINS_FILE_NAME_TMPL = "year=%04d/month=%02d/day=%02d/hour=%02d/pfx-origins.%d.gz"
 
@@ -324,7 +325,27 @@ class Pfx2AsNewcomer:
 
         return redis_result[0].split(":")[1], int(redis_result[1])
 
-    def lookup(self, prefix, max_ts=None, exact_match=False, latest=False):
+    def _get_pfx_key(self, bin_pfx):
+        if self.cluster_mode:
+            return "%s:IPV4:{%s}" % (self.root_prefix, bin_pfx)
+        return "%s:IPV4:%s" % (self.root_prefix, bin_pfx)
+
+    def _longest_match(self, bin_pfx, max_ts):
+        """
+        Find the longest prefix (down to a /2) covering bin_pfx that has
+        records, querying all candidate lengths in one pipelined round trip.
+        """
+        candidates = [bin_pfx[:length] for length in range(len(bin_pfx), 1, -1)]
+        results = self.rh.zrangebyscore_many(
+                [self._get_pfx_key(c) for c in candidates],
+                "-inf", max_ts, withscores=True)
+        for candidate, asns in zip(candidates, results):
+            if len(asns):
+                return candidate, asns
+        return bin_pfx, []
+
+    def lookup(self, prefix, max_ts=None, exact_match=False, latest=False,
+            pipelined=True):
         """
         Queries redis for pfx2as mappings for the last 24 hours
         Returns:
@@ -332,6 +353,9 @@ class Pfx2AsNewcomer:
         - if a timestamp is specified, returns the most recent (ASN, timestamp)
         (before the timestamp) otherwise, a list of tuple (ASN, timestamp).
 
+        If pipelined is set, the longest prefix match queries all the less
+        specific prefixes at once instead of one round trip per prefix length.
+
         i.e., ('8.8.8.0/24', [('15169', 1473120000.0)]
         """
         if max_ts is None:
@@ -342,19 +366,17 @@ class Pfx2AsNewcomer:
             return None, []
         # format in redis [timestamp, AS-timestamp]
         # in this way we can save all the timestamp
-        while len(bin_pfx) > 1:
-            if self.cluster_mode:
-                key = "%s:IPV4:{%s}" % (self.root_prefix, bin_pfx)
-            else:
-                key = "%s:IPV4:%s" % (self.root_prefix, bin_pfx)
-
-            asns = self.rh.zrangebyscore(key,
-                                         "-inf", max_ts, withscores=True)
-            if len(asns) or exact_match:
-                break
-            else:
-                # check for a less specific prefix
-                bin_pfx = bin_pfx[:-1]
+        if pipelined and not exact_match:
+            bin_pfx, asns = self._longest_match(bin_pfx, max_ts)
+        else:
+            while len(bin_pfx) > 1:
+                asns = self.rh.zrangebyscore(self._get_pfx_key(bin_pfx),
+                                             "-inf", max_ts, withscores=True)
+                if len(asns) or exact_match:
+                    break
+                else:
+                    # check for a less specific prefix
+                    bin_pfx = bin_pfx[:-1]
 
         matched_pfx = self.rh.get_str_pfx(bin_pfx)
         if not len(asns):
@@ -366,6 +388,48 @@ class Pfx2AsNewcomer:
         # return the list
         return matched_pfx, [self._extract_res(res) for res in asns]
 
+    def lookup_many(self, prefixes, max_ts=None, latest=False,
+            batch_size=LOOKUP_BATCH_SIZE):
+        """
+        Exact-match lookup of many prefixes using pipelined queries, issuing
+        one round trip per batch (and per cluster node) instead of one per
+        prefix.
+
+        Returns a dictionary mapping each prefix to the same result that
+        lookup(prefix, max_ts, exact_match=True, latest) would return.
+        """
+        if max_ts is None:
+            max_ts = "+inf"
+        results = {}
+        keys = []
+        key_prefixes = []
+        for prefix in prefixes:
+            bin_pfx = self.rh.get_bin_pfx(prefix)
+            if bin_pfx is None or len(bin_pfx) <= 1:
+                # mirrors lookup(), which does not query such prefixes
+                results[prefix] = (None, [])
+                continue
+            keys.append(self._get_pfx_key(bin_pfx))
+            key_prefixes.append((prefix, bin_pfx))
+
+        for start in range(0, len(keys), batch_size):
+            batch = self.rh.zrangebyscore_many(keys[start:start + batch_size],
+                    "-inf", max_ts, withscores=True)
+            for (prefix, bin_pfx), asns in zip(
+                    key_prefixes[start:start + batch_size], batch):
+                if not len(asns):
+                    results[prefix] = (None, [])
+                    continue
+                matched_pfx = self.rh.get_str_pfx(bin_pfx)
+                if latest or max_ts != "+inf":
+                    results[prefix] = (matched_pfx,
+                            [self._extract_res(asns[-1])])
+                else:
+                    results[prefix] = (matched_pfx,
+                            [self._extract_res(res) for res in asns])
+
+        return results
+
     def lookup_as(self, asn, max_ts=None, latest=False):
         """
         Queries redis for as2pfx mappings for the last 24 hours
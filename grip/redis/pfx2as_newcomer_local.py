@@ -231,6 +231,14 @@ class Pfx2AsNewcomerLocal:
         asns = self.pfx2as_dict[match]
         return match, [(asns, self.file_timestamp)]
 
+    # noinspection PyUnusedLocal
+    def lookup_many(self, prefixes, max_ts=None):
+        """
+        Lookup many prefixes at once, same interface as Pfx2AsNewcomer.lookup_many.
+        The data is in memory, so this simply loops over the prefixes.
+        """
+        return {prefix: self.lookup(prefix, max_ts=max_ts) for prefix in prefixes}
+
     # noinspection PyUnusedLocal
     def lookup_as(self, asn, max_ts=None, latest=False):
         """
@@ -166,6 +166,20 @@ class RedisHelper:
         return self.red.execute_command("ZRANGEBYSCORE", key, "-inf", "+inf",
                 "WITHSCORES", target_nodes=target_nodes)
 
+    def zrangebyscore_many(self, keys, minscore, maxscore, withscores=False):
+        """
+        Run ZRANGEBYSCORE for a list of keys using one cluster pipeline. The
+        pipeline groups the commands by the node serving each key, so this
+        costs one round trip per node rather than one per key.
+
+        Returns the results in the same order as the keys.
+        """
+        # use a dedicated pipeline, the shared per-node pipes are for writes
+        pipe = self.red.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrangebyscore(key, minscore, maxscore, withscores=withscores)
+        return pipe.execute()
+
     def execute_pipelines(self):
         tot = 0
         for n in self.nodes:
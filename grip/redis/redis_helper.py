@@ -79,6 +79,17 @@ class RedisHelper:
         self._set_pipeline()
         return self.pipe
 
+    def zrangebyscore_many(self, keys, minscore, maxscore, withscores=False):
+        """
+        Run ZRANGEBYSCORE for a list of keys in one pipelined round trip.
+
+        Returns the results in the same order as the keys.
+        """
+        pipe = self.red.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrangebyscore(key, minscore, maxscore, withscores=withscores)
+        return pipe.execute()
+
     def scan_keys(self, key):
         return self.red.scan_iter(key)
 
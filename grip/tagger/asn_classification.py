@@ -0,0 +1,179 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+import threading
+
+from grip.tagger.tags import tagshelper
+
+# classification flags of an ASN
+ASN_PRIVATE = 1 << 0
+ASN_AS_TRANS = 1 << 1
+ASN_TRUSTED = 1 << 2
+ASN_BLACKLISTED = 1 << 3
+ASN_DROP_LISTED = 1 << 4
+ASN_TIER1 = 1 << 5
+ASN_STUB = 1 << 6
+# set once the AS rank based flags (Tier-1, stub) have been resolved
+ASN_RANK_RESOLVED = 1 << 7
+
+AS_TRANS = "23456"
+
+# datasets the classification depends on, the index is dropped when any of them loads a new snapshot
+CLASSIFICATION_DATASETS = ["trust_asns", "asndrop", "as_rank"]
+
+
+def asn_is_private(asn):
+    """
+    Check if an AS is private
+    :param asn: AS number
+    :return: true if asn is private
+    """
+    if str(asn).isdigit():
+        asn_int = int(str(asn))
+        if 64512 <= asn_int <= 65534 or 4200000000 <= asn_int <= 4294967294:
+            return True
+    return False
+
+
+def asn_is_astrans(asn):
+    """
+    Check if an AS is AS_TRANS
+    :param asn: AS number
+    """
+    return str(asn) == AS_TRANS
+
+
+def asn_should_keep(asn):
+    """
+    Check if an AS should be discarded
+    :param asn: AS number
+    """
+    return not (asn_is_private(asn) or asn_is_astrans(asn))
+
+
+class AsnClassificationIndex:
+    """
+    Index of the classification flags of ASNs (private, AS_TRANS, trusted, blacklisted, on ASNDROP, Tier-1, stub).
+
+    Each ASN is classified once, the first time it is looked up, and its flags are kept until one of the datasets
+    they are built from loads a new snapshot. The Tier-1 and stub flags need AS rank lookups, so they are only
+    resolved for the ASNs they are asked for.
+    """
+
+    def __init__(self, datasets):
+        self.datasets = datasets
+        # tagging may run on multiple worker threads
+        self._lock = threading.Lock()
+        self._flags = {}
+        self.versions = None
+
+    def __len__(self):
+        return len(self._flags)
+
+    def refresh(self, versions):
+        """
+        Drop the index if the snapshot versions of the datasets changed since it was built.
+
+        :param versions: tuple of snapshot versions of CLASSIFICATION_DATASETS
+        """
+        with self._lock:
+            if versions != self.versions:
+                self._flags = {}
+                self.versions = versions
+
+    def classify(self, asn, with_rank=False):
+        """
+        Get the classification flags of an ASN.
+        """
+        flags = self._flags.get(str(asn))
+        if flags is None or (with_rank and not flags & ASN_RANK_RESOLVED):
+            flags = self.classify_many([asn], with_rank)[0]
+        return flags
+
+    def classify_many(self, asns, with_rank=False):
+        """
+        Get the classification flags of multiple ASNs. The ASNs that are not in the index yet are classified
+        together, with a single ranks lookup if with_rank is set.
+
+        :param asns: iterable of ASNs, as strings or integers
+        :param with_rank: also resolve the Tier-1 and stub flags
+        :return: list of flags, in the order of asns
+        """
+        keys = [str(asn) for asn in asns]
+        flags = self._flags
+        missing = {key for key in keys
+                   if key not in flags or (with_rank and not flags[key] & ASN_RANK_RESOLVED)}
+        if not missing:
+            return [flags[key] for key in keys]
+
+        classified = self._classify(missing, with_rank)
+        with self._lock:
+            self._flags.update(classified)
+        return [classified[key] if key in classified else flags[key] for key in keys]
+
+    def _classify(self, asns, with_rank):
+        trust_asns = self.datasets.get("trust_asns")
+        asndrop = self.datasets.get("asndrop")
+        as_rank = self.datasets.get("as_rank")
+
+        res = {}
+        for asn in asns:
+            flags = self._flags.get(asn)
+            if flags is not None:
+                # only the rank flags are missing
+                res[asn] = flags
+                continue
+            flags = 0
+            if asn_is_private(asn):
+                flags |= ASN_PRIVATE
+            if asn_is_astrans(asn):
+                flags |= ASN_AS_TRANS
+            if trust_asns and trust_asns.is_asn_trusted(asn):
+                flags |= ASN_TRUSTED
+            if asn.isdigit() and int(asn) in tagshelper.blacklist_asns:
+                flags |= ASN_BLACKLISTED
+            if asndrop and asndrop.is_on_list(asn):
+                flags |= ASN_DROP_LISTED
+            res[asn] = flags
+
+        if with_rank:
+            ranks = as_rank.get_rank_for_asns(list(asns)) if as_rank else {}
+            for asn in asns:
+                flags = res[asn] | ASN_RANK_RESOLVED
+                degree = as_rank.get_degree(asn) if as_rank else None
+                rank = ranks.get(asn)
+                if rank is not None and rank < 30 and degree is not None and degree["provider"] == 0:
+                    flags |= ASN_TIER1
+                if degree is not None and degree["customer"] == 0:
+                    flags |= ASN_STUB
+                res[asn] = flags
+        return res
@@ -31,59 +31,144 @@
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
 import logging
+import sys
+from array import array
+
+# size of the largest hash integer
+HASH_SIZE = sys.getsizeof(-2 ** 63)
+
+
+def fingerprint_hash(fingerprint):
+    """
+    64-bit hash of a recurring fingerprint. With a million fingerprints in the window, the chance of any collision
+    (an event wrongly taken as recurring) is below 1e-7.
+
+    The string hash of Python is randomized for each process, which is fine as the cache is not shared.
+    """
+    return hash(fingerprint)
 
 
 class CacheWindow:
+    """
+    Fingerprints of the prefix events seen in the past window, to detect recurring prefix events.
+
+    The fingerprints are kept as 64-bit hashes mapped to the time they were last seen at. The hashes are also put in
+    a ring buffer of time buckets (bucket_size seconds each) by the time they were added, so that expiring the
+    fingerprints older than the window only goes through the buckets that have fallen out of the window.
+    """
 
-    def __init__(self, window_size=86400):
-        self.event_time_dict = {}  # pfx_event to time mapping
-        self.time_events_dict = {}  # time to pfx_events mapping
+    def __init__(self, window_size=86400, bucket_size=300):
         self.window_size = window_size
+        self.bucket_size = bucket_size
         self.last_updated_ts = 0
+        self.last_added_ts = None
+        self.last_seen = {}  # fingerprint hash to time mapping
+        # a bucket leaves the window before the ring wraps around to it
+        self.bucket_cnt = -(-window_size // bucket_size) + 1
+        self.bucket_ids = [None] * self.bucket_cnt  # ring slot to bucket (time // bucket_size) mapping
+        self.buckets = [array("q") for _ in range(self.bucket_cnt)]  # hashes added in each bucket
+        self.oldest_bucket = None
+
+    def __len__(self):
+        return len(self.last_seen)
+
+    def memory_usage(self):
+        """
+        Get the memory used by the cache in bytes: a dictionary entry, a hash integer and a ring buffer slot per
+        fingerprint, whatever the length of the fingerprint. The times are shared by the fingerprints of a view, and
+        the size of the hashes is an upper bound.
+        """
+        return sys.getsizeof(self.last_seen) + len(self.last_seen) * HASH_SIZE + \
+            sum(sys.getsizeof(bucket) for bucket in self.buckets) + \
+            sys.getsizeof(self.bucket_ids) + sys.getsizeof(self.buckets)
+
+    def _is_expired(self, bucket, current_view_ts):
+        # all times of the bucket are older than one window
+        return current_view_ts - ((bucket + 1) * self.bucket_size - 1) > self.window_size
+
+    def _expire_bucket(self, slot):
+        """
+        remove the fingerprints added in the bucket of the slot, unless they were added again since then
+        """
+        bucket = self.bucket_ids[slot]
+        removed = 0
+        for fp_hash in self.buckets[slot]:
+            ts = self.last_seen.get(fp_hash)
+            if ts is not None and ts // self.bucket_size == bucket:
+                del self.last_seen[fp_hash]
+                removed += 1
+        self.bucket_ids[slot] = None
+        self.buckets[slot] = array("q")
+        return removed
 
     def __cleanup_cache(self, current_view_ts):
         """
         update the cache based on the current time stamp, remove old ones from cache.
 
-        after this function call, all cached pfx event in self.event_time_dict should have been
-        seen within the past window. and time_events_dict does not have data from older than
-        one window before
+        after this function call, all the buckets of the ring buffer have data seen within the past window, so
+        self.last_seen only has fingerprints from at most one bucket older than the window.
         """
 
         if self.last_updated_ts == current_view_ts:
             # have updated the cache already for the current time stamp
             return
 
-        to_be_removed_events = set()
-        tmp_ts = set()
-        for time_ts in self.time_events_dict:
-            if current_view_ts - time_ts > self.window_size:
-                # if the cached data is older than one day, clean it up
-                # pop time from the time-events cache, and remove all events later
-                # this helps to narrow down what events to remove
-                tmp_ts.add(time_ts)
-                to_be_removed_events.update(self.time_events_dict[time_ts])
-        for ts in tmp_ts:
-            logging.info("CacheWindow: pop outdated timestamp {}".format(ts))
-            self.time_events_dict.pop(ts)
-
-        for fingerprint in to_be_removed_events:
-            # remove all old events from cache
-            try:
-                event_last_seen_ts = self.event_time_dict[fingerprint]
-                if current_view_ts - event_last_seen_ts > self.window_size:
-                    # if we have not seen the prefix event in the last WINDOW time
-                    # we should remove this event from the cache
-                    self.event_time_dict.pop(fingerprint)
-            except KeyError as e:
-                # fingerprint not found. shouldn't happen
-                logging.error("CacheWindow: __update_cache: fingerprint not in event cache but in time cache: %s",
-                              fingerprint)
-                raise e
+        expired_buckets = 0
+        removed = 0
+        current_bucket = current_view_ts // self.bucket_size
+        while self.oldest_bucket is not None and self._is_expired(self.oldest_bucket, current_view_ts):
+            if current_bucket - self.oldest_bucket >= self.bucket_cnt:
+                # time jumped over the whole ring, check all the buckets at once
+                for slot, bucket in enumerate(self.bucket_ids):
+                    if bucket is not None and self._is_expired(bucket, current_view_ts):
+                        removed += self._expire_bucket(slot)
+                        expired_buckets += 1
+                buckets = [bucket for bucket in self.bucket_ids if bucket is not None]
+                self.oldest_bucket = min(buckets) if buckets else None
+                break
+            slot = self.oldest_bucket % self.bucket_cnt
+            if self.bucket_ids[slot] == self.oldest_bucket:
+                removed += self._expire_bucket(slot)
+                expired_buckets += 1
+            self.oldest_bucket += 1
+
+        if expired_buckets:
+            logging.info("CacheWindow: removed %d fingerprints of %d outdated buckets, tracking %d fingerprints "
+                         "(%.1f MiB)", removed, expired_buckets, len(self), self.memory_usage() / 1024 / 1024)
 
         # update last_update ts
         self.last_updated_ts = current_view_ts
 
+    def _start_bucket(self, slot, bucket):
+        """
+        use the slot of the ring buffer for a new bucket
+
+        :return: False if the bucket is older than the whole ring buffer
+        """
+        slot_bucket = self.bucket_ids[slot]
+        if slot_bucket is not None:
+            if slot_bucket > bucket:
+                # e.g. out-of-order cached views, already out of the window
+                return False
+            # the previous bucket of the slot has left the window
+            self._expire_bucket(slot)
+        self.bucket_ids[slot] = bucket
+        if self.oldest_bucket is None or bucket < self.oldest_bucket:
+            self.oldest_bucket = bucket
+        return True
+
+    def _add(self, fp_hash, ts, previous_ts):
+        bucket = ts // self.bucket_size
+        slot = bucket % self.bucket_cnt
+        if self.bucket_ids[slot] != bucket and not self._start_bucket(slot, bucket):
+            return
+        if ts != self.last_added_ts:
+            self.last_added_ts = ts
+        # share the time object between the fingerprints of a view
+        self.last_seen[fp_hash] = self.last_added_ts
+        if previous_ts is None or previous_ts // self.bucket_size != bucket:
+            self.buckets[slot].append(fp_hash)
+
     def is_old_event_and_update(self, pfx_event, show_warning=True):
         """
         check if an event seen before,
@@ -92,13 +177,14 @@ class CacheWindow:
 
         current_view_ts = pfx_event.view_ts
         fingerprint = pfx_event.get_recurring_fingerprint()
+        fp_hash = fingerprint_hash(fingerprint)
 
         # clean up old cache entries
         self.__cleanup_cache(pfx_event.view_ts)
 
-        if fingerprint in self.event_time_dict:
+        last_seen_ts = self.last_seen.get(fp_hash)
+        if last_seen_ts is not None and current_view_ts - last_seen_ts <= self.window_size:
             # the prefix event has been seen in the past window
-            last_seen_ts = self.event_time_dict[fingerprint]
             if pfx_event.event_type == "edges" and last_seen_ts == current_view_ts:
                 # for edges events, excluding events with same fingerprint of the current timestamp.
                 # it's ok to have multiple prefix events with the same as1_as2 as the fingerprint
@@ -111,12 +197,7 @@ class CacheWindow:
                 return True
 
         # this event has not been seen in the past
-        # update the event's last seen time
-        self.event_time_dict[fingerprint] = current_view_ts
-
-        # add events to the view time's dictionary
-        if current_view_ts not in self.time_events_dict:
-            self.time_events_dict[current_view_ts] = set()
-        self.time_events_dict[current_view_ts].add(fingerprint)
+        # update the event's last seen time, and add it to the bucket of the view time
+        self._add(fp_hash, current_view_ts, last_seen_ts)
 
         return False
@@ -35,6 +35,7 @@ import logging
 import time
 
 from grip.tagger.common import REDIS_AVAIL_SECONDS
+from grip.tagger.memo import DEFAULT_MEMO_SIZE
 from grip.tagger.tagger_defcon import DefconTagger
 from grip.tagger.tagger_edges import EdgesTagger
 from grip.tagger.tagger_moas import MoasTagger
@@ -77,6 +78,17 @@ def main():
                         help="Force process view even if it's been processed before")
     parser.add_argument("-d", "--debug", action="store_true", default=False,
                         help="Whether to enable debug mode")
+    parser.add_argument("-w", "--tagging-workers", type=int, default=1,
+                        help="Number of worker threads used to tag events of a view (default: 1, serial)")
+    parser.add_argument("--kafka-async", action="store_true", default=False,
+                        help="Produce Kafka messages asynchronously, flushing once per view")
+    parser.add_argument("--pipelined", action="store_true", default=False,
+                        help="When listening, read the next view and commit the previous one while tagging")
+    parser.add_argument("--tagging-metrics", action="store_true", default=False,
+                        help="Record per tagging method latency, call counts and dataset round trips in view metrics")
+    parser.add_argument("--memo-size", type=int, default=DEFAULT_MEMO_SIZE,
+                        help="Max number of tagging results reused across views while the datasets stay the same "
+                             "(default: %(default)s, 0 disables)")
     parser.add_argument("-n", "--no-cache", action="store_true", default=False,
                         help="Whether to disable caching consumer files before tagging")
     parser.add_argument('-g', "--group", nargs="?",
@@ -154,7 +166,12 @@ def main():
         "pfx2as_file": opts.pfx2as_file,
         "output_file": opts.output_file,
         "predetermined_tags": opts.predetermined_tags,
-        "no_view_metrics": opts.no_view_metrics
+        "no_view_metrics": opts.no_view_metrics,
+        "tagging_workers": opts.tagging_workers,
+        "kafka_async": opts.kafka_async,
+        "pipelined_listen": opts.pipelined,
+        "tagging_metrics": opts.tagging_metrics,
+        "memo_size": opts.memo_size,
     })
 
     to_cache = not opts.no_cache and not opts.offsite_mode
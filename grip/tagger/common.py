@@ -36,27 +36,23 @@ import time
 REDIS_AVAIL_SECONDS = 86400
 
 
-def get_recent_prefix_origins(prefix, view_ts, dataset):
-    """
-    Lookup dataset to get the most recent origins of a given prefix before view_ts.
+def _get_newcomer_dataset(datasets, in_memory):
+    if in_memory:
+        return datasets["pfx2asn_newcomer_local"]
+    return datasets["pfx2asn_newcomer"]
 
-    :param prefix: prefix in question
-    :param view_ts: the maximum timestamp to lookup
-    :param dataset: redis dataset or local-in-memory dataset that provides `lookup`
-                    and `get_most_recent_timestamp` functions
-    :return: - origins that previously announce the prefix
-             - the timestamp of announcement
-             - the most recent time in dataset
+
+def _extract_old_origins(asn_info):
     """
-    # search for the most recent available data about the prefix before view_ts
-    prefix_info, asn_info = dataset.lookup(prefix, max_ts=view_ts - 1, exact_match=True)
-    # search for the most recent time that redis was updated with data before view_ts 
-    redis_ts = dataset.get_most_recent_timestamp(view_ts - 1)
+    Extract the set of origins and the data timestamp from a lookup result.
 
+    :param asn_info: list of (asns, timestamp) returned by a dataset lookup
+    :return: the set of origins, and the timestamp of the data (None if no data)
+    """
     if len(asn_info) == 0:
         # information about this prefix from redis at all
         # return all origins as newcomer, empty set of old_view_origins
-        return set(), None, redis_ts
+        return set(), None
 
     (asn, data_ts) = asn_info[0]
 
@@ -67,33 +63,34 @@ def get_recent_prefix_origins(prefix, view_ts, dataset):
             if "{" not in asn:
                 old_origins_set.add(asn)
 
-    return old_origins_set, data_ts, redis_ts
+    return old_origins_set, data_ts
 
 
-def get_previous_origins(
-        view_ts,
-        prefix,
-        datasets,
-        in_memory
-):
+def get_recent_prefix_origins(prefix, view_ts, dataset, redis_ts=None):
     """
-    get newcomers for a prefix event
+    Lookup dataset to get the most recent origins of a given prefix before view_ts.
 
-    :param view_ts:
-    :param prefix:
-    :param datasets:
-    :param in_memory:
-    :return: old_origins_set, outdated
+    :param prefix: prefix in question
+    :param view_ts: the maximum timestamp to lookup
+    :param dataset: redis dataset or local-in-memory dataset that provides `lookup`
+                    and `get_most_recent_timestamp` functions
+    :param redis_ts: (optional) the most recent time in dataset, if already known for this view
+    :return: - origins that previously announce the prefix
+             - the timestamp of announcement
+             - the most recent time in dataset
     """
-    assert (isinstance(view_ts, int))
+    # search for the most recent available data about the prefix before view_ts
+    prefix_info, asn_info = dataset.lookup(prefix, max_ts=view_ts - 1, exact_match=True)
+    # search for the most recent time that redis was updated with data before view_ts 
+    if redis_ts is None:
+        redis_ts = dataset.get_most_recent_timestamp(view_ts - 1)
+
+    old_origins_set, data_ts = _extract_old_origins(asn_info)
+    return old_origins_set, data_ts, redis_ts
 
-    OUTDATED = False
-    if in_memory:
-        dataset = datasets["pfx2asn_newcomer_local"]
-    else:
-        dataset = datasets["pfx2asn_newcomer"]
 
-    (old_origins_set, data_ts, redis_recent_ts) = get_recent_prefix_origins(prefix, view_ts, dataset)
+def _check_previous_origins(view_ts, old_origins_set, data_ts, redis_recent_ts):
+    OUTDATED = False
 
     """
     We want to find the previous origins of a prefix with respect to view_ts , 
@@ -117,3 +114,66 @@ def get_previous_origins(
         return set(), OUTDATED
 
     return old_origins_set, OUTDATED
+
+
+def get_previous_origins(
+        view_ts,
+        prefix,
+        datasets,
+        in_memory,
+        redis_recent_ts=None,
+):
+    """
+    get newcomers for a prefix event
+
+    :param view_ts:
+    :param prefix:
+    :param datasets:
+    :param in_memory:
+    :param redis_recent_ts: (optional) the most recent time in the dataset before view_ts, if already known
+    :return: old_origins_set, outdated
+    """
+    assert (isinstance(view_ts, int))
+
+    dataset = _get_newcomer_dataset(datasets, in_memory)
+
+    (old_origins_set, data_ts, redis_recent_ts) = get_recent_prefix_origins(prefix, view_ts, dataset,
+                                                                            redis_ts=redis_recent_ts)
+
+    return _check_previous_origins(view_ts, old_origins_set, data_ts, redis_recent_ts)
+
+
+def get_previous_origins_many(
+        view_ts,
+        prefixes,
+        datasets,
+        in_memory
+):
+    """
+    get newcomers for many prefixes of the same view at once.
+
+    The most recent dataset timestamp is looked up only once, and all prefixes are resolved with the dataset's
+    `lookup_many` function, which batches the queries instead of issuing one round trip per prefix.
+
+    :param view_ts:
+    :param prefixes: iterable of prefixes
+    :param datasets:
+    :param in_memory:
+    :return: the most recent time in the dataset before view_ts, and
+             a dictionary mapping each prefix to (old_origins_set, outdated)
+    """
+    assert (isinstance(view_ts, int))
+
+    dataset = _get_newcomer_dataset(datasets, in_memory)
+    prefixes = set(prefixes)
+
+    redis_recent_ts = dataset.get_most_recent_timestamp(view_ts - 1)
+    lookup_results = dataset.lookup_many(prefixes, max_ts=view_ts - 1)
+
+    previous_origins = {}
+    for prefix in prefixes:
+        _, asn_info = lookup_results[prefix]
+        old_origins_set, data_ts = _extract_old_origins(asn_info)
+        previous_origins[prefix] = _check_previous_origins(view_ts, old_origins_set, data_ts, redis_recent_ts)
+
+    return redis_recent_ts, previous_origins
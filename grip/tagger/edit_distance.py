@@ -0,0 +1,145 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+
+"""
+Bounded edit distance between short ASN and prefix strings.
+
+The distance is the Damerau-Levenshtein distance computed by nltk.edit_distance(a, b, transpositions=True), but the
+tagger only needs to know whether it is within a small bound, so the computation gives up as soon as the bound is
+exceeded.
+"""
+
+
+def distance_at_most_one(a, b):
+    """
+    Check if two strings are within edit distance 1, counting insertions, deletions, substitutions and transpositions
+    of adjacent characters as one edit.
+
+    :return: 0 if a and b are equal, 1 if they are one edit apart, None otherwise
+    """
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return None
+    # skip the common prefix
+    i = 0
+    while i < la and i < lb and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        if a[i + 1:] == b[i + 1:]:
+            # substitution
+            return 1
+        if i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]:
+            # transposition
+            return 1
+        return None
+    if la > lb:
+        # deletion from a
+        return 1 if a[i + 1:] == b[i:] else None
+    # insertion into a
+    return 1 if a[i:] == b[i + 1:] else None
+
+
+def bounded_edit_distance(a, b, max_distance=None):
+    """
+    Damerau-Levenshtein distance between two sequences, if it is at most max_distance.
+
+    Only the diagonal band of width max_distance of the DP matrix is computed, and the computation stops as soon as
+    a whole row exceeds max_distance. Any sequences of comparable items can be used, e.g. strings, bytes or tuples.
+
+    :param a: first sequence
+    :param b: second sequence
+    :param max_distance: largest distance of interest, None for no bound
+    :return: the distance, or None if it is larger than max_distance
+    """
+    if max_distance is not None and max_distance < 0:
+        return None
+    if a == b:
+        return 0
+    if max_distance == 1:
+        return distance_at_most_one(a, b)
+
+    la, lb = len(a), len(b)
+    k = max(la, lb) if max_distance is None else max_distance
+    if abs(la - lb) > k:
+        return None
+    if la == 0 or lb == 0:
+        return max(la, lb)
+
+    # any value larger than k
+    inf = k + 1
+    lev = [[inf] * (lb + 1) for _ in range(la + 1)]
+    for j in range(min(lb, k) + 1):
+        lev[0][j] = j
+    for i in range(min(la, k) + 1):
+        lev[i][0] = i
+
+    # last row of a where each item was seen
+    last_left = {}
+    for i in range(1, la + 1):
+        ai = a[i - 1]
+        row = lev[i]
+        prev = lev[i - 1]
+        row_min = row[0]
+        # last column of b in this row where b[j - 1] == ai
+        last_right = 0
+        for j in range(max(1, i - k), min(lb, i + k) + 1):
+            bj = b[j - 1]
+            left = last_left.get(bj, 0)
+            right = last_right
+            if ai == bj:
+                last_right = j
+                value = prev[j - 1]
+            else:
+                value = prev[j - 1] + 1
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if row[j - 1] + 1 < value:
+                value = row[j - 1] + 1
+            if left and right:
+                transposition = lev[left - 1][right - 1] + i - left + j - right - 1
+                if transposition < value:
+                    value = transposition
+            if value > inf:
+                value = inf
+            row[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > k:
+            # the distance can only grow in the following rows
+            return None
+        last_left[ai] = i
+
+    distance = lev[la][lb]
+    return distance if distance <= k else None
@@ -0,0 +1,120 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+
+"""
+Benchmark the bounded edit distance used by the tagger against nltk.edit_distance, on random prefix and ASN pairs.
+"""
+
+import argparse
+import random
+import time
+
+from nltk import edit_distance
+
+from grip.tagger.edit_distance import bounded_edit_distance
+
+
+def random_prefix(rand):
+    return "%d.%d.%d.0/%d" % (rand.randint(1, 223), rand.randint(0, 255), rand.randint(0, 255), rand.randint(8, 24))
+
+
+def random_asn(rand):
+    return str(rand.randint(1, 400000))
+
+
+def random_pairs(kind, count, seed=0):
+    rand = random.Random(seed)
+    gen = random_prefix if kind == "prefix" else random_asn
+    pairs = []
+    for _ in range(count):
+        a = gen(rand)
+        # half of the pairs are one substitution apart
+        if rand.random() < 0.5:
+            i = rand.randrange(len(a))
+            b = a[:i] + rand.choice("0123456789") + a[i + 1:]
+        else:
+            b = gen(rand)
+        pairs.append((a, b))
+    return pairs
+
+
+def time_distances(func, pairs):
+    results = []
+    start = time.time()
+    for a, b in pairs:
+        results.append(func(a, b))
+    return time.time() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="""
+    Benchmark the bounded edit distance against nltk.edit_distance.
+    """)
+    parser.add_argument('-k', "--kind", choices=["prefix", "asn"], default="prefix",
+                        help="Which kind of strings to compare")
+    parser.add_argument('-n', "--count", action="store", type=int, default=20000,
+                        help="Number of random pairs to compare")
+    parser.add_argument('-m', "--max-distance", action="store", type=int, default=1,
+                        help="Bound of the edit distance")
+
+    opts = parser.parse_args()
+
+    pairs = random_pairs(opts.kind, opts.count)
+
+    def nltk_within_bound(a, b):
+        ed = edit_distance(a, b, substitution_cost=1, transpositions=True)
+        return ed if ed <= opts.max_distance else None
+
+    runs = [
+        ("nltk", nltk_within_bound),
+        ("bounded", lambda a, b: bounded_edit_distance(a, b, opts.max_distance)),
+        ("unbounded", lambda a, b: bounded_edit_distance(a, b)),
+    ]
+
+    print("kind: %s, pairs: %d, max distance: %d" % (opts.kind, len(pairs), opts.max_distance))
+    nltk_time, nltk_results = None, None
+    for name, func in runs:
+        run_time, results = time_distances(func, pairs)
+        if name == "unbounded":
+            results = [ed if ed <= opts.max_distance else None for ed in results]
+        line = "%-10s %.3fs total, %.2fus per pair" % (name + ":", run_time, 1e6 * run_time / max(len(pairs), 1))
+        if nltk_time is None:
+            nltk_time, nltk_results = run_time, results
+        else:
+            mismatches = sum(1 for a, b in zip(nltk_results, results) if a != b)
+            line += ", speedup %.1fx, mismatching results: %d" % (nltk_time / max(run_time, 1e-9), mismatches)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
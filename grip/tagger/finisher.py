@@ -68,7 +68,7 @@ class Finisher:
 
     def __init__(self, event_type, load_unfinished=True, index_pattern=None,
                 debug=False, pfx_datadir="/data/bgp/historical/pfx-origins",
-                esconf=ES_CONFIG_LOCATION):
+                esconf=ES_CONFIG_LOCATION, kafka_async=False):
         assert (event_type in ["moas", "submoas", "defcon", "edges"])
         self.debug = debug
 
@@ -95,7 +95,7 @@ class Finisher:
                         else KAFKA_TOPIC_TEMPLATE
         self.kafka_producer_topic = kafka_template % ("tagger", event_type)
         self.kafka_producer = KafkaHelper()
-        self.kafka_producer.init_producer(topic=self.kafka_producer_topic)
+        self.kafka_producer.init_producer(topic=self.kafka_producer_topic, async_mode=kafka_async)
 
     @staticmethod
     def _update_finished_ts(event: Event, event_finished, pfx_feature_to_finished_ts, time_ts):
@@ -328,6 +328,13 @@ class Finisher:
             # remove all views that has finished processing
             self.unchecked_transition_events.pop(view_ts)
 
+    def flush(self):
+        """
+        Wait for the delivery of all Kafka messages produced by the finisher.
+        :raises KafkaDeliveryError: if some messages could not be delivered
+        """
+        self.kafka_producer.flush_checkpoint()
+
     def process_new_event(self, event, index_name=None):
         assert (isinstance(event, Event))
         if index_name is None:
@@ -0,0 +1,120 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+import collections
+import threading
+
+DEFAULT_MEMO_SIZE = 200000
+
+# a value that can never be stored in the memo, returned on misses
+MISSING = object()
+
+
+class TaggingMemo:
+    """
+    Bounded LRU memo of deterministic tagging results that survives across views.
+
+    Entries are keyed by the method name, the method's inputs, and the snapshot versions of the datasets the
+    method depends on. When one of these datasets loads a new snapshot, the old entries can no longer be hit
+    and age out of the memo, while the entries of the methods that do not depend on it stay valid.
+    """
+
+    def __init__(self, max_size=DEFAULT_MEMO_SIZE):
+        # tagging may run on multiple worker threads
+        self._lock = threading.Lock()
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, name, key, versions):
+        """
+        look up a memoized result
+
+        :param name: name of the memoized method
+        :param key: hashable inputs of the method
+        :param versions: snapshot versions of the datasets the method depends on
+        :return: the memoized result, or MISSING
+        """
+        full_key = (name, key, versions)
+        with self._lock:
+            value = self._entries.get(full_key, MISSING)
+            if value is MISSING:
+                self.misses[name] = self.misses.get(name, 0) + 1
+            else:
+                self._entries.move_to_end(full_key)
+                self.hits[name] = self.hits.get(name, 0) + 1
+            return value
+
+    def put(self, name, key, versions, value):
+        if self.max_size <= 0:
+            return
+        full_key = (name, key, versions)
+        with self._lock:
+            self._entries[full_key] = value
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def as_dict(self):
+        with self._lock:
+            methods = []
+            for name in sorted(set(self.hits) | set(self.misses)):
+                hits = self.hits.get(name, 0)
+                misses = self.misses.get(name, 0)
+                methods.append({"name": name, "hits": hits, "misses": misses,
+                                "hit_ratio": hits / (hits + misses)})
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "evictions": self.evictions,
+                "methods": methods,
+            }
+
+    def summary_str(self):
+        """
+        one line summary of the memo statistics for logging
+        """
+        d = self.as_dict()
+        parts = ["{}: {:.0%} of {}".format(m["name"], m["hit_ratio"], m["hits"] + m["misses"])
+                 for m in d["methods"]]
+        parts.append("size {}/{}, {} evicted".format(d["size"], d["max_size"], d["evictions"]))
+        return "; ".join(parts)
@@ -32,54 +32,95 @@
 import itertools
 import logging
 
-from nltk import edit_distance
-
+from grip.metrics.tagging_metrics import TaggingMetrics, INSTRUMENTED_METHODS, REMOTE_DATASETS
+from grip.tagger.asn_classification import *
+from grip.tagger.edit_distance import bounded_edit_distance
+from grip.tagger.memo import TaggingMemo, DEFAULT_MEMO_SIZE, MISSING
 from grip.tagger.tags import tagshelper
+from grip.tagger.typo_index import TypoIndex
 from grip.utils.bgp import *
 from grip.utils.data.rpki import RpkiValidationStatus
 from grip.utils.data.irr import SupportedIRRs
+from grip.utils.data.siblings import SiblingIndex
 
 
-def asn_is_private(asn):
-    """
-    Check if an AS is private
-    :param asn: AS number
-    :return: true if asn is private
-    """
-    if str(asn).isdigit():
-        asn_int = int(str(asn))
-        if 64512 <= asn_int <= 65534 or 4200000000 <= asn_int <= 4294967294:
-            return True
-    return False
-
-
-def asn_is_astrans(asn):
-    """
-    Check if an AS is AS_TRANS
-    :param asn: AS number
-    """
-    return str(asn) == "23456"
-
-
-def asn_should_keep(asn):
-    """
-    Check if an AS should be discarded
-    :param asn: AS number
-    """
-    return not (asn_is_private(asn) or asn_is_astrans(asn))
+# datasets that the results memoized across views depend on
+MEMO_DEPENDENCIES = {
+    "tag_relationships": ["as_rank", "friend_asns", "siblings"],
+    "tag_rpki": ["rpki"],
+    "tag_irr": ["irr"],
+    "tag_edges": ["adjacencies", "ixp_info", "as_rank"],
+}
 
 
 class TaggingMethodology:
-    def __init__(self, datasets):
+    def __init__(self, datasets, enable_metrics=False, memo_size=DEFAULT_MEMO_SIZE):
         self.datasets = datasets
-        self.tags_cache = {}  # cache that is used to reduce duplicate calls
+        self.memo = TaggingMemo(memo_size)  # results reused across views while the datasets stay the same
+        self.dataset_versions = {}  # snapshot versions of the datasets for the current view
+        self.asn_index = AsnClassificationIndex(datasets)  # per-ASN flags, kept while the datasets stay the same
+        self.typo_index = TypoIndex()  # prefixes of the newcomers, for fat-finger detection
+        self.sibling_index = SiblingIndex(datasets)  # sibling groups of the origins
         self.current_ts = None
+        self.metrics = None  # per-view tagging metrics, None if disabled
+        if enable_metrics:
+            self.enable_metrics()
+
+    def enable_metrics(self):
+        """
+        Instrument the tagging methods and the remote datasets to collect per-view TaggingMetrics.
+        Methods are wrapped on this instance only, so there is no overhead when metrics are not enabled.
+        """
+        if self.metrics is not None:
+            return
+        self.metrics = TaggingMetrics()
+        for name in INSTRUMENTED_METHODS:
+            setattr(self, name, self.metrics.timed(name, getattr(self, name)))
+        for dsname in REMOTE_DATASETS:
+            dataset = self.datasets.get(dsname)
+            if dataset:
+                self.metrics.count_round_trips(dsname, dataset)
 
     def prepare_for_view(self, view_ts):
         if view_ts != self.current_ts:
             logging.info("preparing TaggingMethodology for view {}".format(view_ts))
-            self.tags_cache = {}
+            self.dataset_versions = {}
             self.current_ts = view_ts
+            if self.metrics is not None:
+                self.metrics.reset()
+
+    def get_dataset_version(self, dsname):
+        """
+        Get the snapshot version of a dataset for the current view. Datasets that cannot tell their version are
+        versioned by the view, so that results depending on them are only reused within the view.
+        """
+        if dsname not in self.dataset_versions:
+            dataset = self.datasets.get(dsname)
+            if not dataset:
+                version = None
+            elif hasattr(dataset, "get_snapshot_version"):
+                version = dataset.get_snapshot_version()
+            else:
+                version = ("view", self.current_ts)
+            self.dataset_versions[dsname] = version
+        return self.dataset_versions[dsname]
+
+    def get_memo_versions(self, name):
+        """
+        Get the snapshot versions of the datasets the memoized method depends on.
+        """
+        return tuple(self.get_dataset_version(dsname) for dsname in MEMO_DEPENDENCIES[name])
+
+    def classify_asns(self, asns, with_rank=False):
+        """
+        Get the classification flags of the ASes from the ASN classification index.
+        :param asns: iterable of ASNs
+        :param with_rank: also resolve the Tier-1 and stub flags, which need AS rank lookups
+        :return: dictionary with keys: ASNs, and values: classification flags
+        """
+        asns = list(asns)
+        self.asn_index.refresh(tuple(self.get_dataset_version(dsname) for dsname in CLASSIFICATION_DATASETS))
+        return dict(zip(asns, self.asn_index.classify_many(asns, with_rank)))
 
     def asn_is_Tier1(self, asn_lst):
         """
@@ -87,18 +128,7 @@ class TaggingMethodology:
         :param asn_lst: list of ASNs
         :return: dictionary with keys: ASNs, and values: True if they are Tier 1 or False otherwise
         """
-        as_ranks = self.datasets["as_rank"].get_rank_for_asns(asn_lst)
-        degrees = {}
-        res = {}
-        for asn in asn_lst:
-            degrees[asn] = self.datasets["as_rank"].get_degree(asn)
-            
-        for asn, rank in as_ranks.items():
-            if rank is not None and rank < 30 and degrees[asn] is not None and degrees[asn]['provider'] == 0:
-                res[asn] = True
-            else:
-                res[asn] = False
-        return res
+        return {asn: bool(flags & ASN_TIER1) for asn, flags in self.classify_asns(asn_lst, with_rank=True).items()}
 
     def tag_newcomer_origins(self, current_origins_set, previous_origins_set):
         """
@@ -216,6 +246,15 @@ class TaggingMethodology:
             logging.warning("ASes containing non-digit characters: {}".format(current_origins_set))
             return []
 
+        # classify each origin once
+        asn_flags = self.classify_asns(current_origins_set | new_origins_set)
+
+        def origins_with(origins, flag):
+            return {asn for asn in origins if asn_flags[asn] & flag}
+
+        def origins_without(origins, flag):
+            return {asn for asn in origins if not asn_flags[asn] & flag}
+
         tags = []
 
         # Private ASN tags
@@ -247,11 +286,11 @@ class TaggingMethodology:
         ####
         # Private
         ####
-        if len({asn for asn in current_origins_set if asn_is_private(asn)}) > 0:
+        if len(origins_with(current_origins_set, ASN_PRIVATE)) > 0:
             # there are private ASN's in the current origns set
             tags.append(TagHasPrivateAsn)
 
-        private_newcomers = {asn for asn in new_origins_set if asn_is_private(asn)}
+        private_newcomers = origins_with(new_origins_set, ASN_PRIVATE)
         if len(private_newcomers) > 0:
             # has newcomer private asn
             tags.append(TagHasNewcomerPrivateAsn)
@@ -271,7 +310,7 @@ class TaggingMethodology:
             # not moas case: 1 -> 2 64512
             # not moas case: 1 64512 64513 -> 64512 64513
             # not moas case: 1 2 64512 -> 3 64512
-            non_private_current_origins = {asn for asn in current_origins_set if not asn_is_private(asn)}
+            non_private_current_origins = origins_without(current_origins_set, ASN_PRIVATE)
             if len(non_private_current_origins) <= 1:
                 tags.append(TagDueToPrivateAsn)
 
@@ -286,17 +325,17 @@ class TaggingMethodology:
         # AS-Trans
         # TODO: discuss if in the private/DPS checks above we're forgetting that one of the ASNs could be 23456
         ####
-        if len({asn for asn in current_origins_set if asn_is_astrans(asn)}) > 0:
+        if len(origins_with(current_origins_set, ASN_AS_TRANS)) > 0:
             # there are as_trans ASN's in the current origns set
             tags.append(TagHasAsTrans)
 
-        as_trans_newcomers = {asn for asn in new_origins_set if asn_is_astrans(asn)}
+        as_trans_newcomers = origins_with(new_origins_set, ASN_AS_TRANS)
         if len(as_trans_newcomers) > 0:
             # has newcomer as_trans asn
             tags.append(TagHasNewcomerAsTrans)
 
             # same logic used for private asn tagging above
-            non_as_trans_current_origins = {asn for asn in current_origins_set if not asn_is_astrans(asn)}
+            non_as_trans_current_origins = origins_without(current_origins_set, ASN_AS_TRANS)
             if len(non_as_trans_current_origins) <= 1:
                 tags.append(TagDueToAsTrans)
             if len(as_trans_newcomers) == len(new_origins_set):
@@ -306,10 +345,10 @@ class TaggingMethodology:
         ####
         # DPS
         ####
-        if len({asn for asn in current_origins_set if self.datasets["trust_asns"].is_asn_trusted(asn)}) > 0:
+        if len(origins_with(current_origins_set, ASN_TRUSTED)) > 0:
             tags.append(TagHasDpsAsn)
 
-        dps_newcomers = {asn for asn in new_origins_set if self.datasets["trust_asns"].is_asn_trusted(asn)}
+        dps_newcomers = origins_with(new_origins_set, ASN_TRUSTED)
         if len(dps_newcomers) > 0:
             # has newcomer dps asn
             tags.append(TagHasNewcomerDpsAsn)
@@ -319,10 +358,7 @@ class TaggingMethodology:
             # similar logic used for private asn tagging above, but we also remove private and as_trans ASNs
             # we consider an event is caused by DPS ASNs if after removing DPS ASNs and also private and as_trans ASNs,
             # the event would not be considered as an event anymore.
-            non_dps_current_origins = {
-                asn for asn in current_origins_set if not
-                (self.datasets["trust_asns"].is_asn_trusted(asn) or asn_is_private(asn) or asn_is_astrans(asn))
-            }
+            non_dps_current_origins = origins_without(current_origins_set, ASN_TRUSTED | ASN_PRIVATE | ASN_AS_TRANS)
             # case 1: after removing dps, private, as_trans, there are one or zero ASNs in the current origins set
             if len(non_dps_current_origins) <= 1:
                 tags.append(TagDueToDpsAsn)
@@ -337,10 +373,7 @@ class TaggingMethodology:
             # has at least one private and one as_trans ASN newcomer
 
             # get all current origins that are not private or as_trans ASNs
-            filtered_current_origins = {asn for asn in current_origins_set
-                                        if not (
-                        asn_is_astrans(asn) or
-                        asn_is_private(asn))}
+            filtered_current_origins = origins_without(current_origins_set, ASN_AS_TRANS | ASN_PRIVATE)
 
             # check if after filtering there is only one or zero ASN left in the current origins set
             if len(filtered_current_origins) <= 1:
@@ -355,13 +388,11 @@ class TaggingMethodology:
         ####
 
         # our blacklist
-        suspicious_asns = [int(x) for x in new_origins_set if int(x) in tagshelper.blacklist_asns]
-        if len(suspicious_asns) > 0:
+        if len(origins_with(new_origins_set, ASN_BLACKLISTED)) > 0:
             tags.append(TagBlacklistAsn)
 
         # check spamhaus asn drop list
-
-        if self.datasets["asndrop"] and self.datasets["asndrop"].any_on_list(list(new_origins_set)):
+        if len(origins_with(new_origins_set, ASN_DROP_LISTED)) > 0:
             tags.append(TagSpamhausAsnDrop)
 
         return set(tags)
@@ -471,24 +502,31 @@ class TaggingMethodology:
                 # if the newcomer is in the range of the common count for AS prepending
                 tags.append(TagNewcomerSmallAsn)
 
+        def min_distance_bound(min_ed):
+            return None if min_ed['distance'] == float('inf') else min_ed['distance'] - 1
+
         # check: edit distance of asn
+        # the minimum edit distances are only computed if some newcomer is exactly one edit away from an oldcomer
         is_asn_typo = False
         common_min_ed = 1
-        ed_asn = {x: None for x in new_origins_set}
         for new in new_origins_set:
-            min_ed = {'distance': float('inf'), 'oldcomer': None,
-                    'newcomer': str(new)}
-            for old in previous_origins_set:
-                ed = edit_distance(str(new), str(old), substitution_cost=1, transpositions=True)
-                if ed < min_ed['distance']:
-                    # get the minimum edit distance between a new and old-view-origins
-                    min_ed['distance'] = ed
-                    min_ed['oldcomer'] = old
-            ed_asn[new] = min_ed
-            if 0 != min_ed['distance'] <= common_min_ed:
+            distances = [bounded_edit_distance(str(new), str(old), 1) for old in previous_origins_set]
+            if 0 not in distances and 1 in distances:
                 is_asn_typo = True
                 tags.append(TagOriginSmallEditDistance)
         if is_asn_typo:
+            ed_asn = {x: None for x in new_origins_set}
+            for new in new_origins_set:
+                min_ed = {'distance': float('inf'), 'oldcomer': None,
+                        'newcomer': str(new)}
+                for old in previous_origins_set:
+                    # only distances smaller than the current minimum matter
+                    ed = bounded_edit_distance(str(new), str(old), min_distance_bound(min_ed))
+                    if ed is not None:
+                        # get the minimum edit distance between a new and old-view-origins
+                        min_ed['distance'] = ed
+                        min_ed['oldcomer'] = old
+                ed_asn[new] = min_ed
             pfx_event.extra['origin_typo'] = list(ed_asn.values())
 
         # check: edit distance of pfx
@@ -496,12 +534,15 @@ class TaggingMethodology:
             # performance hack: skipping checking prefix distance if prefix is smaller than /30
             return tags
 
+        def parse_pfxs(raw):
+            # skipping previous announcements that are /25 to /32
+            return [pfx for pfx in raw.split(',') if int(pfx.split("/")[1]) < 25]
+
+        # the prefixes of the newcomers are looked up in the typo index, and the minimum edit distances are only
+        # computed if some newcomer announced a prefix exactly one edit away from typo_pfx
         is_pfx_typo = False
-        common_min_ed = 1
-        ed_pfx = {x: None for x in new_origins_set}
+        newcomer_pfxs = {}
         for new in new_origins_set:
-            min_ed = {'distance': float('inf'), 'prefix': None,
-                    'newcomer': new}
             # check all pfxes announced by newcomers from the previous view (5 mins)
             lookup_time = pfx_event.view_ts - 300
             if in_memory:
@@ -510,23 +551,30 @@ class TaggingMethodology:
                 pfxs = self.datasets["pfx2asn_newcomer"].lookup_as(str(new), lookup_time)
             if not pfxs:
                 continue
+            newcomer_pfxs[new] = pfxs[0][0]
 
-            # skipping previous announcements that are /25 to /32
-            pfxs = [pfx for pfx in pfxs[0][0].split(',') if int(pfx.split("/")[1]) < 25]
-            if not pfxs:
-                continue
-
-            for pfx in pfxs:
-                ed = edit_distance(pfx, typo_pfx, substitution_cost=1, transpositions=True)
-                if ed < min_ed['distance']:
-                    # get the minimum edit distance between a new and old-view-origins
-                    min_ed['distance'] = ed
-                    min_ed['prefix'] = pfx
-            ed_pfx[new] = min_ed
-            if 0 != min_ed['distance'] <= common_min_ed:
+            self.typo_index.update(new, pfxs[0][0], parse_pfxs)
+            distances = self.typo_index.find_within_one(new, typo_pfx).values()
+            if 0 not in distances and 1 in distances:
                 is_pfx_typo = True
                 tags.append(TagPrefixSmallEditDistance)
+
         if is_pfx_typo:
+            ed_pfx = {x: None for x in new_origins_set}
+            for new, raw in newcomer_pfxs.items():
+                min_ed = {'distance': float('inf'), 'prefix': None,
+                        'newcomer': new}
+                pfxs = parse_pfxs(raw)
+                if not pfxs:
+                    continue
+
+                for pfx in pfxs:
+                    ed = bounded_edit_distance(pfx, typo_pfx, min_distance_bound(min_ed))
+                    if ed is not None:
+                        # get the minimum edit distance between a new and old-view-origins
+                        min_ed['distance'] = ed
+                        min_ed['prefix'] = pfx
+                ed_pfx[new] = min_ed
             pfx_event.extra['pfx_typo'] = list(ed_pfx.values())
 
         return tags
@@ -540,6 +588,8 @@ class TaggingMethodology:
         - an oldcomer is always on that paths where some newcomer originated
         - an newcomer is always on that paths where some oldcomer originated
         - oldcomer does path prepending
+
+        :param as_paths: list of AS paths, as lists of ASNs or IndexedAsPath
         """
 
         if len(as_paths) == 0:
@@ -563,19 +613,31 @@ class TaggingMethodology:
         all_newcomers_on_oldcomers_path = True
         oldcomer_prepending = False
 
-        for aspath in as_paths:
-            new_on_path = any([new in aspath for new in new_origins_set])
-            old_on_path = any([old in aspath for old in previous_origins_set])
+        for aspath in index_aspaths(as_paths):
+            first_pos = aspath.first_pos
+            # the position on the path of the last newcomer/oldcomer (in set order) on the path
+            new_idx = None
+            old_idx = None
+            for n in new_origins_set:
+                if n in first_pos:
+                    new_idx = first_pos[n]
+            for o in previous_origins_set:
+                if o in first_pos:
+                    old_idx = first_pos[o]
+            new_on_path = new_idx is not None
+            old_on_path = old_idx is not None
 
             if not new_on_path and not old_on_path:
                 # sanity check, but this shouldn't happen
-                logging.warning("aspath {} has no newcomer ({}) or oldcomer ({})".format(aspath, new_origins_set,
+                logging.warning("aspath {} has no newcomer ({}) or oldcomer ({})".format(list(aspath.hops),
+                                                                                         new_origins_set,
                                                                                          previous_origins_set))
                 continue
 
             # check if oldcomer_paths has prepending
-            if old_on_path and len(aspath) > 2:
-                if aspath[-1] == aspath[-2] and aspath[-1] in previous_origins_set:
+            hops = aspath.hops
+            if old_on_path and len(hops) > 2:
+                if hops[-1] == hops[-2] and hops[-1] in previous_origins_set:
                     oldcomer_prepending = True
 
             # check if newcomer, oldcomer, or all on paths
@@ -590,16 +652,6 @@ class TaggingMethodology:
                 all_paths_neighbor = False
             else:
                 # both on path, check if they are neighboring on path
-                new_idx = None
-                old_idx = None
-                for n in new_origins_set:
-                    if n in aspath:
-                        new_idx = aspath.index(n)
-                for o in previous_origins_set:
-                    if o in aspath:
-                        old_idx = aspath.index(o)
-                assert new_idx is not None
-                assert old_idx is not None
                 if abs(new_idx - old_idx) != 1:
                     all_paths_neighbor = False
 
@@ -662,9 +714,14 @@ class TaggingMethodology:
         origin_validation_status = {}
         pfx_event.extra["rpki"] = {}
 
+        memo_versions = self.get_memo_versions("tag_rpki")
         for origin in origins | old_origins:
+            status = self.memo.get("tag_rpki", (prefix, origin), memo_versions)
+            if status is MISSING:
+                status = self.datasets["rpki"].validate_prefix_origin(prefix, origin)
+                self.memo.put("tag_rpki", (prefix, origin), memo_versions, status)
             origin_validation_status[origin] = {
-                    "status": self.datasets["rpki"].validate_prefix_origin(prefix, origin),
+                    "status": status,
                     "asn": origin
             }
 
@@ -770,8 +827,15 @@ class TaggingMethodology:
         pfx_event.extra["irr"] = []
         origin_irr_status = {}
 
+        # validations only depend on ts if data newer than ts are loaded, which does not happen in normal operation
+        memoize = not self.datasets['irr'].has_data_after(ts)
+        memo_versions = self.get_memo_versions("tag_irr")
         for origin in origins | old_origins:
-            res = self.datasets['irr'].validate_prefix_origin(prefix, origin, ts)
+            res = self.memo.get("tag_irr", (prefix, origin), memo_versions) if memoize else MISSING
+            if res is MISSING:
+                res = self.datasets['irr'].validate_prefix_origin(prefix, origin, ts)
+                if memoize:
+                    self.memo.put("tag_irr", (prefix, origin), memo_versions, res)
             origin_irr_status[origin] = {
                                         'origin': origin,
                                         'exact': res['exact'],
@@ -825,13 +889,15 @@ class TaggingMethodology:
         if not attacker_origins_set:
             return []
 
-        origins_hash = (hash(tuple(attacker_origins_set)), hash(tuple(victim_origins_set)))
+        origins_key = (frozenset(attacker_origins_set), frozenset(victim_origins_set))
 
-        if "tag_relationships" not in self.tags_cache:
-            self.tags_cache["tag_relationships"] = {}
-        if origins_hash in self.tags_cache["tag_relationships"]:
-            # we have tagged this sets of origins previously in the current view, return the cached tags
-            return self.tags_cache["tag_relationships"][origins_hash]
+        memo_versions = self.get_memo_versions("tag_relationships")
+        cached = self.memo.get("tag_relationships", origins_key, memo_versions)
+        if self.metrics is not None:
+            self.metrics.record_cache("tag_relationships", cached is not MISSING)
+        if cached is not MISSING:
+            # we have tagged this sets of origins previously with the same datasets, return the cached tags
+            return cached
 
         # check required datasets
         for ds in ["as_rank", "friend_asns"]:
@@ -880,17 +946,11 @@ class TaggingMethodology:
         attacker_origin_list = list(attacker_origins_set)
         victim_origin_list = list(victim_origins_set)
 
+        # group the origins by organization/sibling group/friends set instead of checking every pair
+        self.sibling_index.refresh(tuple(self.get_dataset_version(ds) for ds in SiblingIndex.DATASETS))
+
         # check if the victims are siblings
-        all_siblings = True
-        some_siblings = False
-        for i in range(0, len(victim_origin_list) - 1):
-            for j in range(i + 1, len(victim_origin_list)):
-                if not self.datasets["as_rank"].are_siblings(victim_origin_list[i], victim_origin_list[j]) and \
-                        not self.datasets["friend_asns"].are_friends(victim_origin_list[i], victim_origin_list[j]) and \
-                        not self.datasets["siblings"].are_siblings(victim_origin_list[i], victim_origin_list[j]):
-                    all_siblings = False
-                else:
-                    some_siblings = True
+        some_siblings, all_siblings = self.sibling_index.check_siblings(victim_origin_list)
         # add tags based on some_siblings and all_siblings
         if some_siblings:
             # some origins are siblings
@@ -900,16 +960,7 @@ class TaggingMethodology:
                 tags.append(TagRelVictimAllSiblings)
 
         # check if the attackers are siblings
-        all_siblings = True
-        some_siblings = False
-        for i in range(0, len(attacker_origin_list) - 1):
-            for j in range(i + 1, len(attacker_origin_list)):
-                if not self.datasets["as_rank"].are_siblings(attacker_origin_list[i], attacker_origin_list[j]) and \
-                        not self.datasets["friend_asns"].are_friends(attacker_origin_list[i], attacker_origin_list[j]) and \
-                        not self.datasets["siblings"].are_siblings(attacker_origin_list[i], attacker_origin_list[j]):
-                    all_siblings = False
-                else:
-                    some_siblings = True
+        some_siblings, all_siblings = self.sibling_index.check_siblings(attacker_origin_list)
         # add tags based on some_siblings and all_siblings
         if some_siblings:
             # some origins are siblings
@@ -919,21 +970,10 @@ class TaggingMethodology:
                 tags.append(TagRelAttackerAllSiblings)
 
         # check if attackers and victims are siblings
-        all_siblings = True
-        some_siblings = False
-        for i in range(0, len(attacker_origin_list)):
-            is_sibling = False
-            for j in range(0, len(victim_origin_list)):
-                if self.datasets["as_rank"].are_siblings(attacker_origin_list[i], victim_origin_list[j]) or \
-                        self.datasets["friend_asns"].are_friends(attacker_origin_list[i], victim_origin_list[j]) or \
-                        self.datasets["siblings"].are_siblings(attacker_origin_list[i], victim_origin_list[j]):
-                    some_siblings = True
-                    is_sibling = True
-            if not is_sibling:
-                all_siblings = False
-        if some_siblings:
+        sibling_attackers = self.sibling_index.siblings_with_any(attacker_origin_list, victim_origin_list)
+        if sibling_attackers:
             tags.append(TagRelVictimAttackerSomeSiblings)
-            if all_siblings:
+            if len(sibling_attackers) == len(attacker_origin_list):
                 tags.append(TagRelVictimAttackerAllSiblings)
 
 
@@ -947,12 +987,19 @@ class TaggingMethodology:
         has_provider = set()
         has_customer = set()
 
+        # only ASes with a single provider and no peers can have a sole provider, look up their degree once
+        single_upstream = set()
+        for asn in origins_list:
+            degree = self.datasets["as_rank"].get_degree(asn)
+            if degree is not None and degree["provider"] == 1 and degree["peer"] == 0:
+                single_upstream.add(asn)
+
         for i in range(0, len(origins_list)):
             for j in range(i + 1, len(origins_list)):
                 # we will refer to the origins as i and j for convenience (even though they are the indices)
                 # first we check if i and j are in a p-c relationship
                 # if we have already found that j has a sole provider, it is ensured that i is not their provider
-                if origins_list[j] not in has_provider and \
+                if origins_list[j] not in has_provider and origins_list[j] in single_upstream and \
                                 self.datasets["as_rank"].is_sole_provider(origins_list[i], origins_list[j]):
                     # if i has another customer, then we no longer have a chain
                     if origins_list[i] in has_customer:
@@ -962,7 +1009,7 @@ class TaggingMethodology:
                         has_customer.add(origins_list[i])
                         has_provider.add(origins_list[j])
                 # now we check if i and j are in a c-p relationship
-                elif origins_list[i] not in has_provider and \
+                elif origins_list[i] not in has_provider and origins_list[i] in single_upstream and \
                                 self.datasets["as_rank"].is_sole_provider(origins_list[j], origins_list[i]):
                     if origins_list[j] in has_customer:
                         is_single_chain = False
@@ -1105,7 +1152,7 @@ class TaggingMethodology:
                 tags.append(TagRelAllVictimsStubAses)
 
         # cache tags
-        self.tags_cache["tag_relationships"][origins_hash] = tags
+        self.memo.put("tag_relationships", origins_key, memo_versions, tags)
 
         return tags
 
@@ -1367,50 +1414,51 @@ class TaggingMethodology:
         # cache-able tags
         ####
 
-        if "tag_edges" not in self.tags_cache:
-            self.tags_cache["tag_edges"] = {}
-
-        if edgeid in self.tags_cache["tag_edges"]:
-            tags.extend(self.tags_cache["tag_edges"][edgeid])
-        else:
-            to_cache = []
+        # the bidirectional check depends on the current view only, the other tags are reused across views while
+        # the datasets stay the same
+        memo_versions = self.get_memo_versions("tag_edges")
+        cached = self.memo.get("tag_edges", edgeid, memo_versions)
+        if self.metrics is not None:
+            self.metrics.record_cache("tag_edges", cached is not MISSING)
+        if cached is MISSING:
+            ed_tags = []
             # Check edit distance between the two ASes of the new edge
             common_min_ed = 1
-            ed = edit_distance(as1, as2, substitution_cost=1, transpositions=True)
-            if 0 != ed <= common_min_ed:
-                tags.append(TagEdgeSmallEditDistance)
-                to_cache.append(TagEdgeSmallEditDistance)
-
-            # Check if the new edge was just seen in both directions
-            bidirectional_edges = self.datasets["bi_edges_info"]
-            if bidirectional_edges.get(edgeid, []) == [1, 1] or bidirectional_edges.get(edgeid2, []) == [1, 1]:
-                tags.append(TagNewBidirectional)
-                to_cache.append(TagNewBidirectional)
+            if bounded_edit_distance(str(as1), str(as2), common_min_ed) == common_min_ed:
+                ed_tags.append(TagEdgeSmallEditDistance)
 
+            datasets_tags = []
             # Check if we observed the edge in the past
             if self.datasets["adjacencies"]:
                 if self.datasets["adjacencies"].is_neighbor_historical(as1, as2):
-                    tags.append(TagAdjPreviouslyObservedExact)
-                    to_cache.append(TagAdjPreviouslyObservedExact)
+                    datasets_tags.append(TagAdjPreviouslyObservedExact)
                 if self.datasets["adjacencies"].is_neighbor_historical(as2, as1):
-                    tags.append(TagAdjPreviouslyObservedOpposite)
-                    to_cache.append(TagAdjPreviouslyObservedOpposite)
+                    datasets_tags.append(TagAdjPreviouslyObservedOpposite)
 
             # check 2: check if the edge is between two ASNs that are at the same IXP
             # event.as1, event.as2 @ same IXP
             if self.datasets["ixp_info"]:
                 comm_ixps = self.datasets["ixp_info"].get_common_ixps(as1, as2)
                 if comm_ixps and len(comm_ixps) > 0:
-                    tags.append(TagIxpColocated)
-                    to_cache.append(TagIxpColocated)
+                    datasets_tags.append(TagIxpColocated)
             
             # Check if the new edge is between a Tier 1 ISP and Non-Tier 1 AS
             tier1_res = self.asn_is_Tier1([as1, as2])
             if sum(tier1_res.values()) == 1:
-                tags.append(TagNewEdgeConnectedToTier1)
-                to_cache.append(TagNewEdgeConnectedToTier1)
-            
-            self.tags_cache["tag_edges"][edgeid] = to_cache 
+                datasets_tags.append(TagNewEdgeConnectedToTier1)
+
+            cached = (ed_tags, datasets_tags)
+            self.memo.put("tag_edges", edgeid, memo_versions, cached)
+
+        ed_tags, datasets_tags = cached
+        tags.extend(ed_tags)
+
+        # Check if the new edge was just seen in both directions
+        bidirectional_edges = self.datasets["bi_edges_info"]
+        if bidirectional_edges.get(edgeid, []) == [1, 1] or bidirectional_edges.get(edgeid2, []) == [1, 1]:
+            tags.append(TagNewBidirectional)
+
+        tags.extend(datasets_tags)
 
         ####
         # non-cache-able tags
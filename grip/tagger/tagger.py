@@ -32,8 +32,11 @@
 import json
 import logging
 import os
+import queue
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import elasticsearch
 
 import wandio
@@ -41,13 +44,16 @@ from urllib3.exceptions import ProtocolError
 
 import grip.common
 import grip.coodinator.announce
+import grip.utils.data.elastic
 from grip.events.event import Event
 from grip.events.event_summary import EventSummary
 from grip.events.pfxevent_parser import PfxEventParser
 from grip.metrics.view_metrics import ViewMetrics
 from grip.redis import Pfx2AsNewcomer, Adjacencies, Pfx2AsHistorical, Pfx2AsNewcomerLocal
 from grip.tagger.cache_window import CacheWindow
+from grip.tagger.common import get_previous_origins, get_previous_origins_many
 from grip.tagger.finisher import Finisher
+from grip.tagger.memo import DEFAULT_MEMO_SIZE
 from grip.tagger.tags import tagshelper
 from grip.utils.data.asrank import AsRankUtils
 from grip.utils.data.siblings import Siblings
@@ -57,6 +63,7 @@ from grip.utils.data.hegemony import HegemonyUtils
 from grip.utils.data.ixpinfo import IXPInfo
 from grip.utils.data.reserved_prefixes import ReservedPrefixes
 from grip.utils.data.spamhaus import AsnDrop
+from grip.utils.bgp import ASPATHS
 from grip.utils.data.trusted_asns import TrustedAsns
 from grip.utils.kafka import KafkaHelper
 from grip.utils.messages import EventOnElasticMsg
@@ -141,6 +148,7 @@ class Tagger(object):
 
         self.force_process_view = options.get("force_process_view", False)
         self.produce_kafka_message = options.get("produce_kafka_message", True)
+        self.kafka_async = options.get("kafka_async", False)
         self.offsite_mode = options.get("offsite_mode", False)
         self.in_memory = options.get("in_memory_data", self.offsite_mode)  # if offsite mode then must in memory
 
@@ -155,6 +163,14 @@ class Tagger(object):
         self.tags = options.get("predetermined_tags", [])
         self.no_view_metrics = options.get("no_view_metrics", False)
         self.historic_mode = options.get("historic_mode", False)
+        # bounds of the bulk requests used to commit events to elasticsearch
+        self.es_bulk_chunk_size = options.get("es_bulk_chunk_size", grip.utils.data.elastic.BULK_CHUNK_SIZE)
+        self.es_bulk_max_bytes = options.get("es_bulk_max_bytes", grip.utils.data.elastic.BULK_MAX_CHUNK_BYTES)
+        # overlap reading the next views and committing the previous one with tagging when listening
+        self.pipelined_listen = options.get("pipelined_listen", False)
+        self.listen_prefetch_views = options.get("listen_prefetch_views", 1)
+        # number of worker threads used to tag the events of one view, 1 means serial tagging
+        self.tagging_workers = max(1, int(options.get("tagging_workers", 1)))
 
         self.name = name  # type of tagger: moas, submoas, defcon, edges
         self.consumer_filename_regex = file_regex  # regex to parse consumer files
@@ -165,7 +181,8 @@ class Tagger(object):
             finisher_pfxs = "/data/bgp/live/pfx-origins/production"
         self.finisher = Finisher(event_type=name, load_unfinished=options.get("load_unfinished", True), debug=self.DEBUG,\
                                 pfx_datadir=finisher_pfxs,
-                                esconf=self.elastic_conf_loc) if options.get("enable_finisher", False) else None
+                                esconf=self.elastic_conf_loc, kafka_async=self.kafka_async) \
+            if options.get("enable_finisher", False) else None
         # datasets and methodology
         self.datasets = {
             # production site datasets
@@ -187,7 +204,9 @@ class Tagger(object):
             "reserved_pfxs": ReservedPrefixes(),
         }
 
-        self.methodology = TaggingMethodology(datasets=self.datasets)
+        self.methodology = TaggingMethodology(datasets=self.datasets,
+                                              enable_metrics=options.get("tagging_metrics", False),
+                                              memo_size=options.get("memo_size", DEFAULT_MEMO_SIZE))
         self.window = CacheWindow()
 
         # data utilities
@@ -200,7 +219,12 @@ class Tagger(object):
                 else grip.common.KAFKA_TOPIC_TEMPLATE
             self.kafka_producer_topic = kafka_template % ("tagger", name)
             self.kafka = KafkaHelper()
-            self.kafka.init_producer(topic=self.kafka_producer_topic)
+            self.kafka.init_producer(topic=self.kafka_producer_topic, async_mode=self.kafka_async)
+
+        # previous origins of the current view, resolved in bulk before tagging
+        self.previous_origins = {}
+        self.previous_origins_ts = None
+        self.previous_origins_recent_ts = None
 
         # time tracking
         self.start_time = None
@@ -245,14 +269,78 @@ class Tagger(object):
     def tag_pfxevent(self, pfxevent):
         raise NotImplementedError
 
-    def _parse_consumer_file_for_pfx_events(self, event_type, consumer_filename, view_metrics=None, is_caching=False,
-                                            check_recurring=True):
+    def get_previous_origins_prefixes(self, pfxevent):
+        """
+        List the prefixes of a prefix event whose previous origins are needed by tag_pfxevent.
+        Taggers that look up previous origins should override this so that the lookups can be batched per view.
+
+        :param pfxevent: PfxEvent object
+        :return: list of prefixes
+        """
+        return []
+
+    def prefetch_previous_origins(self, view_ts, events):
+        """
+        Resolve the previous origins of all the prefix events to be tagged in the view with a few batched lookups.
+
+        :param view_ts: view timestamp
+        :param events: list of Event objects of the view
+        """
+        prefixes = set()
+        for event in events:
+            for pfx_event in event.pfx_events[:MAX_PFX_EVENTS_PER_EVENT_TO_TAG[self.name]]:
+                prefixes.update(self.get_previous_origins_prefixes(pfx_event))
+
+        self.previous_origins = {}
+        self.previous_origins_ts = view_ts
+        self.previous_origins_recent_ts = None
+        if not prefixes:
+            return
+
+        logging.info("looking up previous origins for {} prefixes".format(len(prefixes)))
+        self.previous_origins_recent_ts, self.previous_origins = get_previous_origins_many(
+            view_ts, prefixes, self.datasets, self.in_memory)
+
+    def get_previous_origins(self, view_ts, prefix):
+        """
+        Get the previous origins of a prefix, using the results prefetched for the view when available.
+
+        :param view_ts: view timestamp
+        :param prefix: prefix in question
+        :return: old_origins_set, outdated
+        """
+        if view_ts == self.previous_origins_ts:
+            if prefix in self.previous_origins:
+                old_origins_set, outdated = self.previous_origins[prefix]
+                # callers may modify the returned set
+                return set(old_origins_set), outdated
+            return get_previous_origins(view_ts, prefix, self.datasets, self.in_memory,
+                                        redis_recent_ts=self.previous_origins_recent_ts)
+        return get_previous_origins(view_ts, prefix, self.datasets, self.in_memory)
+
+    def get_view_datasets(self, parser):
+        """
+        Datasets collected while parsing the consumer file of a view, used for tagging that view only.
+
+        :param parser: the PfxEventParser that parsed the view's consumer file
+        :return: dictionary of datasets to add to self.datasets before tagging the view
+        """
+        return {}
+
+    def _iter_consumer_file_pfx_events(self, event_type, consumer_filename, view_metrics=None, is_caching=False,
+                                       check_recurring=True, parser=None):
+        """
+        Stream prefix events out of a consumer file, one line at a time.
+
+        Recurring NEW events are filtered out as they are read. The counters on view_metrics are set once the file
+        has been fully consumed.
+        """
         log_prefix = ""
         if is_caching:
             log_prefix = "caching: "
         logging.info("{}parsing consumer file to extract prefix events: {}".format(log_prefix, consumer_filename))
-        parser = PfxEventParser(event_type, is_caching)
-        pfx_events = []
+        if parser is None:
+            parser = PfxEventParser(event_type, is_caching)
         all_cnt, new_cnt, fin_cnt, skip_cnt, recur_cnt = 0, 0, 0, 0, 0
         try:
             for line in wandio.open(consumer_filename):
@@ -279,16 +367,16 @@ class Tagger(object):
                         # skipping recurring events
                         recur_cnt += 1
                         continue
-                    pfx_events.append(pfx_event)
                     new_cnt += 1
                     if self.DEBUG:
                         logging.debug("NEW: %s %s", pfx_event.details.get_prefix_of_interest(),
                                       [tag.name for tag in pfx_event.tags])
+                    yield pfx_event
                 elif pfx_event.position == "FINISHED":
-                    pfx_events.append(pfx_event)
                     fin_cnt += 1
                     if self.DEBUG:
                         logging.debug("FIN: %s", pfx_event.details.get_prefix_of_interest())
+                    yield pfx_event
         except ProtocolError as e:
             # handle connection broken more gracefully
             # TODO: find out what causes the connection broken error
@@ -300,7 +388,51 @@ class Tagger(object):
             view_metrics.consumer_fin_events_cnt = fin_cnt
             view_metrics.consumer_skip_events_cnt = skip_cnt
             view_metrics.consumer_recur_events_cnt = recur_cnt
-        return pfx_events
+
+    def _parse_consumer_file_for_pfx_events(self, event_type, consumer_filename, view_metrics=None, is_caching=False,
+                                            check_recurring=True):
+        return list(self._iter_consumer_file_pfx_events(event_type, consumer_filename, view_metrics, is_caching,
+                                                        check_recurring))
+
+    def _group_pfx_events(self, pfx_events):
+        """
+        Group a stream of prefix events into events in a single pass. FINISHED prefix events go straight to the
+        view's finished event, NEW ones to the new event they belong to.
+
+        :param pfx_events: iterable of PfxEvent objects
+        :return: dictionary of new events by event id, the finished event (or None), and the number of new pfx events
+        """
+        new_events = {}
+        finished_event = None
+        new_pfx_events_cnt = 0
+        count_32 = 0
+
+        for pfx_event in pfx_events:
+            # if it is a FINISHED event, add to the finished_event object
+            if pfx_event.position == "FINISHED":
+                if finished_event is None:
+                    finished_event = Event.from_pfxevent(pfx_event)
+                finished_event.add_pfx_event(pfx_event)
+                continue
+
+            new_pfx_events_cnt += 1
+
+            # add this prefix event to the appropriate high-level event
+            event_id = pfx_event.get_event_id()
+            if event_id not in new_events:
+                if self.name == "submoas" and \
+                        pfx_event.details.get_prefix_of_interest().endswith('/32') and\
+                        len(pfx_event.details.get_sub_aspaths()) == 1 and\
+                        pfx_event.details.get_sub_aspaths()[0][0] == '211398':
+                            count_32 += 1
+                            if count_32 > 50:
+                                continue
+
+                new_events[event_id] = Event.from_pfxevent(pfx_event)
+            event = new_events[event_id]
+            event.add_pfx_event(pfx_event)
+
+        return new_events, finished_event, new_pfx_events_cnt
 
     def retag_event(self, event:Event):
 
@@ -324,6 +456,8 @@ class Tagger(object):
 
             # main (per prefix-event) tagging function
             self.tag_pfxevent(pfx_event)
+            # the decoded paths are not needed anymore, the event is serialized from their string form
+            pfx_event.details.release_aspaths()
 
         event.summary.update()
 
@@ -355,10 +489,42 @@ class Tagger(object):
 
             # main (per prefix-event) tagging function
             self.tag_pfxevent(pfx_event)
+            # the decoded paths are not needed anymore, the event is serialized from their string form
+            pfx_event.details.release_aspaths()
 
         event.summary.update()
         return is_recurring
     
+    def _tag_event_timed(self, event: Event):
+        """
+        Tag one event and record the time spent on it in the event's metrics.
+
+        :param event: Event object
+        :return: whether the event is a recurring event
+        """
+        event_start_time = time.time()
+        is_recurring = self.tag_event(event)
+        event.event_metrics.proc_time_tagger = time.time() - event_start_time
+        return is_recurring
+
+    def _tag_events(self, events):
+        """
+        Tag a list of events, optionally spreading the work over a pool of worker threads.
+
+        The workers share the datasets already loaded for the current view. Each event is tagged by exactly one worker
+        and only its own prefix events are modified, so the resulting tags are identical to serial tagging. Results are
+        returned in the order of the input events, so that the following dump stays ordered.
+
+        :param events: list of Event objects
+        :return: list of booleans indicating whether each event is a recurring event
+        """
+        if self.tagging_workers <= 1 or len(events) <= 1:
+            return [self._tag_event_timed(event) for event in events]
+
+        logging.info("tagging {} events using {} workers".format(len(events), self.tagging_workers))
+        with ThreadPoolExecutor(max_workers=self.tagging_workers) as executor:
+            return list(executor.map(self._tag_event_timed, events))
+
     def _add_external_data(self, event, to_query_asrank=True, to_query_hegemony=True):
         """
         Query data sources and put the data into the event object
@@ -386,20 +552,14 @@ class Tagger(object):
                 for asn in hegemony_res:
                     event.add_to_asinfo(asn, "hegemony", hegemony_res[asn])           
 
-    def _produce_event(self, event, output_fh=None):
+    def _prepare_new_event(self, event):
         """
-        Output single event to file and produce the event to kafka for the components in the pipeline to consumer
+        Prepare a new event for output: register it with the finisher and set the finished time of low-duration
+        events.
 
-        :param event: the event object to produce
+        :param event: the new event object
+        :return: the name of the index to commit the event to
         """
-
-        if event.position == "FINISHED":
-            if self.finisher is not None:
-                self.finisher.process_finished_event(event=event)
-            # for finished events, we do not propagate further to the pipeline, nor do we commit it to elasticsearch
-            return
-
-        # processing of new event
         index_name = self.es_conn.infer_index_name_by_id(event_id=event.event_id, debug=self.DEBUG)
         if self.finisher is not None:
             event_finisher_start_time = time.time()
@@ -413,6 +573,36 @@ class Tagger(object):
                 pfx_event.finished_ts = pfx_event.view_ts + 300
             event.finished_ts = event.view_ts + 300
 
+        return index_name
+
+    def _announce_event(self, event, index_name, flush=False):
+        """
+        Send a Kafka message announcing an event committed to ElasticSearch to the downstream components.
+        """
+        kafka_msg = EventOnElasticMsg(
+            sender="tagger",
+            es_index=index_name,
+            es_id=event.event_id,
+            tr_worthy=event.summary.tr_worthy,
+        )
+        self.kafka.produce(kafka_msg.to_str(), topic=self.kafka_producer_topic, flush=flush)
+
+    def _produce_event(self, event, output_fh=None):
+        """
+        Output single event to file and produce the event to kafka for the components in the pipeline to consumer
+
+        :param event: the event object to produce
+        """
+
+        if event.position == "FINISHED":
+            if self.finisher is not None:
+                self.finisher.process_finished_event(event=event)
+            # for finished events, we do not propagate further to the pipeline, nor do we commit it to elasticsearch
+            return
+
+        # processing of new event
+        index_name = self._prepare_new_event(event)
+
         try:
             succeeded = self.es_conn.index_event(index=index_name, event=event)
         except elasticsearch.exceptions.RequestError as e:
@@ -425,38 +615,48 @@ class Tagger(object):
         if not self.produce_kafka_message:
             return
 
-        kafka_msg = EventOnElasticMsg(
-            sender="tagger",
-            es_index=index_name,
-            es_id=event.event_id,
-            tr_worthy=event.summary.tr_worthy,
-        )
-        self.kafka.produce(kafka_msg.to_str(), topic=self.kafka_producer_topic, flush=True)
+        self._announce_event(event, index_name, flush=True)
         if output_fh is not None:
             output_fh.write((event.as_json() + "\n").encode())
 
     def _dump_events(self, new_events, finished_event):
         """
         Output all events extracted in one consumer file to disk and kafka
+
+        New events are committed to ElasticSearch with bulk requests, and only the events that were successfully
+        indexed are announced on Kafka. Kafka messages are flushed once for the whole view.
         """
         assert isinstance(new_events, list)
 
         # update event summaries
         # process all new events
+        index_names = []
         for event in new_events:
             event.summary.update()
-            self._produce_event(event)
+            index_names.append(self._prepare_new_event(event))
+
+        if new_events:
+            indexed = self.es_conn.bulk_index_events(new_events, index_names,
+                                                     chunk_size=self.es_bulk_chunk_size,
+                                                     max_chunk_bytes=self.es_bulk_max_bytes)
+            logging.info("indexed {} out of {} new events".format(sum(indexed), len(new_events)))
+            if self.produce_kafka_message:
+                for event, index_name, succeeded in zip(new_events, index_names, indexed):
+                    if succeeded:
+                        self._announce_event(event, index_name)
 
         # process the only one finished event
         if finished_event is not None:
             self._produce_event(finished_event)
 
         if self.produce_kafka_message:
-            self.kafka.flush()
+            self.kafka.flush_checkpoint()
+        if self.finisher is not None:
+            self.finisher.flush()
 
     def cache_consumer_file(self, consumer_filename):
         # set is_caching=True to avoid saving aspaths for submoas and defcon
-        pfx_events = self._parse_consumer_file_for_pfx_events(self.name, consumer_filename, None, is_caching=True)
+        pfx_events = self._iter_consumer_file_pfx_events(self.name, consumer_filename, None, is_caching=True)
         for pfx_event in pfx_events:
             if not pfx_event.position == "NEW":
                 continue
@@ -478,14 +678,13 @@ class Tagger(object):
         for fn in cache_files:
             self.cache_consumer_file(fn)
 
-    def process_consumer_file(self, consumer_filename, cache_files=False):
+    def _read_view(self, consumer_filename, cache_files=False):
         """
-        Entry point function for the tagging process. it takes a consumer output file from disk, extracts events,
-        and writes the events to Elasticsearch and propagates events down the pipeline using Kafka
+        Read a consumer output file and build the events of the view, without tagging them.
 
         :param consumer_filename: the consumer file from disk
-        :param cache_files: whether to cache consumer files, default is False. Set to True if run manually
-        :return:
+        :param cache_files: whether to cache consumer files before reading the view
+        :return: dictionary describing the view, or None if the view should be skipped
         """
         ts = self.parse_timestamp(consumer_filename)
 
@@ -499,104 +698,166 @@ class Tagger(object):
         if not self.offsite_mode and not self.force_process_view and \
                 self.es_conn.view_metrics_exist(view_ts=ts, event_type=self.name, debug=self.DEBUG):
             logging.info("view already processed, skipping {}".format(consumer_filename))
-            return
+            return None
 
         ####
         # initialize tagging
         ####
 
-        self.start_time = time.time()
+        start_time = time.time()
         view_metrics = ViewMetrics(view_ts=ts, event_type=self.name, consumer_file_path=consumer_filename)
 
         ####
-        # Read prefix events from consumer output file
+        # Read prefix events from consumer output file and build events from them
         #### 
 
-        # The consumer output file contains prefix events, untagged
+        # The consumer output file contains prefix events, untagged. They are streamed from the file and grouped
+        # into events as they are read, without keeping an intermediate list of prefix events.
         # TODO: discard pfx events here?
-        pfx_events = self._parse_consumer_file_for_pfx_events(self.name, consumer_filename, view_metrics)
-
-        ####
-        # Build events from prefix events
-        #### 
-
-        # define temporary storage of new events and finished event
-        new_events = {}
-        finished_event = None
-        count_32 = 0
-
-        for pfx_event in pfx_events:
-            # if it is a FINISHED event, add to the finished_event object
-            if pfx_event.position == "FINISHED":
-                if finished_event is None:
-                    finished_event = Event.from_pfxevent(pfx_event)
-                finished_event.add_pfx_event(pfx_event)
-                continue
-
-            # add this prefix event to the appropriate high-level event
-            event_id = pfx_event.get_event_id()
-            if event_id not in new_events:
-                if self.name == "submoas" and \
-                        pfx_event.details.get_prefix_of_interest().endswith('/32') and\
-                        len(pfx_event.details.get_sub_aspaths()) == 1 and\
-                        pfx_event.details.get_sub_aspaths()[0][0] == '211398':
-                            count_32 += 1
-                            if count_32 > 50:
-                                continue
-
-                new_events[event_id] = Event.from_pfxevent(pfx_event)
-            event = new_events[event_id]
-            event.add_pfx_event(pfx_event)
+        # the prefix events of the view share their AS paths, see AsPathInterner
+        ASPATHS.new_table()
+        parser = PfxEventParser(self.name)
+        pfx_events = self._iter_consumer_file_pfx_events(self.name, consumer_filename, view_metrics, parser=parser)
+        new_events, finished_event, new_pfx_events_cnt = self._group_pfx_events(pfx_events)
 
         total_pfx_events_to_tag = sum(
             [len(event.pfx_events[:MAX_PFX_EVENTS_PER_EVENT_TO_TAG[self.name]]) for event in new_events.values()])
-        unfinished_pfx_events = [e for e in pfx_events if e.position != "FINISHED"]
         logging.info("view {} has {} new prefix events for {} events, tagging {} pfx events"
-                     .format(ts, len(unfinished_pfx_events), len(new_events), total_pfx_events_to_tag))
+                     .format(ts, new_pfx_events_cnt, len(new_events), total_pfx_events_to_tag))
+
+        return {
+            "ts": ts,
+            "consumer_filename": consumer_filename,
+            "start_time": start_time,
+            "view_metrics": view_metrics,
+            "new_events": new_events,
+            "finished_event": finished_event,
+            "datasets": self.get_view_datasets(parser),
+        }
 
-        ####
-        # Tagging
-        ####
+    def _tag_view(self, view):
+        """
+        Update datasets for the view and tag its new events.
+
+        :param view: view dictionary returned by _read_view
+        :return: list of non-recurring tagged events
+        """
+        ts = view["ts"]
+        new_events = view["new_events"]
 
         # Init
-        self.update_datasets(ts, consumer_filename)  # NOTE: only edges run special function to update dataset
+        self.update_datasets(ts, view["consumer_filename"])  # NOTE: only edges run special function to update dataset
+        self.datasets.update(view["datasets"])
         self.methodology.prepare_for_view(ts)
+        self.prefetch_previous_origins(ts, list(new_events.values()))
         # Actual tagging loop
 
         non_recurring_events = []
-        for event in new_events.values(): 
-            # update tagger time per event
-            event_start_time = time.time()
-            is_recurring = self.tag_event(event)
-            event.event_metrics.proc_time_tagger = time.time() - event_start_time
+        events = list(new_events.values())
+        tagging_results = self._tag_events(events)
+        for event, is_recurring in zip(events, tagging_results):
             self._add_external_data(event)
 
             if not is_recurring:
                 non_recurring_events.append(event)
 
         logging.info("tagging finished")
+        if self.methodology.metrics is not None:
+            view["view_metrics"].tagging_metrics = self.methodology.metrics.as_dict()
+            logging.info("tagging metrics for view {}: {}".format(ts, self.methodology.metrics.summary_str()))
+        logging.info("tagging memo after view {}: {}".format(ts, self.methodology.memo.summary_str()))
+        return non_recurring_events
 
-        ####
-        # output events to ElasticSearch and send Kafka messages to the downstream receivers (active driver, inference)
-        ####
+    def _output_view(self, view, non_recurring_events):
+        """
+        Output the tagged events of a view to ElasticSearch and send Kafka messages to the downstream receivers
+        (active driver, inference), or write them to the output file in offsite mode.
 
+        :param view: view dictionary returned by _read_view
+        :param non_recurring_events: tagged events to output
+        """
         # output events to ElasticSearch and Kafka
         if not self.offsite_mode:
-            self._dump_events(non_recurring_events, finished_event)  # output events
+            self._dump_events(non_recurring_events, view["finished_event"])  # output events
             # check transitions if any left over exist, due to missing pfx-origins data
             if self.finisher:
                 self.finisher.recheck_transition_events()
             # update metrics for this view
             if not self.no_view_metrics:
-                view_metrics.update_proc_time(self.start_time, time.time())
-                self.es_conn.index_view_metrics(view_metrics, debug=self.DEBUG)
+                view["view_metrics"].update_proc_time(view["start_time"], time.time())
+                self.es_conn.index_view_metrics(view["view_metrics"], debug=self.DEBUG)
         elif self.output_file:
             logging.info("writing tagged events to file: {}".format(self.output_file))
             with wandio.open(self.output_file, "w") as of:
-                json.dump([e.as_dict() for e in new_events.values()], of, indent=4)
+                json.dump([e.as_dict() for e in view["new_events"].values()], of, indent=4)
 
         logging.info("Done processing %s data", self.name)
 
+    def process_consumer_file(self, consumer_filename, cache_files=False):
+        """
+        Entry point function for the tagging process. it takes a consumer output file from disk, extracts events,
+        and writes the events to Elasticsearch and propagates events down the pipeline using Kafka
+
+        :param consumer_filename: the consumer file from disk
+        :param cache_files: whether to cache consumer files, default is False. Set to True if run manually
+        :return:
+        """
+        view = self._read_view(consumer_filename, cache_files=cache_files)
+        if view is None:
+            return
+        self.start_time = view["start_time"]
+
+        non_recurring_events = self._tag_view(view)
+        self._output_view(view, non_recurring_events)
+
+    def _listen_pipelined(self, listener, cache_files=False):
+        """
+        Pipelined version of the listening loop. Three stages run concurrently on consecutive views:
+        a reader thread reads and parses the consumer files of the next views, the main thread updates the datasets
+        and tags the current view, and an output thread commits the previous view. Views are committed in the order
+        they are announced.
+
+        The reader thread is the only one using the recurring events cache window, and the output thread the only one
+        using the finisher. The datasets are only used by the tagging stage.
+
+        :param listener: announcement listener
+        :param cache_files: whether to first cache consumer data for the past 24 hours
+        """
+        views = queue.Queue(maxsize=self.listen_prefetch_views)
+
+        def read_views():
+            to_cache = cache_files
+            try:
+                for in_ann in listener.listen():
+                    view = self._read_view(in_ann.path, cache_files=to_cache)
+                    to_cache = False  # only cache consumer files once
+                    if view is not None:
+                        views.put(view)
+            except Exception as e:
+                views.put(e)
+                raise
+            views.put(None)
+
+        reader = threading.Thread(target=read_views, name="tagger-reader", daemon=True)
+        reader.start()
+
+        pending_output = None
+        with ThreadPoolExecutor(max_workers=1) as output_executor:
+            while True:
+                view = views.get()
+                if view is None:
+                    break
+                if isinstance(view, Exception):
+                    raise view
+                self.start_time = view["start_time"]
+                non_recurring_events = self._tag_view(view)
+                if pending_output is not None:
+                    # wait for the previous view to be committed, raising its errors if any
+                    pending_output.result()
+                pending_output = output_executor.submit(self._output_view, view, non_recurring_events)
+            if pending_output is not None:
+                pending_output.result()
+
     def listen(self, group, offset, cache_files=False):
         """
         The listener function that listens to the kafka message from consumer for new incoming available consumer files.
@@ -613,6 +874,11 @@ class Tagger(object):
             auto_commit=True,  # manually commit offset after callback is finished
         )
 
+        if self.pipelined_listen:
+            # offsets are auto-committed, the pipelined loop reads ahead of the views being committed
+            self._listen_pipelined(listener, cache_files=cache_files)
+            return
+
         for in_ann in listener.listen():
             self.process_consumer_file(in_ann.path, cache_files=cache_files)
             if not listener.auto_commit:
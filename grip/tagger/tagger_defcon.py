@@ -31,7 +31,6 @@
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 from grip.events.details_defcon import DefconDetails
 from grip.tagger.tags import tagshelper
-from .common import get_previous_origins
 from .tagger import Tagger
 
 
@@ -45,6 +44,9 @@ class DefconTagger(Tagger):
             options=options,
         )
 
+    def get_previous_origins_prefixes(self, pfxevent):
+        return [pfxevent.details.get_super_pfx()]
+
     def tag_pfxevent(self, pfxevent):
         """
             Classify the defcon in legitimate and suspicious events
@@ -54,8 +56,8 @@ class DefconTagger(Tagger):
         assert isinstance(details, DefconDetails)
 
         # query redis to get previous origins
-        super_old_origins, OUTDATED = get_previous_origins(
-            pfxevent.view_ts, pfxevent.details.get_super_pfx(), self.datasets, self.in_memory)
+        super_old_origins, OUTDATED = self.get_previous_origins(
+            pfxevent.view_ts, pfxevent.details.get_super_pfx())
         if OUTDATED:
             pfxevent.add_tags([tagshelper.get_tag("outdated-info")])
         pfxevent.details.set_old_origins(super_old_origins)
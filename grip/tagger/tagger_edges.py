@@ -35,6 +35,7 @@ import collections
 import wandio
 
 from grip.events.details_edges import EdgesDetails
+from grip.events.pfxevent_parser import PfxEventParser
 from grip.tagger.tags import tagshelper
 from .tagger import Tagger
 
@@ -55,36 +56,29 @@ class EdgesTagger(Tagger):
         the consumer has value [d1, d2] where d1==1 indicates that the link has been seen in
         the exact direction and d2 indicates the opposite direction.
         """
-        edges_temp = collections.defaultdict(lambda: [0, 0])
+        parser = PfxEventParser(self.name)
         if consumer_filename is None:
-            return edges_temp
+            return parser.bi_edges_info
         with wandio.open(consumer_filename) as fh:
             # for each line in the file
             for line in fh:
                 # ignore commented lines
                 if line.startswith("#"):
                     continue
-                # consider only new events
-                if "NEW" in line:
-                    columns = line.strip().split("|")
-                    edge_key = columns[1]
-                    aspaths = columns[4].split(":")
-                    (as1, as2) = edge_key.split('-')
-                    as1_as2 = "%s %s" % (as1, as2)
-                    as2_as1 = "%s %s" % (as2, as1)
-                    if edges_temp[edge_key] != [1, 1]:
-                        for aspath in aspaths:
-                            if not len(aspath):
-                                continue
-                            if as1_as2 in aspath:
-                                edges_temp[edge_key][0] = 1
-                            elif as2_as1 in aspath:
-                                edges_temp[edge_key][1] = 1
-        return edges_temp
+                try:
+                    parser.parse_line(line)
+                except ValueError:
+                    continue
+        return parser.bi_edges_info
 
     def update_datasets(self, ts, consumer_filename=None):
         super(EdgesTagger, self).update_datasets(ts, consumer_filename)
-        self.datasets["bi_edges_info"] = self.find_bidirectional_new_edge(consumer_filename)
+        # the bidirectional edges of a view are collected while parsing its consumer file, see get_view_datasets.
+        # without a parsed consumer file, no edge is known to be bidirectional.
+        self.datasets["bi_edges_info"] = collections.defaultdict(lambda: [0, 0])
+
+    def get_view_datasets(self, parser):
+        return {"bi_edges_info": parser.bi_edges_info}
 
     def tag_pfxevent(self, pfxevent):
         tags = set()
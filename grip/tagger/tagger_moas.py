@@ -30,7 +30,6 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 from grip.events.details_moas import MoasDetails
-from grip.tagger.common import get_previous_origins
 from grip.tagger.methods import asn_should_keep
 from grip.tagger.tags import tagshelper
 from .tagger import Tagger
@@ -51,6 +50,9 @@ class MoasTagger(Tagger):
         )
         # static datasets: data do not change over time
 
+    def get_previous_origins_prefixes(self, pfxevent):
+        return [pfxevent.details.get_prefix_of_interest()]
+
     def tag_pfxevent(self, pfxevent):
 
         tags = set()
@@ -58,8 +60,8 @@ class MoasTagger(Tagger):
         assert isinstance(details, MoasDetails)
 
         # query redis to get previous origins
-        previous_origins, outdated = get_previous_origins(
-            pfxevent.view_ts, pfxevent.details.get_prefix_of_interest(), self.datasets, self.in_memory)
+        previous_origins, outdated = self.get_previous_origins(
+            pfxevent.view_ts, pfxevent.details.get_prefix_of_interest())
         if outdated:
             tags.add(tagshelper.get_tag("outdated-info"))
         # note: previous origins might be empty (e.g., if this is a new prefix compared to the bgpview
@@ -122,7 +124,7 @@ class MoasTagger(Tagger):
             self.methodology.tag_paths(
                 current_origins_set=current_origins,
                 previous_origins_set=previous_origins,
-                as_paths=aspaths,
+                as_paths=details.get_indexed_aspaths(),
             ),
             self.methodology.tag_relationships(
                 attacker_origins_set=attackers,
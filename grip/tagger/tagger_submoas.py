@@ -30,7 +30,6 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 from grip.events.details_submoas import SubmoasDetails
-from grip.tagger.common import get_previous_origins
 from grip.tagger.methods import asn_should_keep
 from grip.tagger.tags import tagshelper
 from .tagger import Tagger
@@ -46,6 +45,9 @@ class SubMoasTagger(Tagger):
             options=options,
         )
 
+    def get_previous_origins_prefixes(self, pfxevent):
+        return [pfxevent.details.get_super_pfx(), pfxevent.details.get_sub_pfx()]
+
     def tag_pfxevent(self, pfxevent):
 
         tags = set()
@@ -53,11 +55,10 @@ class SubMoasTagger(Tagger):
         assert isinstance(details, SubmoasDetails)
 
         # query redis to get previous origins, also add outdated-info if data is outdated
-        # TODO: cache this
-        super_old_origins, outdated_super = get_previous_origins(
-            pfxevent.view_ts, pfxevent.details.get_super_pfx(), self.datasets, self.in_memory)
-        sub_old_origins, outdated_sub = get_previous_origins(
-            pfxevent.view_ts, pfxevent.details.get_sub_pfx(), self.datasets, self.in_memory)
+        super_old_origins, outdated_super = self.get_previous_origins(
+            pfxevent.view_ts, pfxevent.details.get_super_pfx())
+        sub_old_origins, outdated_sub = self.get_previous_origins(
+            pfxevent.view_ts, pfxevent.details.get_sub_pfx())
         if outdated_sub or outdated_super:
             pfxevent.add_tags([tagshelper.get_tag("outdated-info")])
         pfxevent.details.set_old_origins(super_old_origins=super_old_origins, sub_old_origins=sub_old_origins)
@@ -114,7 +115,7 @@ class SubMoasTagger(Tagger):
             self.methodology.tag_paths(
                 current_origins_set=current_origins,
                 previous_origins_set=previous_origins,
-                as_paths=details.get_all_aspaths(),
+                as_paths=details.get_indexed_all_aspaths(),
             ),
             self.methodology.tag_relationships(
                 attacker_origins_set=attackers,
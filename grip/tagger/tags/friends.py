@@ -40,11 +40,13 @@ class OrgFriends:
     friend_asn_sets = None
     friend_asn_dict = None
     friend_org_sets = None
+    friend_group_ids = None
 
     def __init__(self):
         self.friend_asn_sets = []
         self.friend_org_sets = []
         self.friend_asn_dict = {}
+        self.friend_group_ids = {}
         self.load_friends_list()
 
     def load_friends_list(self):
@@ -60,12 +62,25 @@ class OrgFriends:
                             if asn not in self.friend_asn_dict:
                                 self.friend_asn_dict[asn] = []
                             self.friend_asn_dict[asn].append(ases_set)
+                            self.friend_group_ids.setdefault(asn, set()).add(len(self.friend_asn_sets) - 1)
                     if "orgs" in record:
                         orgs_set = set(record["orgs"])
                         self.friend_org_sets.append(orgs_set)
             except yaml.YAMLError as exc:
                 print(exc)
 
+    def get_snapshot_version(self):
+        """
+        the friends list is loaded once from the packaged file and never changes
+        """
+        return 0
+
+    def get_friend_groups(self, asn):
+        """
+        Get the indices of the friend ASN sets an AS belongs to. Two ASes are friends if they share a set.
+        """
+        return self.friend_group_ids.get(str(asn), set())
+
     def are_friends(self, asn1, asn2):
         """
         check if two ases are friends
@@ -30,8 +30,121 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
+import itertools
 import json
 
+# versions of the tag sets, unique across all sets so that a version also tells a replaced set apart
+_TAGSET_VERSIONS = itertools.count(1)
+
+# bits of the registered tags by name, filled when the tags helper loads the tags
+TAG_BITS = {}
+
+
+def get_tags_mask(tags):
+    """
+    Get the bitmask of tags given by names or Tag objects.
+
+    :return: tuple of the bitmask, and False if some of the tags are not registered
+    """
+    mask = 0
+    all_registered = True
+    for tag in tags:
+        bit = TAG_BITS.get(tag if isinstance(tag, str) else tag.name)
+        if bit is None:
+            all_registered = False
+        else:
+            mask |= bit
+    return mask, all_registered
+
+
+class TagSet(set):
+    """
+    Set of tags that also keeps the bitmask of the registered tags it contains, so that checking for tags takes a
+    few bit operations. The mask is updated when tags are added, and computed again after tags are removed.
+
+    Every change also gives the set a new version, for the summaries and metrics computed from the tags to tell whether
+    they are up to date.
+    """
+
+    def __init__(self, tags=()):
+        super().__init__(tags)
+        self._mask = None
+        self.version = next(_TAGSET_VERSIONS)
+
+    @property
+    def mask(self):
+        if self._mask is None:
+            mask = 0
+            for tag in self:
+                mask |= TAG_BITS.get(tag.name, 0)
+            self._mask = mask
+        return self._mask
+
+    def has_mask(self, mask):
+        return self.mask & mask == mask
+
+    def add(self, tag):
+        super().add(tag)
+        self.version = next(_TAGSET_VERSIONS)
+        if self._mask is not None:
+            self._mask |= TAG_BITS.get(tag.name, 0)
+
+    def update(self, *tags):
+        super().update(*tags)
+        self.version = next(_TAGSET_VERSIONS)
+        self._mask = None
+
+    def discard(self, tag):
+        super().discard(tag)
+        self.version = next(_TAGSET_VERSIONS)
+        self._mask = None
+
+    def remove(self, tag):
+        super().remove(tag)
+        self.version = next(_TAGSET_VERSIONS)
+        self._mask = None
+
+    def pop(self):
+        self._mask = None
+        self.version = next(_TAGSET_VERSIONS)
+        return super().pop()
+
+    def clear(self):
+        super().clear()
+        self._mask = 0
+        self.version = next(_TAGSET_VERSIONS)
+
+    def difference_update(self, *tags):
+        super().difference_update(*tags)
+        self.version = next(_TAGSET_VERSIONS)
+        self._mask = None
+
+    def intersection_update(self, *tags):
+        super().intersection_update(*tags)
+        self.version = next(_TAGSET_VERSIONS)
+        self._mask = None
+
+    def symmetric_difference_update(self, tags):
+        super().symmetric_difference_update(tags)
+        self.version = next(_TAGSET_VERSIONS)
+        self._mask = None
+
+    def __ior__(self, tags):
+        self.update(tags)
+        return self
+
+    def __iand__(self, tags):
+        self.intersection_update(tags)
+        return self
+
+    def __isub__(self, tags):
+        self.difference_update(tags)
+        return self
+
+    def __ixor__(self, tags):
+        self.symmetric_difference_update(tags)
+        return self
+
 
 class TagTrWorthy:
     def __init__(self, tags, worthy, explain, apply_to):
@@ -77,9 +190,23 @@ class Tag(object):
 
 
 class PlainTag(Tag):
+    """
+    Tag without a value. The registered plain tags are frozen and shared by all the events that have them.
+    """
+
     def __init__(self, name, category, definition="", comments=None):
         super().__init__(name, category, definition, comments)
         self.type = "plain"
+        self._hash = hash(self.to_json())
+        self._frozen = False
+
+    def freeze(self):
+        self._frozen = True
+
+    def __setattr__(self, key, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("registered tag {} cannot be modified".format(self.name))
+        super().__setattr__(key, value)
 
     def __lt__(self, other):
         return self.name < other.name
@@ -111,10 +238,11 @@ class PlainTag(Tag):
         return self.__str__()
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
 
     def __eq__(self, other):
-        return isinstance(other, PlainTag) and str(self) == str(other)
+        # the tag is only identified by its name
+        return self is other or (isinstance(other, PlainTag) and self.name == other.name)
 
 
 class ValueTag(Tag):
@@ -37,7 +37,7 @@ from copy import copy
 
 import yaml
 
-from grip.tagger.tags.tag import Tag, PlainTag, ValueTag, TagTrWorthy
+from grip.tagger.tags.tag import Tag, PlainTag, ValueTag, TagTrWorthy, TAG_BITS
 
 
 class TaggingException(Exception):
@@ -52,6 +52,7 @@ class TrWorthinessUndefined(TaggingException):
     pass
 
 DEFAULT_TAG_TYPE = "plain"
+EMPTY_TR_WORTHY_RULES = (0, [], [])
 TAG_TYPE_TO_CLASS = {
     "plain": PlainTag,
     "value": ValueTag,
@@ -63,6 +64,7 @@ class TagsHelper(object):
         # load tags from yaml files
         self._load_all_tags()
         self._load_all_tags_worthy()
+        self._compile_tags_worthy()
 
         self.blacklist_asns = self._load_blacklist_asns()
         self.registered_tags = {}
@@ -91,12 +93,18 @@ class TagsHelper(object):
             if raise_error:
                 raise UseUndefinedTag("use of undefined tag: %s" % tag_name)
             return None
+        tag = self.all_tag_map[tag_name]
+        if tag.type == "plain":
+            # plain tags are frozen and shared
+            return tag
         # make a copy when return the tag, the tag could be modified later
-        return copy(self.all_tag_map[tag_name])
+        return copy(tag)
 
     def parse_tag_dict(self, tag_dict):
         assert "name" in tag_dict
         t = self.all_tag_map[tag_dict["name"]]
+        if t.type == "plain":
+            return t
         return TAG_TYPE_TO_CLASS[t.type].from_dict(tag_dict, t.category, t.definition, t.comments)
 
     # def tag_from_str(self, tag_name, raise_error=False):
@@ -127,47 +135,41 @@ class TagsHelper(object):
                         if raise_error:
                             raise UseUndefinedTag(tag_name)
                         return None
-                return copy(self.all_tag_map[tag_name])
+                return self.get_tag(tag_name)
 
         raise UseUndefinedTag("use of undefined tag: %s" % tag_to_parse)
 
     def check_tr_worthy(self, event_type, tags_set):
         """
         Check if a given set of tags is traceroute worthy, and return the worthy tags.
+
+        All the tag combinations of the event type that are subsets of the tags are considered:
+        - if there is some no combination, it's not traceroute worthy
+        - else if there are some yes combinations, it's traceroute worthy and the worthy tags are their tags
+        - otherwise, it has only na combinations, thus it's traceroute worthy
+          note: it's not possible to have no tags at all, since there will be the "notags" Tag which is a na tag itself
+
         :param event_type: event type
         :param tags_set: set of tags
         :return: (bool, list)
         """
-        tag_names = {t.name for t in tags_set}
-        yes_tags = set()
-        no_tags = set()
-        na_tags = set()
-        for combination in self.tags_worthy_map:
-            if event_type not in combination.apply_to:
-                # event does no apply to this tr checking, skip
-                continue
-            current_tags = {t.name for t in combination.tags}
-            if current_tags.issubset(tag_names):
-                if combination.worthy == "yes":
-                    # it has a yes tag combination
-                    yes_tags.update(current_tags)
-                elif combination.worthy == "no":
-                    # it has a no tag combination
-                    no_tags.update(current_tags)
-                else:
-                    # it has na tag combination
-                    na_tags.update(current_tags)
-
-        if len(no_tags) > 0:
-            # if have some no tags, then it's not traceroute worthy
+        tag_bits = self.tag_bits
+        tags_mask = 0
+        for t in tags_set:
+            tags_mask |= tag_bits.get(t.name, 0)
+
+        no_tags_mask, no_masks, yes_rules = self.tr_worthy_rules.get(event_type, EMPTY_TR_WORTHY_RULES)
+        if tags_mask & no_tags_mask:
             return False, []
-        elif len(yes_tags) > 0:
-            # else if have some yes tags, then it's traceroute worthy
-            return True, list(yes_tags)
-        else:
-            # otherwise, it has only na tags or no tags at all, thus it's traceroute worthy
-            # note: it's not possible to have no tags at all, since there will be the "notags" Tag which is a na tag itself
-            return True, []
+        for mask in no_masks:
+            if tags_mask & mask == mask:
+                return False, []
+
+        yes_tags = set()
+        for mask, names in yes_rules:
+            if tags_mask & mask == mask:
+                yes_tags.update(names)
+        return True, list(yes_tags)
 
     def _load_all_tags(self):
         tag_map = {}
@@ -190,6 +192,14 @@ class TagsHelper(object):
                 print(exc)
         self.all_tag_map = tag_map
 
+        # each tag gets a bit, and the plain tags are shared by all events
+        self.tag_bits = {name: 1 << tag_id for tag_id, name in enumerate(self.all_tag_map)}
+        TAG_BITS.clear()
+        TAG_BITS.update(self.tag_bits)
+        for tag in self.all_tag_map.values():
+            if tag.type == "plain":
+                tag.freeze()
+
     def _load_all_tags_worthy(self):
         tags_worthy = []
         used_tags = set()
@@ -232,6 +242,38 @@ class TagsHelper(object):
 
         self.tags_worthy_map = tags_worthy
 
+    def _compile_tags_worthy(self):
+        """
+        Compile the tag combinations into bitmasks of tag bits by event type.
+
+        The single-tag no combinations are merged into one mask that is checked first, followed by the other no
+        combinations from the least to the most specific. The yes combinations keep their order, the na combinations
+        do not change the result and are left out.
+        """
+        rules = {}
+        for combination in self.tags_worthy_map:
+            names = [t.name for t in combination.tags]
+            mask = 0
+            for name in names:
+                mask |= self.tag_bits[name]
+            if not mask:
+                # combinations without tags do not change the result
+                continue
+            for event_type in combination.apply_to:
+                event_rules = rules.setdefault(event_type, [0, [], []])
+                if combination.worthy == "no":
+                    if len(set(names)) == 1:
+                        event_rules[0] |= mask
+                    else:
+                        event_rules[1].append(mask)
+                elif combination.worthy == "yes":
+                    event_rules[2].append((mask, {t.name for t in combination.tags}))
+
+        self.tr_worthy_rules = {
+            event_type: (no_tags_mask, sorted(no_masks, key=lambda mask: bin(mask).count("1")), yes_rules)
+            for event_type, (no_tags_mask, no_masks, yes_rules) in rules.items()
+        }
+
     @staticmethod
     def _load_blacklist_asns():
         asns = set()
@@ -0,0 +1,83 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+from unittest import TestCase
+
+from grip.tagger.asn_classification import *
+from grip.utils.data.trusted_asns import TrustedAsns
+
+
+class FakeAsRank:
+    def __init__(self, data):
+        self.data = data
+        self.rank_lookups = 0
+
+    def get_snapshot_version(self):
+        return 1
+
+    def get_rank_for_asns(self, asns):
+        self.rank_lookups += 1
+        return {asn: self.data[asn]["rank"] if asn in self.data else None for asn in asns}
+
+    def get_degree(self, asn):
+        return self.data[asn]["asnDegree"] if asn in self.data else None
+
+
+class TestAsnClassificationIndex(TestCase):
+
+    def setUp(self):
+        self.as_rank = FakeAsRank({
+            "3356": {"rank": 1, "asnDegree": {"provider": 0, "peer": 50, "customer": 6000}},
+            "15169": {"rank": 40, "asnDegree": {"provider": 3, "peer": 2000, "customer": 0}},
+        })
+        self.index = AsnClassificationIndex({"trust_asns": TrustedAsns(), "asndrop": None, "as_rank": self.as_rank})
+
+    def test_classify(self):
+        self.assertEqual([ASN_PRIVATE, ASN_AS_TRANS, ASN_TRUSTED, 0],
+                         self.index.classify_many([64512, "23456", 13335, 15169]))
+        # rank flags are only resolved on request
+        self.assertEqual(0, self.as_rank.rank_lookups)
+        self.assertEqual(ASN_STUB | ASN_RANK_RESOLVED, self.index.classify(15169, with_rank=True))
+        self.assertEqual(ASN_TRUSTED | ASN_TIER1 | ASN_RANK_RESOLVED, self.index.classify("3356", with_rank=True))
+        self.assertEqual(2, self.as_rank.rank_lookups)
+
+    def test_refresh(self):
+        self.index.refresh((0, None, 1))
+        self.index.classify_many([1, 2, 3], with_rank=True)
+        self.index.classify_many([1, 2, 3], with_rank=True)
+        self.assertEqual(1, self.as_rank.rank_lookups)
+        self.assertEqual(3, len(self.index))
+
+        # same versions keep the index, new versions drop it
+        self.index.refresh((0, None, 1))
+        self.assertEqual(3, len(self.index))
+        self.index.refresh((0, None, 2))
+        self.assertEqual(0, len(self.index))
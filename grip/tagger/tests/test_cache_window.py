@@ -0,0 +1,96 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import random
+from unittest import TestCase
+
+from grip.tagger.cache_window import CacheWindow, fingerprint_hash
+
+
+class DummyPfxEvent:
+    def __init__(self, view_ts, fingerprint, event_type="moas"):
+        self.view_ts = view_ts
+        self.event_type = event_type
+        self.fingerprint = fingerprint
+
+    def get_recurring_fingerprint(self):
+        return self.fingerprint
+
+
+class TestCacheWindow(TestCase):
+
+    def test_recurring(self):
+        window = CacheWindow(window_size=3600, bucket_size=300)
+        self.assertFalse(window.is_old_event_and_update(DummyPfxEvent(0, "a")))
+        self.assertTrue(window.is_old_event_and_update(DummyPfxEvent(300, "a")))
+        self.assertTrue(window.is_old_event_and_update(DummyPfxEvent(3600, "a")))
+        # recurring events do not refresh their last seen time
+        self.assertFalse(window.is_old_event_and_update(DummyPfxEvent(3900, "a")))
+        self.assertEqual(1, len(window))
+
+        # edges events with the same fingerprint in the same view are not recurring
+        self.assertFalse(window.is_old_event_and_update(DummyPfxEvent(3900, "b", "edges")))
+        self.assertFalse(window.is_old_event_and_update(DummyPfxEvent(3900, "b", "edges")))
+        self.assertTrue(window.is_old_event_and_update(DummyPfxEvent(4200, "b", "edges")))
+
+    def test_expiry(self):
+        window = CacheWindow(window_size=3600, bucket_size=300)
+        for ts in range(0, 3600, 300):
+            for i in range(10):
+                window.is_old_event_and_update(DummyPfxEvent(ts, "{}-{}".format(ts, i)))
+        self.assertEqual(120, len(window))
+        # the fingerprints of the first views leave the window one bucket at a time
+        window.is_old_event_and_update(DummyPfxEvent(4500, "new"))
+        self.assertEqual(121 - 30, len(window))
+        self.assertLess(window.memory_usage(), 200 * len(window) + 20000)
+
+        # time jumps over the whole window
+        window.is_old_event_and_update(DummyPfxEvent(100000, "new"))
+        self.assertEqual(1, len(window))
+
+    def test_same_as_dict(self):
+        rand = random.Random(1)
+        window = CacheWindow(window_size=3600, bucket_size=300)
+        last_seen = {}
+        ts = 0
+        for _ in range(2000):
+            ts += rand.choice([0, 0, 300, 300, 600, 5000])
+            fingerprint = str(rand.randrange(200))
+            event_type = rand.choice(["moas", "edges"])
+            seen = last_seen.get(fingerprint)
+            recurring = seen is not None and ts - seen <= 3600 and not (event_type == "edges" and seen == ts)
+            if not recurring:
+                last_seen[fingerprint] = ts
+            self.assertEqual(recurring, window.is_old_event_and_update(DummyPfxEvent(ts, fingerprint, event_type)))
+            # the fingerprints seen in the window are kept, and none older than one more bucket
+            live = {fingerprint_hash(fp) for fp, seen in last_seen.items() if ts - seen <= 3600}
+            self.assertTrue(live <= window.last_seen.keys())
+            self.assertTrue(all(ts - seen < 3600 + 300 for seen in window.last_seen.values()))
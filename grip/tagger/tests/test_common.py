@@ -0,0 +1,75 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import os
+import tempfile
+from unittest import TestCase
+
+from grip.redis import Pfx2AsNewcomerLocal
+from grip.tagger.common import get_previous_origins, get_previous_origins_many
+
+PFX_ORIGINS_LINES = [
+    "1589760000|8.8.8.0/24|15169|15169|STABLE",
+    "1589760000|1.2.3.0/24|100|100 200|CHANGED",
+    "1589760000|1.2.4.0/24|100|300 {400,500}|CHANGED",
+    "1589760000|10.0.0.0/8|100|100|REMOVED",
+]
+
+
+class TestPreviousOrigins(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        datafile = os.path.join(self.tmpdir.name, "pfx-origins.1589760000")
+        with open(datafile, "w") as fh:
+            fh.write("\n".join(PFX_ORIGINS_LINES) + "\n")
+        dataset = Pfx2AsNewcomerLocal(datafile=datafile)
+        dataset.check_and_load_data_from_timestamp(1589760300)
+        self.datasets = {"pfx2asn_newcomer_local": dataset}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_previous_origins_many_matches_single_lookups(self):
+        prefixes = ["8.8.8.0/24", "1.2.3.0/24", "1.2.4.0/24", "10.0.0.0/8", "192.168.0.0/16"]
+        for view_ts in [1589760300, 1589761200]:
+            recent_ts, bulk = get_previous_origins_many(view_ts, prefixes, self.datasets, True)
+            self.assertEqual(recent_ts, 1589760000)
+            self.assertEqual(set(bulk), set(prefixes))
+            for prefix in prefixes:
+                self.assertEqual(bulk[prefix], get_previous_origins(view_ts, prefix, self.datasets, True))
+
+    def test_previous_origins_many_values(self):
+        _, bulk = get_previous_origins_many(1589760300, ["1.2.3.0/24", "1.2.4.0/24", "10.0.0.0/8"],
+                                            self.datasets, True)
+        self.assertEqual(bulk["1.2.3.0/24"], ({"100", "200"}, False))
+        self.assertEqual(bulk["1.2.4.0/24"], ({"300"}, False))
+        self.assertEqual(bulk["10.0.0.0/8"], (set(), False))
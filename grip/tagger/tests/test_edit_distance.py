@@ -0,0 +1,76 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import random
+from unittest import TestCase
+
+from nltk import edit_distance
+
+from grip.tagger.edit_distance import bounded_edit_distance, distance_at_most_one
+from grip.tagger.tests.test_typo_index import random_edit, random_prefix
+
+
+class TestBoundedEditDistance(TestCase):
+    """
+    differential tests of the bounded edit distance against nltk.edit_distance
+    """
+
+    def setUp(self):
+        random.seed(0)
+
+    def assert_same_as_nltk(self, a, b, max_distance):
+        ed = edit_distance(a, b, substitution_cost=1, transpositions=True)
+        expected = ed if max_distance is None or ed <= max_distance else None
+        self.assertEqual(expected, bounded_edit_distance(a, b, max_distance), (a, b, max_distance))
+
+    def test_random_strings(self):
+        for _ in range(20000):
+            alphabet = random.choice(["ab", "abc", "0123456789./"])
+            a = "".join(random.choice(alphabet) for _ in range(random.randint(0, 8)))
+            b = "".join(random.choice(alphabet) for _ in range(random.randint(0, 8)))
+            self.assert_same_as_nltk(a, b, random.choice([None, 0, 1, 2, 3]))
+
+    def test_prefixes(self):
+        alphabet = "0123456789./"
+        for _ in range(5000):
+            a = random_prefix()
+            b = a
+            for _ in range(random.randint(0, 4)):
+                b = random_edit(b, alphabet)
+            self.assert_same_as_nltk(a, b, random.choice([None, 1, 2]))
+            ed = edit_distance(a, b, substitution_cost=1, transpositions=True)
+            self.assertEqual(ed if ed <= 1 else None, distance_at_most_one(a, b), (a, b))
+
+    def test_sequences(self):
+        self.assertEqual(1, bounded_edit_distance((8, 8, 8, 0), (8, 8, 0, 8), 2))
+        self.assertEqual(2, bounded_edit_distance(b"15169", b"16159"))
+        self.assertIsNone(bounded_edit_distance("15169", "8075", 1))
+        self.assertIsNone(bounded_edit_distance("15169", "15169", -1))
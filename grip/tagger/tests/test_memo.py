@@ -0,0 +1,100 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+from unittest import TestCase
+
+from grip.tagger.memo import TaggingMemo, MISSING
+from grip.tagger.methods import TaggingMethodology
+from grip.utils.data.rpki import RpkiUtils, RpkiValidationStatus
+from grip.utils.event_utils import create_dummy_event
+
+
+class TestTaggingMemo(TestCase):
+
+    def test_lru_eviction(self):
+        memo = TaggingMemo(max_size=2)
+        memo.put("tag_rpki", "a", (1,), "A")
+        memo.put("tag_rpki", "b", (1,), "B")
+        # touching a makes b the least recently used entry
+        self.assertEqual("A", memo.get("tag_rpki", "a", (1,)))
+        memo.put("tag_rpki", "c", (1,), "C")
+        self.assertIs(MISSING, memo.get("tag_rpki", "b", (1,)))
+        self.assertEqual("C", memo.get("tag_rpki", "c", (1,)))
+        self.assertEqual(2, len(memo))
+
+        stats = memo.as_dict()
+        self.assertEqual(1, stats["evictions"])
+        self.assertEqual([{"name": "tag_rpki", "hits": 2, "misses": 1, "hit_ratio": 2 / 3}], stats["methods"])
+
+    def test_versions(self):
+        memo = TaggingMemo()
+        memo.put("tag_rpki", "a", (1,), "A")
+        self.assertIs(MISSING, memo.get("tag_rpki", "a", (2,)))
+        self.assertIs(MISSING, memo.get("tag_irr", "a", (1,)))
+
+    def test_disabled(self):
+        memo = TaggingMemo(max_size=0)
+        memo.put("tag_rpki", "a", (1,), "A")
+        self.assertIs(MISSING, memo.get("tag_rpki", "a", (1,)))
+
+
+class TestTaggingMethodologyMemo(TestCase):
+
+    def setUp(self):
+        self.rpki = RpkiUtils(None)
+        self.rpki._load_roas([{"prefix": "8.8.8.0/24", "asn": "AS15169", "maxLength": 24}])
+        self.rpki.currend_ts = 1577836800
+        self.methods = TaggingMethodology(datasets={"rpki": self.rpki})
+
+    def tag_rpki_statuses(self, view_ts):
+        self.methods.prepare_for_view(view_ts)
+        pfx_event = create_dummy_event("moas", ts=view_ts).pfx_events[0]
+        self.methods.tag_rpki(pfx_event)
+        return {status["asn"]: status["status"] for status in pfx_event.extra["rpki"]}
+
+    def test_reuse_across_views(self):
+        statuses = self.tag_rpki_statuses(1577836800)
+        self.assertEqual({15169: RpkiValidationStatus.VALID, 12345: RpkiValidationStatus.INVALID_AS}, statuses)
+        self.assertEqual(self.tag_rpki_statuses(1577837100), statuses)
+        self.assertEqual({"name": "tag_rpki", "hits": 2, "misses": 2, "hit_ratio": 0.5},
+                         self.methods.memo.as_dict()["methods"][0])
+
+    def test_invalidate_on_new_snapshot(self):
+        self.tag_rpki_statuses(1577836800)
+
+        # same view, new ROAs loaded in place: results are reused until the next view
+        self.rpki._load_roas([{"prefix": "8.8.8.0/24", "asn": "AS12345", "maxLength": 24}])
+        self.rpki.currend_ts = 1577923200
+        self.assertEqual(RpkiValidationStatus.VALID, self.tag_rpki_statuses(1577836800)[15169])
+
+        statuses = self.tag_rpki_statuses(1577923200)
+        self.assertEqual({15169: RpkiValidationStatus.INVALID_AS, 12345: RpkiValidationStatus.VALID}, statuses)
+        self.assertEqual(4, self.methods.memo.as_dict()["methods"][0]["misses"])
@@ -71,6 +71,11 @@ class TestTagger(unittest.TestCase):
         self.moas_tagger = MoasTagger(options=self.options)
         self.moas_tagger.process_consumer_file("swift://bgp-hijacks-moas/year=2020/month=05/day=18/hour=00/moas.1589760000.events.gz")
 
+    def test_processing_moas_parallel(self):
+        options = dict(self.options, tagging_workers=4)
+        self.moas_tagger = MoasTagger(options=options)
+        self.moas_tagger.process_consumer_file("swift://bgp-hijacks-moas/year=2020/month=05/day=18/hour=00/moas.1589760000.events.gz")
+
     def test_processing_defcon_2(self):
         self.moas_tagger = DefconTagger(options=self.options)
         self.moas_tagger.process_consumer_file("swift://bgp-hijacks-defcon/year=2020/month=11/day=30/hour=17/subpfx-defcon.1606756500.events.gz")
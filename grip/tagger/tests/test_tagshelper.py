@@ -0,0 +1,90 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import random
+from unittest import TestCase
+
+from grip.tagger.tags import tagshelper
+
+EVENT_TYPES = ["moas", "submoas", "defcon", "edges"]
+
+
+def linear_check_tr_worthy(event_type, tags_set):
+    """
+    Check the traceroute worthiness by scanning all the tag combinations, as check_tr_worthy did before they were
+    compiled into bitmasks.
+    """
+    tag_names = {t.name for t in tags_set}
+    yes_tags = set()
+    no_tags = set()
+    for combination in tagshelper.tags_worthy_map:
+        if event_type not in combination.apply_to:
+            continue
+        current_tags = {t.name for t in combination.tags}
+        if current_tags.issubset(tag_names):
+            if combination.worthy == "yes":
+                yes_tags.update(current_tags)
+            elif combination.worthy == "no":
+                no_tags.update(current_tags)
+    if len(no_tags) > 0:
+        return False, []
+    return True, list(yes_tags)
+
+
+class TestCheckTrWorthy(TestCase):
+
+    def assert_same_as_linear(self, tags_set):
+        for event_type in EVENT_TYPES:
+            self.assertEqual(linear_check_tr_worthy(event_type, tags_set),
+                             tagshelper.check_tr_worthy(event_type, tags_set))
+
+    def test_each_combination(self):
+        rand = random.Random(0)
+        all_tags = list(tagshelper.all_tag_map.values())
+        for combination in tagshelper.tags_worthy_map:
+            # the combination alone, with one of its tags missing, and with other tags
+            self.assert_same_as_linear(set(combination.tags))
+            self.assert_same_as_linear(set(combination.tags[1:]))
+            self.assert_same_as_linear(set(combination.tags) | set(rand.sample(all_tags, 3)))
+
+    def test_random_tags(self):
+        rand = random.Random(0)
+        na_tags = [t for c in tagshelper.tags_worthy_map if c.worthy != "no" and len(c.tags) == 1 for t in c.tags]
+        all_tags = list(tagshelper.all_tag_map.values())
+        for _ in range(2000):
+            # mostly yes and na tags, as tags sets with a no tag are rarely traceroute worthy
+            tags_set = set(rand.sample(na_tags, rand.randint(0, 10)))
+            if rand.random() < 0.3:
+                tags_set.update(rand.sample(all_tags, rand.randint(1, 5)))
+            self.assert_same_as_linear(tags_set)
+
+    def test_unknown_event_type(self):
+        self.assertEqual((True, []), tagshelper.check_tr_worthy("unknown", {tagshelper.get_tag("notags")}))
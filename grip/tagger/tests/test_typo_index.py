@@ -0,0 +1,153 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import random
+from unittest import TestCase
+
+from nltk import edit_distance
+
+from grip.tagger.methods import TaggingMethodology
+from grip.tagger.tags import tagshelper
+from grip.tagger.typo_index import TypoIndex
+from grip.utils.event_utils import create_dummy_event
+
+
+def random_edit(s, alphabet):
+    i = random.randrange(len(s) + 1)
+    op = random.choice(["insert", "delete", "substitute", "transpose"])
+    if op == "insert" or not s:
+        return s[:i] + random.choice(alphabet) + s[i:]
+    i = min(i, len(s) - 1)
+    if op == "delete":
+        return s[:i] + s[i + 1:]
+    if op == "transpose" and i + 1 < len(s):
+        return s[:i] + s[i + 1] + s[i] + s[i + 2:]
+    return s[:i] + random.choice(alphabet) + s[i + 1:]
+
+
+def random_prefix():
+    return "{}.{}.{}.0/{}".format(random.randint(0, 20), random.randint(0, 20), random.randint(0, 20),
+                                  random.randint(8, 24))
+
+
+def reference_fat_finger_pfx_tags(as2pfx, new_origins_set, typo_pfx):
+    """
+    prefix edit distance check of tag_fat_finger computing the edit distance to every prefix of the newcomers
+    """
+    tags = []
+    ed_pfx = {x: None for x in new_origins_set}
+    is_pfx_typo = False
+    for new in new_origins_set:
+        min_ed = {'distance': float('inf'), 'prefix': None, 'newcomer': new}
+        if str(new) not in as2pfx:
+            continue
+        pfxs = [pfx for pfx in as2pfx[str(new)].split(',') if int(pfx.split("/")[1]) < 25]
+        if not pfxs:
+            continue
+        for pfx in pfxs:
+            ed = edit_distance(pfx, typo_pfx, substitution_cost=1, transpositions=True)
+            if ed < min_ed['distance']:
+                min_ed['distance'] = ed
+                min_ed['prefix'] = pfx
+        ed_pfx[new] = min_ed
+        if 0 != min_ed['distance'] <= 1:
+            is_pfx_typo = True
+            tags.append(tagshelper.get_tag("prefix-small-edit-distance"))
+    return tags, list(ed_pfx.values()) if is_pfx_typo else None
+
+
+class FakePfx2AsNewcomer:
+    def __init__(self, as2pfx):
+        self.as2pfx = as2pfx
+
+    def lookup_as(self, asn, max_ts=None):
+        if asn not in self.as2pfx:
+            return []
+        return [(self.as2pfx[asn], max_ts)]
+
+
+class TestTypoIndex(TestCase):
+    """
+    differential tests of the typo index against nltk.edit_distance
+    """
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_find_within_one(self):
+        alphabet = "0123456789./"
+        index = TypoIndex()
+        pfxs = [random_prefix() for _ in range(100)]
+        raw = ",".join(pfxs)
+        index.update(15169, raw, lambda r: r.split(","))
+        for _ in range(300):
+            query = random.choice(pfxs)
+            for _ in range(random.randint(0, 2)):
+                query = random_edit(query, alphabet)
+            expected = {}
+            for pfx in pfxs:
+                ed = edit_distance(pfx, query, substitution_cost=1, transpositions=True)
+                if ed <= 1:
+                    expected[pfx] = ed
+            self.assertEqual(expected, index.find_within_one("15169", query), query)
+
+    def test_incremental_update(self):
+        index = TypoIndex(max_origins=2)
+        index.update(1, "8.8.8.0/24,1.1.1.0/24", lambda r: r.split(","))
+        self.assertEqual({"8.8.8.0/24": 1}, index.find_within_one(1, "8.8.9.0/24"))
+        index.update(1, "1.1.1.0/24,9.9.9.0/24", lambda r: r.split(","))
+        self.assertEqual({}, index.find_within_one(1, "8.8.9.0/24"))
+        self.assertEqual({"9.9.9.0/24": 0}, index.find_within_one(1, "9.9.9.0/24"))
+
+        # least recently used origins are dropped
+        index.update(2, "2.2.2.0/24", lambda r: r.split(","))
+        index.update(3, "3.3.3.0/24", lambda r: r.split(","))
+        self.assertEqual(2, len(index))
+        self.assertEqual({}, index.find_within_one(1, "1.1.1.0/24"))
+
+    def test_tag_fat_finger(self):
+        alphabet = "0123456789./"
+        as2pfx = {str(asn): ",".join(random_prefix() for _ in range(random.randint(1, 40))) for asn in range(100, 110)}
+        methods = TaggingMethodology(datasets={"pfx2asn_newcomer": FakePfx2AsNewcomer(as2pfx)})
+        for _ in range(300):
+            new_origins = set(random.sample(range(100, 112), random.randint(1, 3)))
+            typo_pfx = random.choice(random.choice(list(as2pfx.values())).split(","))
+            for _ in range(random.randint(0, 2)):
+                typo_pfx = random_edit(typo_pfx, alphabet)
+            if typo_pfx.count("/") != 1 or not typo_pfx.split("/")[1].isdigit():
+                continue
+            pfx_event = create_dummy_event("moas").pfx_events[0]
+            tags = methods.tag_fat_finger(new_origins | {1}, {1}, pfx_event, typo_pfx, False)
+            expected_tags, expected_pfx_typo = reference_fat_finger_pfx_tags(as2pfx, (new_origins | {1}) - {1}, typo_pfx)
+            if int(typo_pfx.split("/")[1]) > 30:
+                expected_tags, expected_pfx_typo = [], None
+            self.assertEqual(expected_tags, [tag for tag in tags if tag.name == "prefix-small-edit-distance"])
+            self.assertEqual(expected_pfx_typo, pfx_event.extra.get("pfx_typo"))
@@ -0,0 +1,142 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+import collections
+import threading
+
+from grip.tagger.edit_distance import distance_at_most_one
+
+DEFAULT_TYPO_INDEX_SIZE = 20000
+
+
+def deletion_neighborhood(s):
+    """
+    All the strings obtained by deleting exactly one character of s.
+    """
+    return {s[:i] + s[i + 1:] for i in range(len(s))}
+
+
+class _OriginEntry:
+    """
+    the indexed strings of one origin, and their deletion neighborhoods
+    """
+
+    def __init__(self):
+        self.raw = None
+        self.strings = set()
+        self.deletes = {}
+
+    def update(self, raw, strings):
+        self.raw = raw
+        strings = set(strings)
+        for s in self.strings - strings:
+            for key in deletion_neighborhood(s):
+                owners = self.deletes[key]
+                owners.discard(s)
+                if not owners:
+                    del self.deletes[key]
+        for s in strings - self.strings:
+            for key in deletion_neighborhood(s):
+                self.deletes.setdefault(key, set()).add(s)
+        self.strings = strings
+
+    def find_within_one(self, s):
+        """
+        find the indexed strings within edit distance 1 of s
+        :return: dictionary with keys: strings, and values: distance (0 or 1)
+        """
+        res = {}
+        if s in self.strings:
+            res[s] = 0
+        # candidates: strings one deletion away from s, strings with s as a deletion, and strings sharing a deletion
+        candidates = set()
+        keys = deletion_neighborhood(s)
+        for key in keys:
+            if key in self.strings:
+                candidates.add(key)
+            candidates.update(self.deletes.get(key, ()))
+        candidates.update(self.deletes.get(s, ()))
+        for candidate in candidates:
+            if candidate not in res and distance_at_most_one(candidate, s) == 1:
+                res[candidate] = 1
+        return res
+
+
+class TypoIndex:
+    """
+    Per-origin typo index (SymSpell style) over the strings (e.g. prefixes) announced by each origin.
+
+    For every indexed string it keeps its single-character deletions, so that the strings within edit distance 1 of
+    a query are found with hash lookups instead of computing the edit distance to every string of the origin.
+    An origin's entry is updated incrementally when a new snapshot of its strings is seen. The least recently used
+    origins are dropped when the index grows over max_origins.
+    """
+
+    def __init__(self, max_origins=DEFAULT_TYPO_INDEX_SIZE):
+        # tagging may run on multiple worker threads
+        self._lock = threading.Lock()
+        self.max_origins = max_origins
+        self._origins = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._origins)
+
+    def update(self, origin, raw, parse):
+        """
+        Index the strings of an origin. Nothing is done if the origin was last indexed with the same raw value.
+
+        :param origin: origin ASN
+        :param raw: raw snapshot value of the origin's strings, used to detect changes
+        :param parse: function extracting the strings to index from raw
+        """
+        origin = str(origin)
+        with self._lock:
+            entry = self._origins.get(origin)
+            if entry is None:
+                entry = self._origins[origin] = _OriginEntry()
+                while len(self._origins) > self.max_origins:
+                    self._origins.popitem(last=False)
+            self._origins.move_to_end(origin)
+            if entry.raw != raw:
+                entry.update(raw, parse(raw))
+
+    def find_within_one(self, origin, s):
+        """
+        Find the strings of an origin within edit distance 1 of s.
+
+        :return: dictionary with keys: strings, and values: distance (0 or 1)
+        """
+        with self._lock:
+            entry = self._origins.get(str(origin))
+            if entry is None:
+                return {}
+            return entry.find_within_one(s)
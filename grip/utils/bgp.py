@@ -30,7 +30,10 @@
 #  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
 #  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
 
+import sys
+import threading
 import zlib
+from array import array
 
 
 def aspaths_as_str(aspaths, separator=":"):
@@ -68,6 +71,22 @@ def clean_up_asns(asns_tmp):
     return asns
 
 
+def _keep_path_str(path_str):
+    """
+    Whether aspaths_from_str keeps a path
+    """
+    return bool(path_str) and "{" not in path_str and "_" not in path_str
+
+
+def _is_canonical_aspaths_str(aspaths_str):
+    """
+    Whether aspaths_as_str returns the given string for the paths decoded from it, i.e. no path is dropped when
+    decoding it
+    """
+    s = aspaths_str
+    return "{" not in s and "_" not in s and "::" not in s and not s.startswith(":") and not s.endswith(":")
+
+
 def aspaths_from_str(aspaths_str):
     """
     construct aspaths from string.
@@ -82,8 +101,274 @@ def aspaths_from_str(aspaths_str):
     """
     if aspaths_str is None:
         return []
-    return [path_str.split(" ") for path_str in aspaths_str.split(":")
-            if path_str and "{" not in path_str and "_" not in path_str]
+    # the same ASNs appear on many paths, intern them to share the strings
+    return [[sys.intern(asn) for asn in path_str.split(" ")] for path_str in aspaths_str.split(":")
+            if _keep_path_str(path_str)]
+
+
+def origins_from_aspaths_str(aspaths_str):
+    """
+    Get the origins of the AS paths in string form, i.e. the last hops of the paths kept by aspaths_from_str, without
+    building the paths.
+    """
+    if aspaths_str is None:
+        return set()
+    return {sys.intern(path_str.rpartition(" ")[2]) for path_str in aspaths_str.split(":")
+            if _keep_path_str(path_str)}
+
+
+def intern_str(value):
+    """
+    Intern ASN and prefix strings, which are repeated across many prefix events. Other values are kept as they are.
+    """
+    return sys.intern(value) if type(value) is str else value
+
+
+def intern_asns(asns):
+    return {intern_str(asn) for asn in asns}
+
+
+class AsPathTable:
+    """
+    Unique AS paths, each stored once in string form. The paths are referred to by their IDs, i.e. their index in the
+    table.
+
+    The hops of a path (as a tuple of interned ASNs) and its IndexedAsPath are kept in the table once they are used
+    for a second time, i.e. when the path is shared by several prefix events. The paths of a single prefix event are
+    not kept decoded, as many paths are seen once in a view.
+    """
+
+    __slots__ = ("ids", "strs", "hops", "indexed", "lookups", "misses", "sharing", "skipped", "_used", "_lock")
+
+    def __init__(self):
+        self.ids = {}
+        self.strs = []
+        self.hops = []
+        self.indexed = []
+        # paths looked up and not found by AsPathInterner.intern, whether it still adds paths to the table, and the
+        # paths it did not intern since
+        self.lookups = 0
+        self.misses = 0
+        self.sharing = True
+        self.skipped = 0
+        # bit 1: the hops were built once, bit 2: the IndexedAsPath was built once
+        self._used = bytearray()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.strs)
+
+    def add(self, path_str):
+        """
+        Get the ID of a path in string form, adding the path to the table if it is not in it yet
+        """
+        path_id = self.ids.get(path_str)
+        if path_id is None:
+            with self._lock:
+                path_id = self.ids.get(path_str)
+                if path_id is None:
+                    path_id = len(self.strs)
+                    self.strs.append(path_str)
+                    self.hops.append(None)
+                    self.indexed.append(None)
+                    self._used.append(0)
+                    self.ids[path_str] = path_id
+        return path_id
+
+    def get_hops(self, path_id):
+        hops = self.hops[path_id]
+        if hops is None:
+            # the same ASNs appear on many paths, intern them to share the strings
+            hops = tuple([sys.intern(asn) for asn in self.strs[path_id].split(" ")])
+            if self._used[path_id] & 1:
+                self.hops[path_id] = hops
+            else:
+                self._used[path_id] |= 1
+        return hops
+
+    def get_indexed(self, path_id):
+        indexed = self.indexed[path_id]
+        if indexed is None:
+            indexed = IndexedAsPath(self.get_hops(path_id))
+            if self._used[path_id] & 2:
+                self.indexed[path_id] = indexed
+            else:
+                self._used[path_id] |= 2
+        return indexed
+
+
+class AsPathInterner:
+    """
+    Process-wide store of the AS paths of the prefix events (see ASPATHS). A busy view has many prefix events with the
+    same paths (the paths of the monitors towards the same origins), the prefix events keep the IDs of their paths in
+    a shared AsPathTable instead of their own copies.
+
+    The table is replaced by a new one for each view, or when it grows too large. Prefix events keep a reference to
+    the table their paths are in, so the paths of a table stay available as long as some prefix events use them.
+
+    A table costs more memory than the strings of the paths when the paths are not shared, so once sample_paths paths
+    have been looked up in a table, the paths are interned only if at least min_hit_ratio of them were already in
+    the table. Otherwise the prefix events keep their paths in string form, until as many paths as a table holds
+    were not interned, and the paths are sampled again in a new table.
+    """
+
+    def __init__(self, max_paths=200000, sample_paths=10000, min_hit_ratio=0.5):
+        self.max_paths = max_paths
+        self.sample_paths = sample_paths
+        self.min_hit_ratio = min_hit_ratio
+        self.table = AsPathTable()
+
+    def new_table(self):
+        """
+        Add the paths to a new table from now on, e.g. when a new view is processed
+        """
+        self.table = AsPathTable()
+
+    def intern(self, aspaths_str):
+        """
+        Intern the AS paths in string form (see aspaths_from_str)
+
+        :return: tuple of the table of the paths, and the array of their IDs, or (None, None) if the paths of the
+            current table are not shared enough
+        """
+        table = self.table
+        if not table.sharing:
+            # the count is only used as an estimate, so it is not updated under the lock
+            table.skipped += aspaths_str.count(":") + 1
+            if table.skipped < self.max_paths:
+                return None, None
+            # the paths may be shared again, e.g. in processes that do not replace the table for each view
+            self.new_table()
+            table = self.table
+        elif len(table) >= self.max_paths:
+            self.new_table()
+            table = self.table
+        path_strs = aspaths_str.split(":")
+        if "{" in aspaths_str or "_" in aspaths_str or "" in path_strs:
+            path_strs = [path_str for path_str in path_strs if _keep_path_str(path_str)]
+        # most paths are already in the table
+        ids = list(map(table.ids.get, path_strs))
+        # the counts are only used as an estimate, so they are not updated under the lock
+        table.lookups += len(ids)
+        if None in ids:
+            table.misses += ids.count(None)
+            ids = [table.add(path_str) if path_id is None else path_id for path_str, path_id in zip(path_strs, ids)]
+        if table.lookups >= self.sample_paths and table.misses > table.lookups * (1 - self.min_hit_ratio):
+            table.sharing = False
+        return table, array("I", ids)
+
+
+ASPATHS = AsPathInterner()
+
+
+class LazyAsPaths:
+    """
+    AS paths of a prefix event. The paths given in string form (see aspaths_from_str) are interned in ASPATHS and kept
+    as an array of path IDs, or kept as the string if ASPATHS does not intern the paths of the view; they are decoded
+    into lists of ASNs only when they are used, and the decoded paths (tuples shared with the other prefix events for
+    interned paths) can be released once they are not needed anymore (e.g. after tagging).
+
+    The string form of interned paths is built from the strings of the paths in the table.
+    """
+
+    __slots__ = ("_str", "_paths", "_table", "_ids")
+
+    def __init__(self, aspaths=None):
+        self._str = None
+        self._paths = None
+        self._table = None
+        self._ids = None
+        if isinstance(aspaths, list):
+            self._paths = aspaths
+        else:
+            s = aspaths if aspaths is not None else ""
+            self._table, self._ids = ASPATHS.intern(s)
+            if self._table is None:
+                self._str = s
+
+    def get(self):
+        """
+        the AS paths as lists (or tuples) of ASNs
+        """
+        if self._paths is None:
+            table = self._table
+            if table is None:
+                self._paths = aspaths_from_str(self._str)
+                return self._paths
+            paths = list(map(table.hops.__getitem__, self._ids))
+            if None in paths:
+                paths = [table.get_hops(path_id) for path_id in self._ids]
+            self._paths = paths
+        return self._paths
+
+    def get_indexed(self):
+        """
+        the IndexedAsPath of the AS paths, shared with the other prefix events with the same paths if they are interned
+        """
+        if self._table is None:
+            return index_aspaths(self.get())
+        table = self._table
+        indexed = list(map(table.indexed.__getitem__, self._ids))
+        if None in indexed:
+            indexed = [table.get_indexed(path_id) for path_id in self._ids]
+        return indexed
+
+    def as_str(self):
+        if self._table is not None:
+            return ":".join(map(self._table.strs.__getitem__, self._ids))
+        if self._str is not None and _is_canonical_aspaths_str(self._str):
+            return self._str
+        return aspaths_as_str(self.get())
+
+    def is_decoded(self):
+        return self._paths is not None
+
+    def release(self):
+        """
+        Drop the decoded AS paths if they can be decoded again from the interned paths or the string form
+        """
+        if self._table is not None or self._str is not None:
+            self._paths = None
+
+
+class IndexedAsPath:
+    """
+    AS path with the position of the first occurrence of each of its hops, to answer "is this AS on the path" and
+    "where" with dict lookups instead of scanning the path.
+    """
+
+    __slots__ = ("hops", "first_pos")
+
+    def __init__(self, aspath):
+        self.hops = tuple(aspath)
+        first_pos = {}
+        for idx, asn in enumerate(self.hops):
+            if asn not in first_pos:
+                first_pos[asn] = idx
+        self.first_pos = first_pos
+
+    @property
+    def hop_set(self):
+        """
+        the de-duplicated hops of the path
+        """
+        return self.first_pos.keys()
+
+    def __len__(self):
+        return len(self.hops)
+
+    def __contains__(self, asn):
+        return asn in self.first_pos
+
+    def index(self, asn):
+        return self.first_pos[asn]
+
+
+def index_aspaths(aspaths):
+    """
+    Build the IndexedAsPath of each AS path, paths that are already indexed are kept as they are.
+    """
+    return [aspath if isinstance(aspath, IndexedAsPath) else IndexedAsPath(aspath) for aspath in aspaths]
 
 
 def find_common_hops(aspaths):
@@ -94,7 +379,7 @@ def find_common_hops(aspaths):
     if len(aspaths) <= 1:
         # no common hops if there is only one (or zero) as path
         if aspaths:
-            return aspaths[0]
+            return list(aspaths[0])
         return []
 
     common_path = list(reversed(aspaths[0]))
@@ -139,7 +424,7 @@ def paths_str_to_lists(aspaths_str):
 def origins_from_str(origins_str):
     if origins_str is None:
         return None
-    return set(origins_str.split(" "))
+    return {sys.intern(asn) for asn in origins_str.split(" ")}
 
 
 def compress_aspaths_str(aspaths_str: str):
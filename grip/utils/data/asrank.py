@@ -205,6 +205,12 @@ class AsRankUtils:
         else:
             raise ValueError("no datasets from ASRank available to use for tagging")
 
+    def get_snapshot_version(self):
+        """
+        Get the version of the currently used ASRank dataset, which changes only when a new dataset is used
+        """
+        return self.data_ts
+
     def _query_asrank_for_asns(self, asns):
         assert all([isinstance(asn, str) for asn in asns])
         asns = [asn for asn in asns if asn not in self.cache]
@@ -286,6 +292,15 @@ class AsRankUtils:
             # we have None for some of the values
             return False
 
+    def get_org_id(self, asn):
+        """
+        Get the ID of the organization of an AS, None if unknown. ASes with the same organization ID are siblings.
+        """
+        organization = self.get_organization(asn)
+        if organization is None:
+            return None
+        return organization.get("orgId")
+
     def get_organization(self, asn):
         """
         Keys:
@@ -63,6 +63,7 @@ class AsRankLocal:
             'cones': None
         }
         self.datadir = datadir
+        self.org_ids = dict()  # asn -> orgId, built when the asns data is loaded
         self.data = {
             'asns': dict(),
             'orgs': dict(),
@@ -134,11 +135,33 @@ class AsRankLocal:
                     logging.info(f'{type} ASRank data are already loaded for {ts}, skipping.')
 
                 self.data[type] = json.load(gzip.open(self.ts_paths_map[type][closest_ts], 'rt', encoding='UTF-8'))
+                if type == 'asns':
+                    self.org_ids = self._build_org_ids()
 
                 self.current_ts[type] = closest_ts
 
         return True
 
+    def get_snapshot_version(self):
+        """
+        Get the version of the loaded ASRank data, which changes only when a new file of any type is loaded
+        """
+        return tuple(self.current_ts[type] for type in sorted(self.current_ts))
+
+    def _build_org_ids(self):
+        org_ids = {}
+        for asn, record in self.data['asns'].items():
+            org_id = (record.get('organization') or {}).get('orgId')
+            if org_id is not None:
+                org_ids[asn] = org_id
+        return org_ids
+
+    def get_org_id(self, asn):
+        """
+        Get the ID of the organization of an AS, None if unknown. ASes with the same organization ID are siblings.
+        """
+        return self.org_ids.get(asn)
+
     def are_siblings(self, asn1, asn2):
         """
         Check if two ASes are sibling ASes, i.e., they belong to the same organization
@@ -37,11 +37,13 @@ from unittest import TestCase
 
 from elasticsearch import Elasticsearch, NotFoundError
 from elasticsearch.exceptions import RequestError, ConnectionTimeout
+from elasticsearch.helpers import streaming_bulk
 
 import grip.events.event
 import grip.metrics.view_metrics
 from grip.common import ES_VIEW_METRICS_INDEX, ES_OPS_EVENTS_INDEX, \
     ES_CONFIG_LOCATION
+from grip.utils.general import ENCODED_PLACEHOLDER, dumps_with_encoded
 
 
 def convert_data_int_to_str(date, is_year):
@@ -57,6 +59,10 @@ MAIN_INDEX_NAME_PATTERN = 'observatory-v4-events-{}-{}-{}'
 TEST_INDEX_NAME_PATTERN = 'observatory-v4-test-events-{}-{}-{}'
 CUSTOM_INDEX_NAME_PATTERN = '{}-{}-{}-{}'
 
+# bounds of a single bulk request
+BULK_CHUNK_SIZE = 500
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+
 class ElasticConn:
     """maintain elasticsearch connection and provide utilities"""
 
@@ -205,11 +211,12 @@ class ElasticConn:
             event.last_modified_ts = int(datetime.datetime.now().strftime("%s"))
 
             if update:
+                # the event is sent encoded, see Event.as_json
                 self.es.update(index=index, id=event.event_id, body=
-                {
-                    "doc": event.as_dict(),
+                dumps_with_encoded({
+                    "doc": ENCODED_PLACEHOLDER,
                     "doc_as_upsert": upsert,
-                },
+                }, [event.as_json()]),
                 retry_on_conflict=10,
                                )
             else:
@@ -227,6 +234,57 @@ class ElasticConn:
 
         return succeeded
 
+    def bulk_index_events(self, events, indices=None, debug=False, prefix=None,
+                          chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES):
+        """
+        Index a list of Event objects into ElasticSearch using the bulk API. Events are sent in batches bounded both
+        by number of documents and by request size. Documents that fail are logged and reported, they do not stop
+        the indexing of the others.
+
+        :param events: list of Event objects
+        :param indices: (optional) list of index names, one per event
+        :param debug: whether to commit the events to debug index
+        :param prefix: (optional) custom index name prefix
+        :param chunk_size: maximum number of documents per bulk request
+        :param max_chunk_bytes: maximum size in bytes of a bulk request
+        :return: list of booleans, True if the corresponding event was indexed
+        """
+        if indices is None:
+            indices = [self.infer_index_name_by_id(event.event_id, debug, prefix) for event in events]
+        assert len(indices) == len(events)
+
+        def generate_actions():
+            for event, index in zip(events, indices):
+                assert (isinstance(event, grip.events.event.Event))
+                self.validate_index(index)
+                # update insert time and last modified time before inserting it to elasticsearch
+                if event.insert_ts is None:
+                    # only update insert_ts if insert_ts is not available
+                    event.insert_ts = int(datetime.datetime.now().strftime("%s"))
+                event.last_modified_ts = int(datetime.datetime.now().strftime("%s"))
+                yield {
+                    "_op_type": "index",
+                    "_index": index,
+                    "_id": event.event_id,
+                    "_source": event.as_json(),
+                }
+
+        succeeded = {}
+        failed_cnt = 0
+        for ok, item in streaming_bulk(self.es, generate_actions(), chunk_size=chunk_size,
+                                       max_chunk_bytes=max_chunk_bytes,
+                                       raise_on_error=False, raise_on_exception=False):
+            result = item.get("index", {})
+            succeeded[result.get("_id")] = ok
+            if not ok:
+                failed_cnt += 1
+                logging.error("bulk indexing failed for {}: {}".format(result.get("_id"), result.get("error")))
+
+        if failed_cnt:
+            logging.error("bulk indexing failed for {} out of {} events".format(failed_cnt, len(events)))
+
+        return [succeeded.get(event.event_id, False) for event in events]
+
     def count_indices(self, pattern):
         indices = self.es.cat.indices(index=pattern, h='index', format='json')
         return len(indices)
@@ -252,22 +310,27 @@ class ElasticConn:
 
         return data['count'] >= 1
 
-    def get_event_by_id(self, event_id, index=None, debug=False, prefix=None):
+    def get_event_by_id(self, event_id, index=None, debug=False, prefix=None, hydration="full"):
         """
         retrieve event object of givent event_id from ElasticSearch
 
         :param event_id: event id to look for event
         :param index: (optional) ElasticSearch index name
         :param debug: whether the event is in debug index
+        :param hydration: parts of the event to retrieve and decode, see grip.events.event.HYDRATION_SOURCE_EXCLUDES
         :return: Event object, or none if retrieval failed
         """
         if index is None:
             index = self.infer_index_name_by_id(event_id, debug, prefix)
+        excludes = grip.events.event.HYDRATION_SOURCE_EXCLUDES[hydration]
         try:
-            event_json = self.es.get(index=index, id=event_id)["_source"]
+            if excludes:
+                event_json = self.es.get(index=index, id=event_id, _source_excludes=excludes)["_source"]
+            else:
+                event_json = self.es.get(index=index, id=event_id)["_source"]
         except NotFoundError:
             return None
-        return grip.events.event.Event.from_dict(event_json)
+        return grip.events.event.Event.from_dict(event_json, hydration)
 
     def id_generator(self, index, query, timeout="10m"):
         # get point in time
@@ -298,7 +361,7 @@ class ElasticConn:
         # close point in time
         self.es.close_point_in_time({'id': pit['id']})
 
-    def search_generator(self, index, query=None, limit=-1, timeout="10m", raw_json=False):
+    def search_generator(self, index, query=None, limit=-1, timeout="10m", raw_json=False, hydration="full"):
         """
         search for events based on match conditions, yields Event object
         :param index: ES index to search
@@ -306,6 +369,8 @@ class ElasticConn:
         :param limit: limit of total number of objects to return
         :param timeout: timeout string, e.g. "10m" means 10 minutes
         :param raw_json: true if to return raw json string, otherwise return Event object
+        :param hydration: parts of the events to retrieve and decode, see grip.events.event.HYDRATION_SOURCE_EXCLUDES.
+                          ignored if the query selects the _source fields itself.
         :return:
         """
         # https://www.elastic.co/guide/en/elasticsearch/reference/7.16/paginate-search-results.html#scroll-search-results
@@ -322,6 +387,10 @@ class ElasticConn:
                 }
             }
 
+        excludes = grip.events.event.HYDRATION_SOURCE_EXCLUDES[hydration]
+        if excludes and "_source" not in query:
+            query["_source"] = {"excludes": excludes}
+
         # get point in time
         pit = self.es.open_point_in_time(index=index, keep_alive=timeout)
         pit['keep_alive'] = timeout
@@ -341,7 +410,7 @@ class ElasticConn:
                     if raw_json:
                         event = e["_source"]
                     else:
-                        event = grip.events.event.Event.from_dict(e["_source"])
+                        event = grip.events.event.Event.from_dict(e["_source"], hydration)
                     yield event
                 except TypeError as err:
                     logging.error("%s", err)
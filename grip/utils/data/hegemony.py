@@ -36,7 +36,8 @@ from datetime import datetime, timedelta
 from pprint import pprint
 from pathlib import Path
 import os, json, gzip, time
-from itertools import groupby
+import threading
+import numpy as np
 import requests
 from future.utils import iteritems
 from requests import ConnectionError, HTTPError
@@ -58,6 +59,66 @@ def floor_ts(ts):
     return ts - ts % 900
 
 
+def count_valleys(scores, ids, lengths, threshold):
+    """
+    Count the hegemony valleys of AS paths in one pass over a padded matrix of their hegemony scores.
+
+    Consecutive hops with the same score are reduced to one. A peak is a hop with a higher score than its neighbors,
+    or a first or last hop with a higher score than its only neighbor, and a valley is the part of a path between two
+    consecutive peaks. A valley is counted if the average relative depth of its lowest hop from both peaks is at
+    least the threshold.
+
+    :param scores: array of global hegemony scores by interned ASN
+    :param ids: array of the interned ASNs of all the hops of the paths
+    :param lengths: array of the path lengths
+    :param threshold: minimal depth of the counted valleys
+    :return: array of the number of valleys of each path
+    """
+    num_paths = len(lengths)
+    width = int(lengths.max()) if num_paths else 0
+    if width < 3:
+        # need at least 3 hops with not equal global hegemony scores to form a valley
+        return np.zeros(num_paths, dtype=np.int64)
+
+    # padded score matrix, NaN after the end of each path
+    hops = np.arange(width)
+    in_path = hops < lengths[:, None]
+    hege = np.full((num_paths, width), np.nan)
+    hege[in_path] = scores[ids]
+
+    # reduce consecutive hops with the same score to one, moving the kept hops to the front of each row
+    keep = in_path.copy()
+    keep[:, 1:] &= hege[:, 1:] != hege[:, :-1]
+    lengths = keep.sum(axis=1)
+    order = np.argsort(~keep, axis=1, kind="stable")
+    hege = np.where(hops < lengths[:, None], np.take_along_axis(hege, order, axis=1), np.nan)
+
+    # find all peaks
+    long_enough = lengths >= 3
+    peaks = np.zeros((num_paths, width), dtype=bool)
+    peaks[:, 1:-1] = (hege[:, :-2] < hege[:, 1:-1]) & (hege[:, 1:-1] > hege[:, 2:])
+    peaks[:, 0] = hege[:, 0] > hege[:, 1]
+    rows = np.flatnonzero(long_enough)
+    last = lengths[rows] - 1
+    peaks[rows, last] = hege[rows, last] > hege[rows, last - 1]
+    peaks &= long_enough[:, None]
+
+    # valleys between consecutive peaks of a path
+    peak_rows, peak_hops = np.nonzero(peaks)
+    if len(peak_rows) < 2:
+        return np.zeros(num_paths, dtype=np.int64)
+    peak_positions = peak_rows * width + peak_hops
+    # the lowest score from each peak to the next one, the peak itself is never lower than the hop before it
+    minimums = np.minimum.reduceat(hege.ravel(), peak_positions)[:-1]
+    same_path = peak_rows[1:] == peak_rows[:-1]
+    before = hege[peak_rows[:-1], peak_hops[:-1]]
+    after = hege[peak_rows[1:], peak_hops[1:]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_depth = ((before - minimums) / before + (after - minimums) / after) / 2.0
+    counted = same_path & (before != 0) & (after != 0) & (avg_depth >= threshold)
+    return np.bincount(peak_rows[:-1][counted], minlength=num_paths)
+
+
 class HegemonyUtils:
     """
     IIJ AS hegemony score utility class
@@ -71,6 +132,12 @@ class HegemonyUtils:
         self.cache = {}
         self.cached_subgraph = set()
 
+        # global hegemony scores by interned ASN, ID 0 is for ASes without scores
+        # tagging may run on multiple worker threads
+        self._global_lock = threading.Lock()
+        self.global_asn_ids = {}
+        self.global_scores = np.zeros(1)
+
         self.cache_ts = {
             'global': None,
             'local': None
@@ -105,6 +172,9 @@ class HegemonyUtils:
         if scope == 'global':
             self.cache.pop('0', None)
             self.cached_subgraph.discard('0')
+            with self._global_lock:
+                self.global_asn_ids = {}
+                self.global_scores = np.zeros(1)
         else:
             self.cache = { '0': self.cache['0'] } if '0' in self.cache else dict()
             self.cached_subgraph = self.cached_subgraph.intersection({'0'})
@@ -112,6 +182,53 @@ class HegemonyUtils:
     def _load_data(self, data):
         self.cache.update(data)
         self.cached_subgraph.update(data.keys())
+        if '0' in data:
+            self._intern_global_scores(data['0'])
+
+    def _intern_global_scores(self, scores):
+        """
+        Add global hegemony scores to the dense score array, new ASes get the next IDs.
+
+        The IDs of the new ASes are published only once the score array covers them.
+        """
+        with self._global_lock:
+            asn_ids = self.global_asn_ids
+            new_asns = []
+            new_scores = []
+            for asn, score in scores.items():
+                asn_id = asn_ids.get(asn)
+                if asn_id is None:
+                    new_asns.append(asn)
+                    new_scores.append(score)
+                else:
+                    self.global_scores[asn_id] = score
+            if new_scores:
+                first_id = len(self.global_scores)
+                self.global_scores = np.concatenate([self.global_scores, np.array(new_scores, dtype=np.float64)])
+                for offset, asn in enumerate(new_asns):
+                    asn_ids[asn] = first_id + offset
+
+    def get_global_asn_ids(self, paths):
+        """
+        Get the interned IDs of the ASes on the paths, querying the global hegemony scores of unknown ASes if the
+        data are not loaded in memory.
+
+        :return: tuple of the score array the IDs index, the array of the IDs of all the hops of the paths, and the
+            array of the path lengths
+        """
+        if not self.memory['global']:
+            unique_ases = set()
+            for path in paths:
+                unique_ases.update(path)
+            missing = [asn for asn in unique_ases if asn not in self.global_asn_ids]
+            if missing:
+                self._intern_global_scores(self.query_hegemony(subgraph_asn_lst=[0], asn_lst=missing)["0"])
+        with self._global_lock:
+            scores = self.global_scores
+            get_id = self.global_asn_ids.get
+            ids = np.array([get_id(asn, 0) for path in paths for asn in path], dtype=np.int64)
+        lengths = np.array([len(path) for path in paths], dtype=np.int64)
+        return scores, ids, lengths
 
     def update_ts(self, ts):
         """
@@ -166,84 +283,22 @@ class HegemonyUtils:
         """ Count number of valleys, which depth is >= th, and ASes on the valleys
         :return: num of valleys, ASes on the valley, depth
         """
-        ####
-        # get global hegemony paths of observed paths
-        ####
-
-        unique_ases = set()
-        for path in paths:
-            unique_ases.update(path)
-        hegemony_scores = self.query_hegemony(subgraph_asn_lst=[0], asn_lst=list(unique_ases))["0"]
-
-        # hegemony paths
-        hege_paths = []
-        for path in paths:
-            # remove consecutive ASes
-            new_path = [v for i, v in enumerate(path) if i == 0 or v != path[i - 1]]
-            hege_paths.append([(asn, hegemony_scores[asn]) for asn in new_path])
-
-        if not hege_paths:
+        if not paths:
             return 0.0, []
 
-        ####
-        # look for valleys
-        ####
+        scores, ids, lengths = self.get_global_asn_ids(paths)
+        valleys = count_valleys(scores, ids, lengths, threshold)
 
-        valleys = []
+        # save valley paths for record keeping, the scores of their ASes were cached by loading or querying them
         paths_with_valleys = []
-        for index, hege_path in enumerate(hege_paths):
-            
-            # reduce consecutive ases with same global hegemony score to one
-            reduced_hege_path = [x[0] for x in groupby(map(lambda x: x[1], hege_path))]
-
-            if len(reduced_hege_path) < 3:
-                # need at least 3 hops with not equal global hegemony scores to form a valley
-                continue
-
-            # find all peaks based on global hegemony scores
-            peak_idxs = []
-
-            for i in range(1, len(reduced_hege_path) - 1):
-                prev_score = reduced_hege_path[i - 1]
-                curr_score = reduced_hege_path[i]
-                next_score = reduced_hege_path[i + 1]
-                # case 1: peak at the first element
-                if i == 1 and prev_score > curr_score:
-                    peak_idxs.append(0)
-                # case 2: peak at the current element
-                if prev_score < curr_score and curr_score > next_score:
-                    peak_idxs.append(i)
-                # case 3: peak at the last element
-                if i == len(reduced_hege_path) - 2 and next_score > curr_score:
-                    peak_idxs.append(i + 1)
-
-            # count valleys
-            if len(peak_idxs) <= 1:
-                # one peak create no valleys
-                valleys.append(0)
-                continue
+        hegemony_scores = self.cache.get('0', {})
+        for index in np.flatnonzero(valleys).tolist():
+            path = paths[index]
+            # remove consecutive ASes
+            new_path = [v for i, v in enumerate(path) if i == 0 or v != path[i - 1]]
+            paths_with_valleys.append([(asn, hegemony_scores.get(asn, 0)) for asn in new_path])
 
-            valley_cnt = 0
-            for i in range(1, len(peak_idxs)):
-                local_minimum = min(reduced_hege_path[peak_idxs[i - 1]: peak_idxs[i] + 1])
-                
-                # calculate each depth between each peak and minimum
-                try:
-                    depth_before_bottom = (reduced_hege_path[peak_idxs[i - 1]] - local_minimum) / float(
-                        reduced_hege_path[peak_idxs[i - 1]])
-                    depth_after_bottom = (reduced_hege_path[peak_idxs[i]] - local_minimum) / float(reduced_hege_path[peak_idxs[i]])
-                    avg_depth = (depth_before_bottom + depth_after_bottom) / 2.0
-                    # we count depth, only when it is larger than threshold
-                    if avg_depth >= threshold:
-                        valley_cnt += 1
-                except ZeroDivisionError:
-                    pass
-            valleys.append(valley_cnt)
-            # save valley paths for record keeping
-            if valley_cnt > 0:
-                paths_with_valleys.append(hege_path)
-
-        avg_valleys = sum(valleys) / float(len(hege_paths))
+        avg_valleys = int(valleys.sum()) / float(len(paths))
         return avg_valleys, paths_with_valleys
 
     ########
@@ -407,6 +462,9 @@ class HegemonyUtils:
 
         return similarity, avg_hege
 
+    def _request(self, url):
+        return requests.get(url)
+
     def query_hegemony(self, subgraph_asn_lst, asn_lst):
         """
         send query to get hegemony value for ASes
@@ -494,7 +552,7 @@ class HegemonyUtils:
             rsp_raw = ""
             try:
                 logging.debug("Querying {}".format(url))
-                rsp_raw = requests.get(url)
+                rsp_raw = self._request(url)
                 rsp_raw.raise_for_status()
                 rsp = rsp_raw.json()
                 if 'count' not in rsp:
@@ -42,7 +42,6 @@ import gzip
 import json
 import logging
 from pathlib import Path
-from itertools import chain
 from radix import Radix
 from bisect import bisect_right
 
@@ -53,9 +52,18 @@ SupportedIRRs = { 'ARIN', 'RADB', 'BELL', 'BBOI', 'LACNIC',
                   'JPIRR', 'NESTEGG' }
 
 class IRRUtils:
+    """
+    IRR route objects of all the IRRs in a single radix tree. Each node maps the origin ASNs of the route objects of
+    its prefix to a bitmask of the IRRs that have such a route object, so that one covering search answers a
+    prefix-origin validation for all IRRs.
+    """
+
     def __init__(self, datadir, never_update_files):
         self.datadir = datadir
-        self.radix = dict()
+        self.radix = Radix()
+        self.irrs = []  # IRRs in load order, the bit of an IRR in the node bitmasks is its index in this list
+        self.irr_bits = dict()
+        self.irr_entries = dict()  # (prefix, origin) pairs added by each IRR, to remove them when it is reloaded
         self.current_ts = dict()
         self.ts_paths_map = dict()
         self.sorted_file_ts = dict()
@@ -66,23 +74,57 @@ class IRRUtils:
             irr_data = json.load(irr_file)
             irr = next(iter(irr_data.keys()))
             irr_records = irr_data[irr]
+        self._add_irr_records(irr, irr_records)
 
-            self.radix[irr] = Radix()
+    def _add_irr_records(self, irr, irr_records):
+        """
+        Replace the route objects of an IRR in the radix tree.
+        """
+        if irr not in self.irr_bits:
+            self.irr_bits[irr] = 1 << len(self.irrs)
+            self.irrs.append(irr)
+        bit = self.irr_bits[irr]
 
-            for record in irr_records:
-                pfx = record["prefix"]
-                if ":" in pfx:
-                    # skip ipv6 prefixes for now
-                    continue
-                try:
-                    node = self.radix[irr].add(pfx)
-                except ValueError:
-                    # temporary but safe: have to fix some broken records in IRR files
-                    continue
+        # remove the route objects of the previously loaded snapshot
+        for pfx, asn in self.irr_entries.get(irr, []):
+            node = self.radix.search_exact(pfx)
+            origins = node.data["origins"]
+            origins[asn] &= ~bit
+            if not origins[asn]:
+                del origins[asn]
+                if not origins:
+                    self.radix.delete(pfx)
 
-                if "irr_records" not in node.data:
-                    node.data["irr_records"] = []
-                node.data["irr_records"].append(record)
+        entries = set()
+        for record in irr_records:
+            pfx = record["prefix"]
+            if ":" in pfx:
+                # skip ipv6 prefixes for now
+                continue
+            if not (record["origin"].startswith("AS") or record["origin"].startswith("as")):
+                continue
+            try:
+                asn = int(record["origin"][2:])
+                node = self.radix.add(pfx)
+            except ValueError:
+                # temporary but safe: have to fix some broken records in IRR files
+                continue
+
+            if "origins" not in node.data:
+                node.data["origins"] = {}
+            node.data["origins"][asn] = node.data["origins"].get(asn, 0) | bit
+            entries.add((node.prefix, asn))
+        self.irr_entries[irr] = entries
+
+    def _usable_irrs_mask(self, ts):
+        """
+        Bitmask of the IRRs with data loaded for a time not after ts
+        """
+        mask = 0
+        for irr, bit in self.irr_bits.items():
+            if self.current_ts[irr] <= ts:
+                mask |= bit
+        return mask
 
     def _load_paths(self):
         """
@@ -141,25 +183,38 @@ class IRRUtils:
         
         return True
 
+    def get_snapshot_version(self):
+        """
+        Get the version of the loaded IRR data, which changes only when a new file of any IRR is loaded
+        """
+        return tuple(sorted(self.current_ts.items()))
+
+    def has_data_after(self, ts):
+        """
+        Check if data of any IRR newer than ts are loaded, which are then ignored by the validations at ts.
+        """
+        return any(irr_ts > ts for irr_ts in self.current_ts.values())
+
     def validated_origins(self, pfx, ts):
         """
         Get all validated origins for the given prefix.
         :param pfx:
         :return:
         """
-        origins = dict()
-        for irr, radix in self.radix.items():
+        for irr in self.irrs:
             if self.current_ts[irr] > ts:
                 logging.error(f'No available IRR data for {irr} before {ts}.')
-                continue
-            nodes = radix.search_covering(pfx)
-            irr_origins = set()
+        usable = self._usable_irrs_mask(ts)
 
-            for node in nodes:
-                for record in node.data["irr_records"]:
-                    asn = int(record["origin"].lstrip("AS"))
-                    irr_origins.add(asn)
+        origins_masks = {}
+        for node in self.radix.search_covering(pfx):
+            for asn, mask in node.data["origins"].items():
+                origins_masks[asn] = origins_masks.get(asn, 0) | (mask & usable)
 
+        origins = dict()
+        for irr in self.irrs:
+            bit = self.irr_bits[irr]
+            irr_origins = {asn for asn, mask in origins_masks.items() if mask & bit}
             if len(irr_origins):
                 origins[irr] = irr_origins
         return origins
@@ -185,31 +240,27 @@ class IRRUtils:
             "no_data": []
         }
 
-        # find related IRR records
-        for irr, radix in self.radix.items():
+        # find related IRR records, from the prefix to its superprefixes
+        exact_mask = 0
+        more_specific_mask = 0
+        for node in self.radix.search_covering(pfx):
+            mask = node.data["origins"].get(origin, 0)
+            if node.prefixlen == pfx_length:
+                exact_mask |= mask
+            else:
+                more_specific_mask |= mask
+
+        for irr in self.irrs:
+            bit = self.irr_bits[irr]
             if self.current_ts[irr] > ts:
                 continue
-            records = list(chain.from_iterable([n.data["irr_records"] for n in radix.search_covering(pfx)]))
-
-            # check if there is a matching record for the prefix or its superprefix
-            matched = False
-            for record in records:
-                if record["origin"].startswith("AS") or \
-                        record["origin"].startswith("as"):
-                    asn = int(record["origin"][2:])
-                else:
-                    continue
-                if asn == origin:
-                    record_pfx_len = int(record["prefix"].split('/')[-1])
-                    if record_pfx_len == pfx_length:
-                        res['exact'].append(irr)
-                    else:
-                        res['more_specific'].append(irr)
-                    matched = True
-                    break # https://github.com/mjschultz/py-radix/blob/52d70b050a1dcbf3a7849aa51b2420883e31539e/radix/radix.py#L493
-
-            # no records from this IRR about this pair
-            if not matched:
-                res["no_data"].append(irr)               
+            # a matching record for the prefix, or else for a superprefix
+            if exact_mask & bit:
+                res['exact'].append(irr)
+            elif more_specific_mask & bit:
+                res['more_specific'].append(irr)
+            else:
+                # no records from this IRR about this pair
+                res["no_data"].append(irr)
         
         return res
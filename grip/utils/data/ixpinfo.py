@@ -574,6 +574,14 @@ class IXPInfo(object):
         if len(self._ixp_id_info) == 0:
             sys.stderr.write("WARNING: IXP data are not available\n")
 
+    def get_snapshot_version(self):
+        """Returns the version of the loaded IXP datasets, which changes only
+        when different dataset instances are loaded.
+        """
+        if not self._ixp_instances:
+            return None
+        return tuple(sorted(instance["file_path"] for instance in self._ixp_instances))
+
     def get_ixp_prefix_match(self, pfx):
         """Checks if the prefix is associated with an IXP lan and returns the IXP id.
         :param pfx: lan prefix (string)
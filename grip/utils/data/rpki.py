@@ -33,12 +33,17 @@ import gzip
 import json
 import logging
 import os
+import random
+import tempfile
 from enum import Enum
-from pathlib import Path
+from fnmatch import fnmatch
 from unittest import TestCase
 from radix import Radix
 from bisect import bisect_right
 
+DEFAULT_VALIDATION_MEMO_SIZE = 100000
+
+
 def floor_ts(ts):
     """ Currently, rpki data are retrieved every 5 minutes.
     """
@@ -51,40 +56,135 @@ class RpkiValidationStatus(str, Enum):
     INVALID_LENGTH = "INVALID_LENGTH"
 
 
+class RoaSnapshotCatalog:
+    """
+    Paths of the ROA files in a data directory by their timestamps.
+
+    The directory tree is cached and a directory is only listed again when its modification time changed, so that
+    finding new files does not walk the whole archive.
+    """
+
+    def __init__(self, datadir):
+        self.datadir = datadir
+        # directory -> (mtime, subdirectories, {ts: path}, paths of empty files)
+        self.dirs = dict()
+
+    def _list_dir(self, path, mtime):
+        subdirs = []
+        ts_paths = {}
+        empty_paths = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif fnmatch(entry.name, "roas.*.json.gz"):
+                    if entry.stat().st_size == 0:
+                        # the file may still be written, check it again on the next scan
+                        empty_paths.append(entry.path)
+                        continue
+                    ts_paths[int(entry.name.split(".")[2])] = entry.path
+        return mtime, subdirs, ts_paths, empty_paths
+
+    def _scan_dir(self, path, ts_paths, scanned):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        cached = self.dirs.get(path)
+        if cached is None or cached[0] != mtime or \
+                any(os.path.exists(empty) and os.stat(empty).st_size > 0 for empty in cached[3]):
+            cached = self._list_dir(path, mtime)
+            self.dirs[path] = cached
+        scanned.add(path)
+        ts_paths.update(cached[2])
+        for subdir in cached[1]:
+            self._scan_dir(subdir, ts_paths, scanned)
+
+    def scan(self):
+        """
+        Get the paths of the ROA files by their timestamps.
+        """
+        ts_paths = {}
+        scanned = set()
+        self._scan_dir(str(self.datadir), ts_paths, scanned)
+        # forget removed directories
+        for path in set(self.dirs) - scanned:
+            del self.dirs[path]
+        return ts_paths
+
+
 class RpkiUtils:
-    def __init__(self, datadir, never_update_files=False):
+    """
+    ROAs of a snapshot in a radix tree. Each node keeps the (ASN, max length) pairs of the ROAs for its prefix.
+
+    Loading a snapshot only applies the ROAs added and removed since the loaded one, and validation results are
+    memoized until the ROAs change.
+    """
+
+    def __init__(self, datadir, never_update_files=False, max_memo_size=DEFAULT_VALIDATION_MEMO_SIZE):
         self.datadir = datadir
         self.radix = None
+        self.vrps = set()  # (prefix, asn, max length) of the loaded ROAs
         self.currend_ts = None
         self.never_update_files = never_update_files
+        self.catalog = RoaSnapshotCatalog(datadir)
         self.ts_paths_map = dict()
         self.sorted_file_ts = []
+        self.max_memo_size = max_memo_size
+        self.memo = dict()
 
-    def _load_roas(self, roas):
-        self.radix = Radix()
+    @staticmethod
+    def _parse_vrps(roas):
+        vrps = set()
         for roa in roas:
             pfx = roa["prefix"]
             if ":" in pfx:
                 # skip ipv6 prefixes for now
                 continue
+            vrps.add((pfx, int(roa["asn"].lstrip("AS")), roa["maxLength"]))
+        return vrps
+
+    def _load_roas(self, roas):
+        new_vrps = self._parse_vrps(roas)
+        if self.radix is None:
+            self.radix = Radix()
+        removed = self.vrps - new_vrps
+        added = new_vrps - self.vrps
+        # the parsed ROAs of the previous snapshot are not needed anymore
+        self.vrps = new_vrps
+
+        changed_nodes = {}
+        for pfx, asn, maxlength in removed:
+            node = self.radix.search_exact(pfx)
+            node.data["vrps"].discard((asn, maxlength))
+            changed_nodes[node.prefix] = node
+        for pfx, asn, maxlength in added:
             node = self.radix.add(pfx)
-            if "roas" not in node.data:
-                node.data["roas"] = []
-            node.data["roas"].append(roa)
+            if "vrps" not in node.data:
+                node.data["vrps"] = set()
+            node.data["vrps"].add((asn, maxlength))
+            changed_nodes[node.prefix] = node
+
+        for pfx, node in changed_nodes.items():
+            if not node.data["vrps"]:
+                self.radix.delete(pfx)
+                continue
+            # the longest max length of the ROAs of each ASN for the prefix
+            max_lengths = {}
+            for asn, maxlength in node.data["vrps"]:
+                if maxlength > max_lengths.get(asn, -1):
+                    max_lengths[asn] = maxlength
+            node.data["max_lengths"] = max_lengths
+
+        if removed or added:
+            self.memo = dict()
 
     def _load_paths(self):
         """
-        Scan all files in data dir and load existing file paths into memory for quick searching.
+        Find the existing file paths in the data dir for quick searching.
         :return:
         """
-        ts_paths_map = {}
-        for path in Path(self.datadir).rglob("roas.*.json.gz"):
-            path = str(path)
-            if os.stat(path).st_size == 0:
-                continue
-            ts = int(path.split("/")[-1].split(".")[2])
-            ts_paths_map[ts] = path
-        return ts_paths_map
+        return self.catalog.scan()
 
     def update_ts(self, ts: int, load_data=True):
         """
@@ -116,32 +216,37 @@ class RpkiUtils:
             logging.info("exact data match for {} not found, closest data at {} is used".format(ts, closest_ts))
 
         # check if we've loaded the file already
-        if closest_ts == self.currend_ts:
+        if closest_ts == self.currend_ts and (self.radix is not None or not load_data):
             logging.info("data already loaded for {}, skipping".format(ts))
+            return True
 
         # load file
-        data_dict = json.load(gzip.open(self.ts_paths_map[closest_ts], 'rt', encoding='UTF-8'))
-        roas = data_dict["roas"]
         if load_data:
+            with gzip.open(self.ts_paths_map[closest_ts], 'rt', encoding='UTF-8') as roas_file:
+                roas = json.load(roas_file)["roas"]
             self._load_roas(roas)
         self.currend_ts = closest_ts
 
         return True
 
+    def get_snapshot_version(self):
+        """
+        Get the version of the loaded ROAs, which changes only when a new file is loaded
+        """
+        return self.currend_ts
+
     def validated_origins(self, pfx):
         """
         Get all validated origins for the given prefix.
         :param pfx:
         :return:
         """
-        nodes = self.radix.search_covering(pfx)
+        pfx_length = int(pfx.split("/")[1])
         origins = set()
 
-        for node in nodes:
-            for roa in node.data["roas"]:
-                asn = int(roa["asn"].lstrip("AS"))
-                maxlength = roa["maxLength"]
-                if maxlength >= int(pfx.split("/")[1]):
+        for node in self.radix.search_covering(pfx):
+            for asn, maxlength in node.data["max_lengths"].items():
+                if maxlength >= pfx_length:
                     origins.add(asn)
         return origins
 
@@ -200,34 +305,43 @@ class RpkiUtils:
         :return:
         """
         origin = int(origin)
+        if self.radix is None:
+            return RpkiValidationStatus.UNKNOWN
+
+        status = self.memo.get((pfx, origin))
+        if status is None:
+            status = self._validate_prefix_origin(pfx, origin)
+            if len(self.memo) >= self.max_memo_size:
+                self.memo = dict()
+            self.memo[(pfx, origin)] = status
+        return status
+
+    def _validate_prefix_origin(self, pfx, origin):
         pfx_length = int(pfx.split("/")[1])
 
         # find candidate ROAs
-        from itertools import chain
-        if self.radix is None:
-            return RpkiValidationStatus.UNKNOWN
-        candidate_roas = list(chain.from_iterable([n.data["roas"] for n in self.radix.search_covering(pfx)]))
+        nodes = self.radix.search_covering(pfx)
 
         # if no matching ROA for the prefix found, the status is UNKNOWN
-        if not candidate_roas:
+        if not nodes:
             return RpkiValidationStatus.UNKNOWN
 
-        # collect all ROAs for the given prefix by the origins
-        # prefixes in these ROAs are either the prefix itself or its super-prefixes
-        roas_by_origin = []
-        for roa in candidate_roas:
-            asn = int(roa["asn"].lstrip("AS"))
-            maxlength = roa["maxLength"]
-            if asn == origin:
-                if maxlength >= pfx_length:
-                    # if the current roa has matching origin and prefix length, the given pair is valid
-                    return RpkiValidationStatus.VALID
-                roas_by_origin.append(asn)
+        # check the ROAs by the origin for the prefix, these ROAs are either for the prefix itself or its
+        # super-prefixes
+        has_roas_by_origin = False
+        for node in nodes:
+            maxlength = node.data["max_lengths"].get(origin)
+            if maxlength is None:
+                continue
+            if maxlength >= pfx_length:
+                # if the current roa has matching origin and prefix length, the given pair is valid
+                return RpkiValidationStatus.VALID
+            has_roas_by_origin = True
 
         # if we reached here, the given pair is invalid.
 
         # no ROAs matches the given prefix belongs to the given origin (but there are ROAs for from origins)
-        if not roas_by_origin:
+        if not has_roas_by_origin:
             return RpkiValidationStatus.INVALID_AS
 
         # if reaches here,  there is some ROAs by the origin for one a covering prefix of the given prefix,
@@ -337,3 +451,74 @@ class Test(TestCase):
         # before the earliest file, no match, currently loaded file remain the same.
         self.assertFalse(validator.update_ts(1617753500, False))
         self.assertEqual(1617753600, validator.currend_ts)
+
+    def test_incremental_reload(self):
+        validator = RpkiUtils(None)
+        validator._load_roas([
+            {"prefix": "1.2.0.0/16", "asn": "AS1234", "maxLength": 20},
+            {"prefix": "1.2.0.0/16", "asn": "AS5678", "maxLength": 16},
+            {"prefix": "8.8.8.0/24", "asn": "AS15169", "maxLength": 24},
+        ])
+        self.assertEqual(RpkiValidationStatus.VALID, validator.validate_prefix_origin("1.2.0.0/18", 1234))
+        self.assertEqual(RpkiValidationStatus.VALID, validator.validate_prefix_origin("8.8.8.0/24", 15169))
+
+        validator._load_roas([
+            {"prefix": "1.2.0.0/16", "asn": "AS1234", "maxLength": 16},
+            {"prefix": "1.2.0.0/16", "asn": "AS5678", "maxLength": 16},
+        ])
+        self.assertEqual({("1.2.0.0/16", 1234, 16), ("1.2.0.0/16", 5678, 16)}, validator.vrps)
+        # the memoized results of the previous snapshot are dropped
+        self.assertEqual(RpkiValidationStatus.INVALID_LENGTH, validator.validate_prefix_origin("1.2.0.0/18", 1234))
+        self.assertEqual(RpkiValidationStatus.UNKNOWN, validator.validate_prefix_origin("8.8.8.0/24", 15169))
+        self.assertIsNone(validator.radix.search_exact("8.8.8.0/24"))
+        self.assertEqual({1234, 5678}, validator.validated_origins("1.2.0.0/16"))
+
+    def test_same_as_full_reload(self):
+        rand = random.Random(0)
+        prefixes = ["10.{}.0.0/16".format(i) for i in range(8)] + \
+                   ["10.{}.{}.0/24".format(i, j) for i in range(8) for j in range(4)] + ["10.0.0.0/8", "11.0.0.0/8"]
+        asns = list(range(1, 6))
+
+        def random_roa():
+            pfx = rand.choice(prefixes)
+            pfx_length = int(pfx.split("/")[1])
+            return {"prefix": pfx, "asn": "AS{}".format(rand.choice(asns)),
+                    "maxLength": rand.randint(pfx_length, min(pfx_length + 8, 32))}
+
+        validator = RpkiUtils(None)
+        roas = [random_roa() for _ in range(30)]
+        for _ in range(50):
+            # the next snapshot removes and adds some ROAs
+            roas = [roa for roa in roas if rand.random() > 0.2] + [random_roa() for _ in range(rand.randint(0, 10))]
+            validator._load_roas(roas)
+            reference = RpkiUtils(None)
+            reference._load_roas(roas)
+
+            self.assertEqual(reference.vrps, validator.vrps)
+            self.assertEqual(sorted(node.prefix for node in reference.radix),
+                             sorted(node.prefix for node in validator.radix))
+            for _ in range(50):
+                pfx = rand.choice(prefixes)
+                pfx = "{}/{}".format(pfx.split("/")[0], rand.randint(int(pfx.split("/")[1]), 32))
+                origin = rand.choice(asns + [6])
+                self.assertEqual(reference.validate_prefix_origin(pfx, origin),
+                                 validator.validate_prefix_origin(pfx, origin))
+                self.assertEqual(reference.validated_origins(pfx), validator.validated_origins(pfx))
+
+    def test_snapshot_catalog(self):
+        with tempfile.TemporaryDirectory() as datadir:
+            def write_roas(day, ts, roas):
+                os.makedirs("{}/{}".format(datadir, day), exist_ok=True)
+                with gzip.open("{}/{}/roas.rpki.{}.json.gz".format(datadir, day, ts), "wt") as roas_file:
+                    json.dump({"roas": roas}, roas_file)
+
+            write_roas("2021-04-07", 1617753600, [{"prefix": "1.2.0.0/16", "asn": "AS1234", "maxLength": 16}])
+            validator = RpkiUtils(datadir)
+            self.assertTrue(validator.update_ts(1617753900))
+            self.assertEqual(RpkiValidationStatus.VALID, validator.validate_prefix_origin("1.2.0.0/16", 1234))
+
+            write_roas("2021-04-08", 1617840000, [{"prefix": "1.2.0.0/16", "asn": "AS4321", "maxLength": 16}])
+            self.assertTrue(validator.update_ts(1617840000))
+            self.assertEqual(1617840000, validator.currend_ts)
+            self.assertEqual(RpkiValidationStatus.INVALID_AS, validator.validate_prefix_origin("1.2.0.0/16", 1234))
+            self.assertEqual([1617753600, 1617840000], validator.sorted_file_ts)
@@ -39,6 +39,7 @@
 # copyright notices in the source code files and in the included LICENSE file.
 
 import json, gzip
+import threading
 import logging
 from pathlib import Path
 from bisect import bisect_right
@@ -103,6 +104,18 @@ class Siblings:
 
         return True
 
+    def get_siblings(self, asn):
+        """
+        Get the siblings listed for an AS, i.e. the ASes asn2 for which are_siblings(asn, asn2) is True
+        """
+        return self.data.get(asn, set())
+
+    def get_snapshot_version(self):
+        """
+        Get the version of the loaded AS2Org data, which changes only when a new file is loaded
+        """
+        return self.current_ts
+
     def are_siblings(self, asn1, asn2):
         """
         Check if two ASes are sibling ASes
@@ -112,3 +125,117 @@ class Siblings:
         """
 
         return asn2 in self.data[asn1] if asn1 in self.data else False
+
+
+class SiblingIndex:
+    """
+    Sibling relation of ASes, combining the AS Rank organizations (as_rank), the AS2Org siblings (siblings) and the
+    org friends lists (friend_asns). Two ASes are siblings if any of the datasets says so.
+
+    Each AS gets a set of group labels, one per organization or friends set it belongs to, so that the siblings among
+    a set of ASes are found by grouping the ASes by label instead of checking every pair. The labels are kept until
+    one of the datasets loads a new snapshot.
+
+    The AS2Org relation is not a grouping: an AS lists its siblings, and the lists are neither symmetric nor
+    transitive. It is checked as Siblings.are_siblings does, from the first AS of a pair to the second.
+    """
+
+    DATASETS = ["as_rank", "friend_asns", "siblings"]
+
+    def __init__(self, datasets):
+        self.datasets = datasets
+        # tagging may run on multiple worker threads
+        self._lock = threading.Lock()
+        self._labels = {}
+        self.versions = None
+
+    def refresh(self, versions):
+        """
+        Drop the labels if the snapshot versions of the datasets changed since they were computed.
+
+        :param versions: tuple of snapshot versions of DATASETS
+        """
+        with self._lock:
+            if versions != self.versions:
+                self._labels = {}
+                self.versions = versions
+
+    def get_labels(self, asn):
+        """
+        Get the group labels of an AS. Two ASes are siblings if they share a label.
+        """
+        labels = self._labels.get(asn)
+        if labels is None:
+            labels = set()
+            as_rank = self.datasets.get("as_rank")
+            if as_rank:
+                org_id = as_rank.get_org_id(asn)
+                if org_id is not None:
+                    labels.add(("org", org_id))
+            friends = self.datasets.get("friend_asns")
+            if friends:
+                labels.update(("friends", group) for group in friends.get_friend_groups(asn))
+            labels = frozenset(labels)
+            with self._lock:
+                self._labels[asn] = labels
+        return labels
+
+    def _listed_siblings(self, asn):
+        siblings = self.datasets.get("siblings")
+        return siblings.get_siblings(asn) if siblings else set()
+
+    def are_siblings(self, asn1, asn2):
+        """
+        Check if two ASes are siblings. The AS2Org siblings are checked from asn1 to asn2.
+        """
+        return not self.get_labels(asn1).isdisjoint(self.get_labels(asn2)) or asn2 in self._listed_siblings(asn1)
+
+    def group_by(self, asns):
+        """
+        Group ASes by their labels.
+
+        :return: dictionary with keys: labels, and values: sets of the ASes with the label
+        """
+        groups = {}
+        for asn in asns:
+            for label in self.get_labels(asn):
+                groups.setdefault(label, set()).add(asn)
+        return groups
+
+    def check_siblings(self, asns):
+        """
+        Check if some or all pairs of distinct ASes in a list are siblings. The pairs are taken in the order of the
+        list, the AS2Org siblings being checked from the first AS of a pair to the second.
+
+        :return: tuple (some, all), both False if there are less than two ASes
+        """
+        asns = list(dict.fromkeys(asns))
+        if len(asns) < 2:
+            return False, False
+        groups = self.group_by(asns)
+        # the pairs of list positions that are AS2Org siblings
+        positions = {asn: idx for idx, asn in enumerate(asns)}
+        listed_pairs = set()
+        for i, asn in enumerate(asns):
+            for sibling in self._listed_siblings(asn):
+                j = positions.get(sibling)
+                if j is not None and j > i:
+                    listed_pairs.add((i, j))
+        if not listed_pairs and not any(len(members) > 1 for members in groups.values()):
+            return False, False
+        if any(len(members) == len(asns) for members in groups.values()):
+            return True, True
+        # neither the friends relation nor the AS2Org one is transitive, so check the remaining pairs
+        return True, all((i, j) in listed_pairs or not self.get_labels(asns[i]).isdisjoint(self.get_labels(asns[j]))
+                         for i in range(len(asns) - 1) for j in range(i + 1, len(asns)))
+
+    def siblings_with_any(self, asns, others):
+        """
+        Get the ASes that are siblings of at least one of the other ASes, the AS2Org siblings being checked from the
+        ASes to the others.
+        """
+        other_labels = set()
+        for asn in others:
+            other_labels.update(self.get_labels(asn))
+        return {asn for asn in asns
+                if not self.get_labels(asn).isdisjoint(other_labels) or not self._listed_siblings(asn).isdisjoint(others)}
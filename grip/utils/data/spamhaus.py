@@ -85,14 +85,24 @@ class AsnDrop:
             return
 
         asns=[]
+        version = None
         if res['hits']['hits']:
             asns = [data["asn"] for data in res['hits']['hits'][0]["_source"]["data"]]
+            version = res['hits']['hits'][0]["_id"]
 
         self.loaded_cache = {
             "ts": ts,
+            "version": version,
             "set": set(asns)
         }
 
+    def get_snapshot_version(self):
+        """
+        Get the version of the loaded ASNDROP list, i.e. the date of the list record, which changes only when a
+        newer list is loaded
+        """
+        return self.loaded_cache.get("version")
+
     def any_on_list(self, asn_lst):
         """
         Check if any ASN of the provided list is on ASNDROP
@@ -106,6 +116,15 @@ class AsnDrop:
         assert self.loaded_cache != {}
         return any([str(asn) in self.loaded_cache["set"] for asn in asn_lst])
 
+    def is_on_list(self, asn):
+        """
+        Check if an ASN is on ASNDROP
+        :param asn: asn
+        :return: True if asn is on the ASNDROP list
+        """
+        assert self.loaded_cache != {}
+        return str(asn) in self.loaded_cache["set"]
+
     def _commit_data(self, check_data_exists=True):
         assert (self.asn_drop_list is not None)
         record_id = self._last_modified.strftime("%Y-%m-%d")
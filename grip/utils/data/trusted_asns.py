@@ -81,6 +81,12 @@ class TrustedAsns(object):
 
         return int(asn) in self.list_trusted_asn
 
+    def get_snapshot_version(self):
+        """
+        the trusted ASNs list is built in and never changes
+        """
+        return 0
+
     def list_asn(self):
         return list(self.list_trusted_asn)
 
@@ -67,6 +67,29 @@ def to_json(obj):
     json.dumps(to_dict(obj))
 
 
+# placeholder of the values that are already JSON-encoded, see dumps_with_encoded
+ENCODED_PLACEHOLDER = "\0encoded\0"
+
+
+def dumps_with_encoded(obj, encoded):
+    """
+    Encode an object like json.dumps does, with values that are already encoded. Each occurrence of
+    ENCODED_PLACEHOLDER in the object is replaced by the next encoded value.
+
+    :param obj: object to encode, with ENCODED_PLACEHOLDER in place of the encoded values
+    :param encoded: list of JSON strings, in the order in which they appear in the encoded object
+    :return: JSON string
+    """
+    parts = json.dumps(obj).split(json.dumps(ENCODED_PLACEHOLDER))
+    if len(parts) != len(encoded) + 1:
+        raise ValueError("found {} placeholders for {} encoded values".format(len(parts) - 1, len(encoded)))
+    res = [parts[0]]
+    for value, part in zip(encoded, parts[1:]):
+        res.append(value)
+        res.append(part)
+    return "".join(res)
+
+
 def parse_ts(ts):
     """
     parse timestamp, return None or a Unix time in integer
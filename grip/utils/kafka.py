@@ -37,6 +37,25 @@ import confluent_kafka
 import grip.common
 
 
+# asynchronous producer defaults
+DEFAULT_LINGER_MS = 50
+DEFAULT_BATCH_NUM_MESSAGES = 1000
+DEFAULT_MAX_IN_FLIGHT = 10000
+# number of times failed messages are produced again at a checkpoint
+DEFAULT_CHECKPOINT_RETRIES = 3
+
+
+class KafkaDeliveryError(Exception):
+    """
+    Kafka messages could not be delivered at a checkpoint, even after retrying.
+    """
+
+    def __init__(self, failures):
+        super().__init__("{} kafka messages failed to be delivered".format(len(failures)))
+        # list of (topic, value, error) tuples
+        self.failures = failures
+
+
 def _kafka_producer_delivery_report(err, msg):
     """ Called once for each message produced to indicate delivery result.
         Triggered by poll() or flush(). """
@@ -66,17 +85,44 @@ class KafkaHelper:
         self.default_producer_topic = None
         self.default_consumer_topic = None
 
-    def init_producer(self, topic):
+        # asynchronous producer mode state
+        self.async_mode = False
+        self.max_in_flight = DEFAULT_MAX_IN_FLIGHT
+        self.in_flight = 0
+        self.delivered_cnt = 0
+        self.delivery_failures = []
+
+    def init_producer(self, topic, async_mode=False, linger_ms=DEFAULT_LINGER_MS,
+                      batch_num_messages=DEFAULT_BATCH_NUM_MESSAGES, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
         """
         initialize kafka producer. allow setting default producer topic.
 
+        in asynchronous mode, messages are batched by the producer and `flush=True` on `produce` is ignored. callers
+        should instead call `flush_checkpoint()` once per view or batch, which waits for all pending messages and
+        raises KafkaDeliveryError if some of them cannot be delivered.
+
         :param topic: default producer topic, nullable
+        :param async_mode: whether to use the asynchronous batched producer mode
+        :param linger_ms: (async mode) time to wait for more messages before sending a batch
+        :param batch_num_messages: (async mode) maximum number of messages per batch
+        :param max_in_flight: (async mode) maximum number of undelivered messages before produce blocks
         """
-        self.producer = confluent_kafka.Producer({
+        config = {
             "bootstrap.servers": self.brokers,
             "message.max.bytes": self.max_bytes,
             # "socket.keepalive.enable": True
-        })
+        }
+        self.async_mode = async_mode
+        if async_mode:
+            config.update({
+                "linger.ms": linger_ms,
+                "batch.num.messages": batch_num_messages,
+                "queue.buffering.max.messages": max_in_flight,
+            })
+            self.max_in_flight = max_in_flight
+            logging.info("kafka producer in async mode: linger {}ms, batch {} messages, max {} in flight".format(
+                linger_ms, batch_num_messages, max_in_flight))
+        self.producer = confluent_kafka.Producer(config)
         if topic is not None:
             logging.info("kafka producer default topic set to be: {}".format(topic))
             self.default_producer_topic = topic
@@ -119,6 +165,49 @@ class KafkaHelper:
         assert (isinstance(self.consumer, confluent_kafka.Consumer))
         return self.consumer.poll(interval)
 
+    def consume(self, num_messages=1, timeout=5):
+        """
+        consume a batch of messages
+        :param num_messages: maximum number of messages to return
+        :param timeout: maximum seconds to wait for messages, default set to 5 seconds
+        :return: list of messages, possibly empty
+        """
+        assert (self.consumer is not None)
+        assert (isinstance(self.consumer, confluent_kafka.Consumer))
+        return self.consumer.consume(num_messages=num_messages, timeout=timeout)
+
+    def _delivery_callback(self, err, msg):
+        """
+        delivery report callback, keeps track of in-flight and failed messages.
+        """
+        self.in_flight -= 1
+        if err is not None:
+            logging.error("kafka message delivery to {} failed: {}".format(msg.topic(), err))
+            self.delivery_failures.append((msg.topic(), msg.value(), err))
+        else:
+            self.delivered_cnt += 1
+
+    def _produce_tracked(self, topic, value_str, report=False):
+        # backpressure: wait for deliveries when too many messages are in flight
+        while self.in_flight >= self.max_in_flight:
+            self.producer.poll(0.1)
+
+        def callback(err, msg):
+            self._delivery_callback(err, msg)
+            if report:
+                _kafka_producer_delivery_report(err, msg)
+
+        while True:
+            try:
+                self.producer.produce(topic=topic, value=value_str, callback=callback)
+                break
+            except BufferError:
+                # local producer queue is full, serve delivery reports and retry
+                self.producer.poll(0.1)
+        self.in_flight += 1
+        # serve delivery reports of previous messages without blocking
+        self.producer.poll(0)
+
     def produce(self, value_str, topic=None, flush=False, report=False):
         """
         produce message to kafka topic.
@@ -140,15 +229,13 @@ class KafkaHelper:
             tmp_topic = self.default_producer_topic
 
         logging.debug("producing kafka message to {}: {}".format(tmp_topic, value_str))
-        callback_func = None
-        if report:
-            callback_func = _kafka_producer_delivery_report
-        self.producer.produce(topic=tmp_topic, value=value_str, callback=callback_func)
+        self._produce_tracked(tmp_topic, value_str, report)
 
-        if flush:
+        # messages are flushed by flush_checkpoint() in async mode
+        if flush and not self.async_mode:
             # see performance punishment for sync producer:
             # https://github.com/edenhill/librdkafka/wiki/FAQ#why-is-there-no-sync-produce-interface
-            self.producer.flush()
+            self.flush_checkpoint()
 
     def flush(self):
         """
@@ -160,6 +247,40 @@ class KafkaHelper:
         logging.debug("flushing kafka producer")
         self.producer.flush()
 
+    def _flush_failures(self, timeout):
+        remaining = self.producer.flush(timeout)
+        if remaining:
+            logging.error("{} kafka messages still not delivered at checkpoint".format(remaining))
+        failures = self.delivery_failures
+        self.delivery_failures = []
+        return failures
+
+    def flush_checkpoint(self, timeout=-1, retries=DEFAULT_CHECKPOINT_RETRIES):
+        """
+        wait for all pending messages to be delivered, producing the messages that failed again.
+        components should call this once per view or batch, in particular before committing consumer offsets, which
+        must not be committed if this raises.
+
+        :param timeout: maximum seconds to wait for each flush, -1 to wait until all messages are delivered
+        :param retries: number of times the messages that failed are produced again
+        :raises KafkaDeliveryError: if messages produced since last checkpoint still failed after the retries
+        """
+        assert (self.producer is not None)
+        assert (isinstance(self.producer, confluent_kafka.Producer))
+        failures = self._flush_failures(timeout)
+        for attempt in range(1, retries + 1):
+            if not failures:
+                break
+            logging.warning("producing {} failed kafka messages again (attempt {}/{})".format(
+                len(failures), attempt, retries))
+            for topic, value, _err in failures:
+                self._produce_tracked(topic, value)
+            failures = self._flush_failures(timeout)
+
+        if failures:
+            logging.error("{} kafka messages failed to be delivered since last checkpoint".format(len(failures)))
+            raise KafkaDeliveryError(failures)
+
 
 def drain_topic(topics, group):
     print("draining topic %s for group: %s" % (topics, group))
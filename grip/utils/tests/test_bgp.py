@@ -36,6 +36,93 @@ from grip.utils.bgp import *
 
 
 class Test(TestCase):
+    def test_indexed_aspath(self):
+        aspath = IndexedAsPath(["5", "4", "3", "1", "1", "1"])
+        self.assertEqual(("5", "4", "3", "1", "1", "1"), aspath.hops)
+        self.assertEqual(3, aspath.index("1"))
+        self.assertIn("4", aspath)
+        self.assertNotIn("2", aspath)
+        self.assertEqual({"5", "4", "3", "1"}, set(aspath.hop_set))
+        self.assertEqual(6, len(aspath))
+
+        # indexing is idempotent
+        indexed = index_aspaths(aspaths_from_str("1 2 3:4 5"))
+        self.assertIs(indexed[0], index_aspaths(indexed)[0])
+        self.assertEqual([("1", "2", "3"), ("4", "5")], [path.hops for path in indexed])
+
+    def test_lazy_aspaths(self):
+        aspaths = LazyAsPaths("1 2 3:4 5")
+        self.assertFalse(aspaths.is_decoded())
+        self.assertEqual("1 2 3:4 5", aspaths.as_str())
+        self.assertFalse(aspaths.is_decoded())
+        self.assertEqual([("1", "2", "3"), ("4", "5")], aspaths.get())
+        self.assertIs(aspaths.get(), aspaths.get())
+        aspaths.release()
+        self.assertFalse(aspaths.is_decoded())
+        self.assertEqual([("1", "2", "3"), ("4", "5")], aspaths.get())
+
+        # the string is serialized as the decoded paths would be
+        for aspaths_str in ["", ":1 2", "1 2:", "1 2::3 4", "1 {2,3}:4 5", "1 2_3:4", "1 2  3"]:
+            aspaths = LazyAsPaths(aspaths_str)
+            self.assertEqual(aspaths_as_str(aspaths_from_str(aspaths_str)), aspaths.as_str())
+            self.assertEqual(aspaths_from_str(aspaths_str), [list(path) for path in aspaths.get()])
+            self.assertEqual({path[-1] for path in aspaths_from_str(aspaths_str)},
+                             origins_from_aspaths_str(aspaths_str))
+        self.assertEqual([], LazyAsPaths(None).get())
+
+        # paths given as lists are never released
+        aspaths = LazyAsPaths([["1", "2"]])
+        aspaths.release()
+        self.assertEqual([["1", "2"]], aspaths.get())
+        self.assertEqual("1 2", aspaths.as_str())
+
+    def test_aspath_interner(self):
+        interner = AsPathInterner(max_paths=3)
+        table, ids = interner.intern("1 2 3:4 5:1 2 3")
+        self.assertEqual([0, 1, 0], list(ids))
+        # decoded paths are kept once they are used twice
+        self.assertEqual(("1", "2", "3"), table.get_hops(0))
+        self.assertIs(table.get_hops(0), table.get_hops(0))
+        self.assertEqual(("4", "5"), table.get_indexed(1).hops)
+        self.assertIs(table.get_indexed(1), table.get_indexed(1))
+
+        # the prefix events share their paths
+        other_table, other_ids = interner.intern("4 5:6 {7,8}:6 7")
+        self.assertIs(table, other_table)
+        self.assertEqual([1, 2], list(other_ids))
+
+        # a full table is replaced, the paths of the old one stay available
+        new_table, new_ids = interner.intern("1 2 3")
+        self.assertIsNot(table, new_table)
+        self.assertEqual([0], list(new_ids))
+        self.assertEqual(("6", "7"), table.get_hops(2))
+
+        # the paths of a view are not interned if they are not shared enough
+        interner = AsPathInterner(sample_paths=4)
+        table, ids = interner.intern("1 2:3 4:1 2")
+        self.assertEqual([0, 1, 0], list(ids))
+        self.assertIs(table, interner.intern("5 6:7 8")[0])
+        self.assertEqual((None, None), interner.intern("1 2"))
+        interner.new_table()
+        self.assertIsNotNone(interner.intern("5 6:7 8")[0])
+
+        # the paths are sampled again in a new table once as many paths as a table holds were not interned
+        interner = AsPathInterner(max_paths=6, sample_paths=4)
+        table, _ids = interner.intern("1 2:3 4:5 6:7 8")
+        self.assertEqual((None, None), interner.intern("1 2:3 4:5 6"))
+        self.assertEqual((None, None), interner.intern("1 2:3 4"))
+        new_table, new_ids = interner.intern("1 2")
+        self.assertIsNot(table, new_table)
+        self.assertEqual([0], list(new_ids))
+
+        a = LazyAsPaths("9 8 7:6 5")
+        b = LazyAsPaths("1 2:9 8 7")
+        c = LazyAsPaths("9 8 7")
+        self.assertEqual(a.get()[0], b.get()[1])
+        self.assertIs(b.get()[1], c.get()[0])
+        b.get_indexed()
+        self.assertIs(c.get_indexed()[0], a.get_indexed()[0])
+
     def test_find_common_hops(self):
         self.assertEqual(find_common_hops([[1, 2, 3]]), [1, 2, 3])
         self.assertEqual(find_common_hops([[1, 2, 3], [2, 3]]), [2, 3])
@@ -0,0 +1,200 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from unittest import TestCase
+
+from grip.utils.data.hegemony import HegemonyUtils
+
+
+def python_count_valleys(hegemony, paths, threshold):
+    """
+    The previous pure Python valley counting of HegemonyUtils.count_global_hegemony_valleys, as a reference.
+    """
+    unique_ases = set()
+    for path in paths:
+        unique_ases.update(path)
+    hegemony_scores = hegemony.query_hegemony(subgraph_asn_lst=[0], asn_lst=list(unique_ases))["0"]
+
+    hege_paths = []
+    for path in paths:
+        new_path = [v for i, v in enumerate(path) if i == 0 or v != path[i - 1]]
+        hege_paths.append([(asn, hegemony_scores[asn]) for asn in new_path])
+
+    if not hege_paths:
+        return 0.0, []
+
+    valleys = []
+    paths_with_valleys = []
+    for index, hege_path in enumerate(hege_paths):
+        reduced_hege_path = [x[0] for x in groupby(map(lambda x: x[1], hege_path))]
+        if len(reduced_hege_path) < 3:
+            continue
+        peak_idxs = []
+        for i in range(1, len(reduced_hege_path) - 1):
+            prev_score = reduced_hege_path[i - 1]
+            curr_score = reduced_hege_path[i]
+            next_score = reduced_hege_path[i + 1]
+            if i == 1 and prev_score > curr_score:
+                peak_idxs.append(0)
+            if prev_score < curr_score and curr_score > next_score:
+                peak_idxs.append(i)
+            if i == len(reduced_hege_path) - 2 and next_score > curr_score:
+                peak_idxs.append(i + 1)
+        if len(peak_idxs) <= 1:
+            valleys.append(0)
+            continue
+        valley_cnt = 0
+        for i in range(1, len(peak_idxs)):
+            local_minimum = min(reduced_hege_path[peak_idxs[i - 1]: peak_idxs[i] + 1])
+            try:
+                depth_before_bottom = (reduced_hege_path[peak_idxs[i - 1]] - local_minimum) / float(
+                    reduced_hege_path[peak_idxs[i - 1]])
+                depth_after_bottom = (reduced_hege_path[peak_idxs[i]] - local_minimum) / float(
+                    reduced_hege_path[peak_idxs[i]])
+                avg_depth = (depth_before_bottom + depth_after_bottom) / 2.0
+                if avg_depth >= threshold:
+                    valley_cnt += 1
+            except ZeroDivisionError:
+                pass
+        valleys.append(valley_cnt)
+        if valley_cnt > 0:
+            paths_with_valleys.append(hege_path)
+
+    return sum(valleys) / float(len(hege_paths)), paths_with_valleys
+
+
+class RandomTopology:
+    """
+    ASes in three tiers with decreasing hegemony scores, paths go up from the collector peer to the Tier-1 ASes and
+    down to the origin.
+    """
+
+    def __init__(self, rand, num_ases):
+        self.rand = rand
+        self.tier1 = [str(asn) for asn in range(1, 21)]
+        self.transit = [str(asn) for asn in range(21, 21 + num_ases // 10)]
+        self.stubs = [str(asn) for asn in range(21 + num_ases // 10, num_ases + 1)]
+        self.scores = {}
+        for asn in self.tier1:
+            self.scores[asn] = round(rand.uniform(0.05, 0.5), 6)
+        for asn in self.transit:
+            self.scores[asn] = round(rand.uniform(0.0005, 0.05), 6)
+        for asn in self.stubs:
+            # many stub ASes have no score at all
+            if rand.random() < 0.5:
+                self.scores[asn] = round(rand.uniform(0, 0.0005), 6)
+
+    def random_path(self, origin, anomaly_rate=0.05):
+        rand = self.rand
+        path = [rand.choice(self.transit + self.stubs)]
+        path += rand.sample(self.transit, rand.randint(0, 2))
+        path += rand.sample(self.tier1, rand.randint(0, 2))
+        path += rand.sample(self.transit, rand.randint(0, 2))
+        path.append(origin)
+        if rand.random() < anomaly_rate:
+            # a low ranked AS in the middle of the path makes a valley
+            path.insert(rand.randint(1, len(path) - 1), rand.choice(self.stubs))
+        if rand.random() < 0.2:
+            # prepending
+            hop = rand.randrange(len(path))
+            path[hop:hop] = [path[hop]] * rand.randint(1, 3)
+        return path
+
+    def random_event_paths(self, num_paths):
+        origin = self.rand.choice(self.stubs)
+        return [self.random_path(origin) for _ in range(num_paths)]
+
+
+def hegemony_utils_with_scores(scores):
+    hegemony = HegemonyUtils(None)
+    hegemony._load_data({'0': scores})
+    hegemony.memory['global'] = True
+    return hegemony
+
+
+def hegemony_utils_with_api(scores):
+    """
+    HegemonyUtils without loaded data, querying the scores from a stub of the API.
+    """
+    hegemony = HegemonyUtils(None)
+
+    def query_hegemony(subgraph_asn_lst, asn_lst):
+        # let the other threads run while waiting for the response
+        time.sleep(0.001)
+        res = {asn: scores.get(asn, 0) for asn in asn_lst}
+        hegemony.cache.setdefault('0', {}).update(res)
+        return {'0': res}
+
+    hegemony.query_hegemony = query_hegemony
+    return hegemony
+
+
+class TestHegemonyValleys(TestCase):
+
+    def setUp(self):
+        self.hegemony = hegemony_utils_with_scores({"1": 0.5, "2": 0.001, "3": 0.4, "4": 0.3, "5": 0.2})
+
+    def test_count_valleys(self):
+        # one deep valley
+        self.assertEqual((1.0, [[("1", 0.5), ("2", 0.001), ("3", 0.4)]]),
+                         self.hegemony.count_global_hegemony_valleys([["1", "2", "2", "3"]], 0.95))
+        # two deep valleys, AS 6 has no score
+        self.assertEqual((1.0, [[("1", 0.5), ("6", 0), ("3", 0.4), ("2", 0.001), ("4", 0.3)]]),
+                         self.hegemony.count_global_hegemony_valleys([["1", "6", "3", "2", "4"], ["3", "4"]], 0.95))
+        # a valley that is not deep enough, and too short paths
+        self.assertEqual((0.0, []), self.hegemony.count_global_hegemony_valleys([["3", "4", "3"], ["1", "2"]], 0.95))
+        self.assertEqual((0.0, []), self.hegemony.count_global_hegemony_valleys([], 0.95))
+
+    def test_same_as_python(self):
+        rand = random.Random(0)
+        topology = RandomTopology(rand, 2000)
+        hegemony = hegemony_utils_with_scores(topology.scores)
+        for _ in range(200):
+            paths = topology.random_event_paths(rand.choice([1, 3, 20, 300]))
+            threshold = rand.choice([0.5, 0.95])
+            self.assertEqual(python_count_valleys(hegemony, paths, threshold),
+                             hegemony.count_global_hegemony_valleys(paths, threshold))
+
+    def test_concurrent_queries(self):
+        rand = random.Random(0)
+        topology = RandomTopology(rand, 2000)
+        reference = hegemony_utils_with_scores(topology.scores)
+        hegemony = hegemony_utils_with_api(topology.scores)
+        events = [topology.random_event_paths(rand.choice([1, 3, 20])) for _ in range(1000)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda paths: hegemony.count_global_hegemony_valleys(paths, 0.95), events))
+        for paths, result in zip(events, results):
+            self.assertEqual(python_count_valleys(reference, paths, 0.95), result)
+        self.assertEqual(len(hegemony.global_asn_ids) + 1, len(hegemony.global_scores))
@@ -0,0 +1,179 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import random
+from itertools import chain
+from unittest import TestCase
+
+from radix import Radix
+
+from grip.utils.data.irr import IRRUtils
+
+
+class PerSourceIRRUtils(IRRUtils):
+    """
+    The previous design of IRRUtils with one radix tree of raw route objects per IRR, as a reference.
+    """
+
+    def __init__(self, datadir, never_update_files):
+        super().__init__(datadir, never_update_files)
+        self.radixes = dict()
+
+    def _add_irr_records(self, irr, irr_records):
+        self.radixes[irr] = Radix()
+        for record in irr_records:
+            pfx = record["prefix"]
+            if ":" in pfx:
+                continue
+            try:
+                node = self.radixes[irr].add(pfx)
+            except ValueError:
+                continue
+            if "irr_records" not in node.data:
+                node.data["irr_records"] = []
+            node.data["irr_records"].append(record)
+
+    def validate_prefix_origin(self, pfx, origin, ts):
+        origin = int(origin)
+        pfx_length = int(pfx.split("/")[1])
+        res = {
+            "exact": [],
+            "more_specific": [],
+            "no_data": []
+        }
+        for irr, radix in self.radixes.items():
+            if self.current_ts[irr] > ts:
+                continue
+            records = list(chain.from_iterable([n.data["irr_records"] for n in radix.search_covering(pfx)]))
+            matched = False
+            for record in records:
+                if record["origin"].startswith("AS") or \
+                        record["origin"].startswith("as"):
+                    asn = int(record["origin"][2:])
+                else:
+                    continue
+                if asn == origin:
+                    record_pfx_len = int(record["prefix"].split('/')[-1])
+                    if record_pfx_len == pfx_length:
+                        res['exact'].append(irr)
+                    else:
+                        res['more_specific'].append(irr)
+                    matched = True
+                    break
+            if not matched:
+                res["no_data"].append(irr)
+        return res
+
+
+def random_irr_records(rand, count, asns):
+    records = []
+    for _ in range(count):
+        length = rand.randint(8, 24)
+        addr = rand.getrandbits(length) << (32 - length)
+        pfx = "%d.%d.%d.%d/%d" % (addr >> 24, (addr >> 16) & 255, (addr >> 8) & 255, addr & 255, length)
+        records.append({"prefix": pfx, "origin": "AS%d" % rand.choice(asns)})
+    return records
+
+
+def synthetic_irr_data(irrs, records_per_irr, seed=0):
+    rand = random.Random(seed)
+    asns = [rand.randint(1, 400000) for _ in range(max(records_per_irr // 4, 1))]
+    # the IRRs mirror each other to a large extent, so draw their records from a shared pool
+    pool = random_irr_records(rand, records_per_irr, asns)
+    return {irr: rand.sample(pool, records_per_irr // 2) + random_irr_records(rand, records_per_irr // 2, asns)
+            for irr in irrs}
+
+
+def random_lookups(rand, irr_data, count):
+    records = list(chain.from_iterable(irr_data.values()))
+    lookups = []
+    for _ in range(count):
+        record = rand.choice(records)
+        pfx, length = record["prefix"].split("/")
+        # the prefix of a route object, or one of its more specifics, with its origin or another one
+        length = min(int(length) + rand.choice([0, 0, 1, 4]), 32)
+        origin = record["origin"][2:] if rand.random() < 0.5 else rand.choice(records)["origin"][2:]
+        lookups.append(("%s/%d" % (pfx, length), origin))
+    return lookups
+
+
+def load_irr_data(irr_utils, irr_data, irr_ts):
+    for irr, records in irr_data.items():
+        irr_utils._add_irr_records(irr, records)
+        irr_utils.current_ts[irr] = irr_ts[irr]
+
+
+class TestIRRUtils(TestCase):
+
+    def setUp(self):
+        self.irr = IRRUtils(None, True)
+        load_irr_data(self.irr, {
+            "RADB": [{"prefix": "8.8.0.0/16", "origin": "AS15169"}, {"prefix": "8.8.8.0/24", "origin": "AS3356"}],
+            "RIPE": [{"prefix": "8.8.8.0/24", "origin": "as15169"}, {"prefix": "8.8.8.0/24", "origin": "15169"},
+                     {"prefix": "2001:db8::/32", "origin": "AS15169"}],
+            "ARIN": [{"prefix": "1.1.1.0/24", "origin": "AS13335"}],
+        }, {"RADB": 100, "RIPE": 100, "ARIN": 200})
+
+    def test_validate_prefix_origin(self):
+        self.assertEqual({"exact": ["RIPE"], "more_specific": ["RADB"], "no_data": []},
+                         self.irr.validate_prefix_origin("8.8.8.0/24", "15169", 150))
+        self.assertEqual({"exact": ["RADB"], "more_specific": [], "no_data": ["RIPE", "ARIN"]},
+                         self.irr.validate_prefix_origin("8.8.8.0/24", "3356", 200))
+        self.assertEqual({"exact": [], "more_specific": ["RADB", "RIPE"], "no_data": ["ARIN"]},
+                         self.irr.validate_prefix_origin("8.8.8.128/25", "15169", 200))
+
+    def test_validated_origins(self):
+        self.assertEqual({"RADB": {15169, 3356}, "RIPE": {15169}}, self.irr.validated_origins("8.8.8.0/24", 150))
+
+    def test_reload(self):
+        load_irr_data(self.irr, {"RADB": [{"prefix": "8.8.8.0/24", "origin": "AS15169"}]}, {"RADB": 300})
+        self.assertEqual({"exact": ["RADB", "RIPE"], "more_specific": [], "no_data": ["ARIN"]},
+                         self.irr.validate_prefix_origin("8.8.8.0/24", "15169", 300))
+        self.assertEqual({"exact": [], "more_specific": [], "no_data": ["RADB", "RIPE", "ARIN"]},
+                         self.irr.validate_prefix_origin("8.8.8.0/24", "3356", 300))
+        self.assertIsNone(self.irr.radix.search_exact("8.8.0.0/16"))
+
+    def test_same_as_per_irr_radix(self):
+        irrs = ["RADB", "RIPE", "ARIN", "APNIC", "NTTCOM"]
+        irr_data = synthetic_irr_data(irrs, 2000)
+        irr_ts = {irr: i * 100 for i, irr in enumerate(irrs)}
+        merged = IRRUtils(None, True)
+        per_irr = PerSourceIRRUtils(None, True)
+        for irr_utils in [merged, per_irr]:
+            load_irr_data(irr_utils, irr_data, irr_ts)
+            # reload some of the IRRs with new snapshots
+            load_irr_data(irr_utils, synthetic_irr_data(irrs[:2], 2000, seed=1), irr_ts)
+
+        rand = random.Random(0)
+        for pfx, origin in random_lookups(rand, irr_data, 3000):
+            ts = rand.choice([150, 1000])
+            self.assertEqual(per_irr.validate_prefix_origin(pfx, origin, ts),
+                             merged.validate_prefix_origin(pfx, origin, ts))
@@ -0,0 +1,70 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+
+from unittest import TestCase
+
+import confluent_kafka
+
+from grip.utils.kafka import KafkaHelper, KafkaDeliveryError
+
+# nothing listens on this port, so the messages time out
+UNREACHABLE_BROKER = "127.0.0.1:1"
+
+
+def unreachable_helper(async_mode):
+    kafka = KafkaHelper(brokers=UNREACHABLE_BROKER)
+    kafka.init_producer("test", async_mode=async_mode)
+    kafka.producer = confluent_kafka.Producer({
+        "bootstrap.servers": UNREACHABLE_BROKER,
+        "message.timeout.ms": 200,
+        "log_level": 0,
+    })
+    return kafka
+
+
+class TestFlushCheckpoint(TestCase):
+
+    def test_failures_raise(self):
+        kafka = unreachable_helper(async_mode=True)
+        kafka.produce("a")
+        kafka.produce("b")
+        with self.assertRaises(KafkaDeliveryError) as cm:
+            kafka.flush_checkpoint(retries=1)
+        self.assertEqual([b"a", b"b"], sorted(value for _topic, value, _err in cm.exception.failures))
+        self.assertEqual(0, kafka.in_flight)
+        # the failures were reported once
+        kafka.flush_checkpoint()
+
+    def test_sync_flush_raises(self):
+        kafka = unreachable_helper(async_mode=False)
+        with self.assertRaises(KafkaDeliveryError):
+            kafka.produce("a", flush=True)
@@ -0,0 +1,109 @@
+#  This software is Copyright (c) 2015 The Regents of the University of
+#  California. All Rights Reserved. Permission to copy, modify, and distribute this
+#  software and its documentation for academic research and education purposes,
+#  without fee, and without a written agreement is hereby granted, provided that
+#  the above copyright notice, this paragraph and the following three paragraphs
+#  appear in all copies. Permission to make use of this software for other than
+#  academic research and education purposes may be obtained by contacting:
+#
+#  Office of Innovation and Commercialization
+#  9500 Gilman Drive, Mail Code 0910
+#  University of California
+#  La Jolla, CA 92093-0910
+#  (858) 534-5815
+#  invent@ucsd.edu
+#
+#  This software program and documentation are copyrighted by The Regents of the
+#  University of California. The software program and documentation are supplied
+#  "as is", without any accompanying services from The Regents. The Regents does
+#  not warrant that the operation of the program will be uninterrupted or
+#  error-free. The end-user understands that the program was developed for research
+#  purposes and is advised not to rely exclusively on the program for any reason.
+#
+#  IN NO EVENT SHALL THE UNIVERSITY OF CALIFORNIA BE LIABLE TO ANY PARTY FOR
+#  DIRECT, INDIRECT, SPECIAL, INCIDENTAL, OR CONSEQUENTIAL DAMAGES, INCLUDING LOST
+#  PROFITS, ARISING OUT OF THE USE OF THIS SOFTWARE AND ITS DOCUMENTATION, EVEN IF
+#  THE UNIVERSITY OF CALIFORNIA HAS BEEN ADVISED OF THE POSSIBILITY OF SUCH
+#  DAMAGE. THE UNIVERSITY OF CALIFORNIA SPECIFICALLY DISCLAIMS ANY WARRANTIES,
+#  INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND
+#  FITNESS FOR A PARTICULAR PURPOSE. THE SOFTWARE PROVIDED HEREUNDER IS ON AN "AS
+#  IS" BASIS, AND THE UNIVERSITY OF CALIFORNIA HAS NO OBLIGATIONS TO PROVIDE
+#  MAINTENANCE, SUPPORT, UPDATES, ENHANCEMENTS, OR MODIFICATIONS.
+import itertools
+import random
+from unittest import TestCase
+
+from grip.tagger.tags.friends import OrgFriends
+from grip.utils.data.siblings import Siblings, SiblingIndex
+
+
+class FakeAsRank:
+    def __init__(self, org_ids):
+        self.org_ids = org_ids
+
+    def get_org_id(self, asn):
+        return self.org_ids.get(asn)
+
+    def are_siblings(self, asn1, asn2):
+        return asn1 in self.org_ids and asn2 in self.org_ids and self.org_ids[asn1] == self.org_ids[asn2]
+
+
+class TestSiblingIndex(TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.asns = [str(asn) for asn in range(1, 40)]
+        self.as_rank = FakeAsRank({asn: "org-%d" % random.randint(0, 12) for asn in self.asns if random.random() < 0.7})
+        self.siblings = Siblings(None)
+        # a chain 1 -> 3 -> 4, one-way entries (1 lists 2 but 2 does not list 1), and random one-way lists
+        self.siblings.data = {"1": {"2", "3"}, "3": {"4"}, "20": {"21"}}
+        for asn in random.sample(self.asns, 15):
+            self.siblings.data.setdefault(asn, set()).update(random.sample(self.asns, random.randint(1, 3)))
+        self.friends = OrgFriends()
+        self.friends.friend_asn_sets = []
+        self.friends.friend_asn_dict = {}
+        self.friends.friend_group_ids = {}
+        for i, ases_set in enumerate([{"5", "6"}, {"6", "7"}, {"30", "31", "32"}]):
+            self.friends.friend_asn_sets.append(ases_set)
+            for asn in ases_set:
+                self.friends.friend_asn_dict.setdefault(asn, []).append(ases_set)
+                self.friends.friend_group_ids.setdefault(asn, set()).add(i)
+        self.index = SiblingIndex({"as_rank": self.as_rank, "friend_asns": self.friends, "siblings": self.siblings})
+
+    def pairwise_siblings(self, asn1, asn2):
+        # the checks tag_relationships did for each pair before the index
+        return self.as_rank.are_siblings(asn1, asn2) or self.friends.are_friends(asn1, asn2) or \
+               self.siblings.are_siblings(asn1, asn2)
+
+    def test_listed_siblings(self):
+        siblings = Siblings(None)
+        siblings.data = {"1": {"2", "3"}, "3": {"4"}}
+        index = SiblingIndex({"as_rank": FakeAsRank({}), "friend_asns": self.friends, "siblings": siblings})
+        # the AS2Org siblings are neither symmetric nor transitive
+        self.assertTrue(index.are_siblings("1", "2"))
+        self.assertFalse(index.are_siblings("2", "1"))
+        self.assertFalse(index.are_siblings("1", "4"))
+        self.assertEqual((False, False), index.check_siblings(["2", "4"]))
+        self.assertEqual((False, False), index.check_siblings(["2", "1"]))
+        self.assertEqual((True, True), index.check_siblings(["1", "2"]))
+        self.assertEqual((True, False), index.check_siblings(["1", "3", "4"]))
+        self.assertEqual({"1"}, index.siblings_with_any(["1", "2"], ["3"]))
+        self.assertEqual(set(), index.siblings_with_any(["4"], ["1"]))
+
+    def test_same_as_pairwise(self):
+        for _ in range(2000):
+            asns = random.sample(self.asns, random.randint(1, 5))
+            others = random.sample(self.asns, random.randint(1, 5))
+            pairs = [self.pairwise_siblings(a, b) for a, b in itertools.combinations(asns, 2)]
+            self.assertEqual((any(pairs), any(pairs) and all(pairs)), self.index.check_siblings(asns), asns)
+            self.assertEqual({a for a in asns if any(self.pairwise_siblings(a, b) for b in others)},
+                             self.index.siblings_with_any(asns, others))
+
+    def test_refresh(self):
+        self.index.refresh((1, 0, 1))
+        self.assertFalse(self.index.are_siblings("6", "8"))
+        self.friends.friend_group_ids["8"] = {0}
+        self.index.refresh((1, 0, 1))
+        self.assertFalse(self.index.are_siblings("6", "8"))
+        self.index.refresh((1, 1, 1))
+        self.assertTrue(self.index.are_siblings("6", "8"))
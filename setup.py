@@ -77,6 +77,7 @@ setuptools.setup(
         "grip-redis-pfx2as-historical = grip.redis.pfx2as_historical:main",
         "grip-redis-pfx2as-newcomer = grip.redis.pfx2as_newcomer:main",
         "grip-redis-adjacencies = grip.redis.adjacencies:main",
+        "grip-redis-lookup-benchmark = grip.redis.lookup_benchmark:main",
         "grip-redis-updater = grip.coodinator.updater:main",
 
         # Classifier CLI tools
@@ -84,6 +85,8 @@ setuptools.setup(
         "grip-tagger = grip.tagger.cli:main",
         "grip-tagger-transition = grip.utils.transition:main",
         "grip-tagger-backfill = grip.utils.backfill:main",
+        "grip-tagger-edit-distance-benchmark = grip.tagger.edit_distance_benchmark:main",
+        "grip-events-memory-benchmark = grip.events.memory_benchmark:main",
         "grip-retagger = grip.tagger.retagger.retagger:main",
 
         # Active Probing CLI tools